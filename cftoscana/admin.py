@@ -1,6 +1,11 @@
 from django.contrib import admin
 
-from cftoscana.models import CFTBuoyData, CFTBuoyStation
+from cftoscana.models import (
+    CFTBuoyDailySeries,
+    CFTBuoyData,
+    CFTBuoyObservation,
+    CFTBuoyStation,
+)
 
 # Register your models here.
 
@@ -13,5 +18,16 @@ class CFTBuoyDataAdmin(admin.ModelAdmin):
     pass
 
 
+class CFTBuoyDailySeriesAdmin(admin.ModelAdmin):
+    pass
+
+
+class CFTBuoyObservationAdmin(admin.ModelAdmin):
+    list_display = ["station", "timestamp", "hm0", "tp", "dirp"]
+    list_filter = ["station"]
+
+
 admin.site.register(CFTBuoyStation, CFTBuoyStationAdmin)
 admin.site.register(CFTBuoyData, CFTBuoyDataAdmin)
+admin.site.register(CFTBuoyDailySeries, CFTBuoyDailySeriesAdmin)
+admin.site.register(CFTBuoyObservation, CFTBuoyObservationAdmin)
@@ -0,0 +1,40 @@
+from datetime import date
+from typing import TYPE_CHECKING, Optional
+
+from django.core.cache import cache
+
+from surfin import settings
+
+if TYPE_CHECKING:
+    from cftoscana.domain import CFTBuoyRawDataUTC
+
+
+class CFTBuoyRawDataCache:
+    """Raw graphs of a station as published at a given date and hour.
+
+    The buoys publish a new datapoint every half an hour or so, spots sharing
+    a station and runs close to each other reuse the same download, across
+    processes too as long as they share the CACHES backend.
+    """
+
+    timeout = settings.CFT_BUOY_CACHE_TIMEOUT
+
+    @classmethod
+    def get_key(cls, station_uid: str, day: date, hours: int) -> str:
+        return f"cftoscana:raw:{station_uid}:{day.isoformat()}:{hours}"
+
+    @classmethod
+    def get(
+        cls, station_uid: str, day: date, hours: int
+    ) -> "Optional[dict[str, CFTBuoyRawDataUTC]]":
+        return cache.get(cls.get_key(station_uid, day, hours))
+
+    @classmethod
+    def set(
+        cls,
+        station_uid: str,
+        day: date,
+        hours: int,
+        raw_data: "dict[str, CFTBuoyRawDataUTC]",
+    ):
+        cache.set(cls.get_key(station_uid, day, hours), raw_data, timeout=cls.timeout)
@@ -1,9 +1,13 @@
+import json
 import math
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import TYPE_CHECKING, List, Optional
+from datetime import timezone as dt_timezone
+from functools import cached_property
+from itertools import groupby
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
-import pandas as pd
+import numpy as np
 from cft_buoy_data_extractor.client import CFTBuoyDataExtractor
 from cft_buoy_data_extractor.constants import (
     Graph,
@@ -12,51 +16,292 @@ from cft_buoy_data_extractor.constants import (
     SignificantWaveHeight,
     Station,
 )
+from django.db import transaction
 from django.utils import timezone
 
-from cftoscana.models import CFTBuoyData, CFTBuoyStation
+from cftoscana.cache import CFTBuoyRawDataCache
+from cftoscana.models import (
+    CFTBuoyDailySeries,
+    CFTBuoyData,
+    CFTBuoyObservation,
+    CFTBuoyStation,
+)
+from spots.topology.domain import topology_cache
+from surfin import settings
+from surfin.concurrency import bounded_map
+from surfin.http import get_session
 
 if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
     from spots.domain import SpotDomain, SpotSetDomain
-    from spots.models import Spot, SpotSnapshot
+    from spots.models import SpotSnapshot
 
 
-@dataclass
+@dataclass(eq=False)
 class CFTBuoyRawDataUTC:
-    x: list[float]
-    y: list[float]
+    # Lists when decoded from JSON, float64 arrays when decoded from the
+    # binary encoding
+    x: "list[float] | np.ndarray"
+    y: "list[float] | np.ndarray"
     unit: str
 
+    # Bytes per x delta, or X_FLOAT64 when x is stored as is
+    X_FLOAT64 = 8
+    # Flag on the x encoding byte for y stored as float64
+    Y_FLOAT64 = 0x80
+    # Decimals float32 y is rounded back to once decoded, which restores
+    # readings of at most 4 decimals below ~1000
+    Y_DECIMALS = 4
+
+    def __eq__(self, other):
+        if not isinstance(other, CFTBuoyRawDataUTC):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
     def to_dict(self):
-        return asdict(self)
+        if isinstance(self.x, np.ndarray):
+            # The binary encoding stores nulls as NaN
+            return {
+                "x": self.x.tolist(),
+                "y": [None if math.isnan(y) else y for y in self.y.tolist()],
+                "unit": self.unit,
+            }
+        return {"x": list(self.x), "y": list(self.y), "unit": self.unit}
+
+    def _encode_x(self) -> "tuple[int, int, np.ndarray]":
+        """x as the minute of the first datapoint and the minutes between
+        datapoints when it sits on a minute grid, as is otherwise.
+        """
+        x = self.x_array
+        minutes = np.rint(x * 60)
+        deltas = np.diff(minutes)
+        if (
+            np.array_equal(minutes / 60, x)
+            and ((minutes >= 0) & (minutes < 2**16)).all()
+            and ((deltas >= 0) & (deltas < 2**16)).all()
+        ):
+            width = 1 if (deltas < 2**8).all() else 2
+            first_minute = int(minutes[0]) if len(minutes) else 0
+            return width, first_minute, deltas.astype(f"<u{width}")
+        return self.X_FLOAT64, 0, x.astype("<f8")
+
+    def _encode_y(self) -> "tuple[int, np.ndarray]":
+        """y as float32 when rounding it back to Y_DECIMALS restores every
+        value, as float64 otherwise so that no reading is altered.
+        """
+        y = np.asarray(self.y_array, dtype=np.float64)
+        compact = y.astype("<f4")
+        restored = np.round(compact.astype(np.float64), self.Y_DECIMALS)
+        if np.array_equal(restored, y, equal_nan=True):
+            return 0, compact
+        return self.Y_FLOAT64, y.astype("<f8")
+
+    def to_bytes(self) -> bytes:
+        """Unit length, unit, x and y encoding and padding on 4 bytes, then
+        the number of datapoints and minute of the first one as uint16, y as
+        float32, float64 if more precise than Y_DECIMALS, and x as
+        uint8/uint16 minute deltas, float64 if off the grid.
+        """
+        unit = self.unit.encode()
+        width, first_minute, x = self._encode_x()
+        y_flag, y = self._encode_y()
+        header = bytes([len(unit)]) + unit + bytes([width | y_flag])
+        header += b"\0" * (-len(header) % 4)
+        header += np.array([len(self.x_array), first_minute], dtype="<u2").tobytes()
+        return header + y.tobytes() + x.tobytes()
+
+    @classmethod
+    def from_bytes(cls, buffer: "bytes | memoryview") -> "CFTBuoyRawDataUTC":
+        """Series encoded by to_bytes. float64 arrays are views on `buffer`,
+        float32 y and minute deltas are decoded into new arrays.
+        """
+        # psycopg2 returns char buffers, whose items are bytes
+        buffer = memoryview(buffer).cast("B")
+        unit_length = buffer[0]
+        width = buffer[1 + unit_length] & ~cls.Y_FLOAT64
+        y_float64 = buffer[1 + unit_length] & cls.Y_FLOAT64
+        offset = 2 + unit_length + (-(2 + unit_length) % 4)
+        length, first_minute = map(
+            int, np.frombuffer(buffer, dtype="<u2", count=2, offset=offset)
+        )
+        offset += 4
+        if y_float64:
+            y = np.frombuffer(buffer, dtype="<f8", count=length, offset=offset)
+            offset += 8 * length
+        else:
+            y = np.frombuffer(buffer, dtype="<f4", count=length, offset=offset)
+            y = np.round(y.astype(np.float64), cls.Y_DECIMALS)
+            offset += 4 * length
+        if width == cls.X_FLOAT64:
+            x = np.frombuffer(buffer, dtype="<f8", count=length, offset=offset)
+        else:
+            deltas = np.frombuffer(
+                buffer, dtype=f"<u{width}", count=max(length - 1, 0), offset=offset
+            )
+            minutes = np.concatenate([[first_minute], deltas]).cumsum()[:length]
+            x = minutes / 60
+        return cls(
+            x=x,
+            y=y,
+            unit=bytes(buffer[1 : 1 + unit_length]).decode(),
+        )
+
+    @cached_property
+    def x_array(self) -> np.ndarray:
+        return np.asarray(self.x, dtype=np.float64)
+
+    @cached_property
+    def y_array(self) -> np.ndarray:
+        y = np.asarray(self.y)
+        if y.dtype.kind == "O" and any(value is not None for value in self.y):
+            # Nulls among numbers become NaN, same coercion pandas applies
+            y = np.asarray(self.y, dtype=np.float64)
+        return y
+
+    def value_at(self, hour: float):
+        """Latest value at or before `hour`, x-axis is sorted ascending."""
+        index = np.searchsorted(self.x_array, hour, side="right") - 1
+        if index < 0:
+            raise IndexError(f"No datapoint at or before {hour}")
+        return self.y_array[index]
+
+    @staticmethod
+    def std_of(values: np.ndarray) -> Optional[float]:
+        """Sample standard deviation of `values`.
+
+        Same two-pass algorithm as pandas (NaNs skipped, ddof=1) so results
+        are identical to `Series.std()` on the same values. None when there
+        is no value at all, NaN when there is only one.
+        """
+        values = np.array(values, dtype=np.float64)
+        mask = np.isnan(values)
+        count = values.size - mask.sum()
+        if count == 0:
+            return None
+        if count == 1:
+            return np.float64(np.nan)
+        values[mask] = 0
+        avg = values.sum(dtype=np.float64) / count
+        sqr = (avg - values) ** 2
+        sqr[mask] = 0
+        return np.sqrt(sqr.sum(dtype=np.float64) / (count - 1))
+
+    def std_since(self, hour: float) -> Optional[float]:
+        """Sample standard deviation of values from `hour` onwards, see std_of."""
+        start = np.searchsorted(self.x_array, hour, side="left")
+        return self.std_of(self.y_array[start:])
+
+
+class CFTBuoyFeatureMatrix:
+    """Lag and rolling-std features for a batch of buoy data at once.
+
+    Each raw series is padded into a (snapshots x datapoints) matrix once so
+    that lags are resolved for the whole batch with one comparison.
+    """
+
+    def __init__(self, data: "list[CFTBuoyDataDomain]"):
+        self.data = data
+        self._matrices = {}
+
+    def _get_matrix(self, feature: str) -> "tuple[np.ndarray, np.ndarray, np.ndarray]":
+        if feature not in self._matrices:
+            series = [getattr(data, feature) for data in self.data]
+            lengths = np.array([len(s.x) for s in series], dtype=np.intp)
+            width = max(lengths.max(initial=0), 1)
+            # +inf padding never satisfies x <= hour
+            x = np.full((len(series), width), np.inf)
+            y = np.full((len(series), width), np.nan)
+            for row, s in enumerate(series):
+                x[row, : lengths[row]] = s.x_array
+                y[row, : lengths[row]] = s.y_array
+            self._matrices[feature] = (x, y, lengths)
+        return self._matrices[feature]
+
+    def get_lag(
+        self, feature: str, hours_lag: float
+    ) -> "tuple[np.ndarray, np.ndarray]":
+        """Values `hours_lag` hours before the last datapoint of each series.
+
+        Returns the values along with a mask of the rows having one.
+        """
+        x, y, lengths = self._get_matrix(feature)
+        rows = np.arange(len(lengths))
+        last_hours = x[rows, np.maximum(lengths - 1, 0)]
+        as_of_hours = last_hours - hours_lag
+        index = (x <= as_of_hours[:, None]).sum(axis=1) - 1
+        valid = (lengths > 0) & (index >= 0)
+        values = np.where(valid, y[rows, np.maximum(index, 0)], np.nan)
+        return values, valid
+
+    def get_std(self, feature: str, hours: int) -> "tuple[np.ndarray, np.ndarray]":
+        """Standard deviation over the last `hours` of wave height datapoints.
+
+        Each window is the contiguous slice of its row from the cutoff on, so
+        values are those of `CFTBuoyRawDataUTC.std_since`, None for empty
+        windows. Returns the values along with a mask of the rows having one.
+        """
+        wave_x, _, wave_lengths = self._get_matrix("wave_height")
+        rows = np.arange(len(wave_lengths))
+        cutoff_hours = wave_x[rows, np.maximum(wave_lengths - 1, 0)] - hours
+
+        x, y, lengths = self._get_matrix(feature)
+        has_value = wave_lengths > 0
+        values = np.full(len(lengths), None, dtype=object)
+        for row in np.flatnonzero(has_value):
+            length = lengths[row]
+            start = np.searchsorted(x[row, :length], cutoff_hours[row], side="left")
+            values[row] = CFTBuoyRawDataUTC.std_of(y[row, start:length])
+        return values, has_value
 
 
 @dataclass
 class CFTBuoyStationDomain:
     pk: Optional[int]
     station_uid: str
-    spots_orm: "list[Spot]"
+    spot_pks: "tuple[int, ...]"
 
     @property
     def station(self):
-        return [s for s in Station if s.value == self.station_uid][0]
+        return Station(self.station_uid)
 
     @classmethod
     def from_orm_obj(cls, orm_obj: "CFTBuoyStation"):
         return cls(
             pk=orm_obj.pk,
             station_uid=orm_obj.station_uid,
-            spots_orm=orm_obj.spots.all(),
+            spot_pks=tuple(spot.pk for spot in orm_obj.spots.all()),
         )
 
     def fetch_data(self, graph: "Graph") -> CFTBuoyRawDataUTC:
-        client = CFTBuoyDataExtractor(
-            station=self.station,
-            graph=graph,
-        )
+        client = CFTBuoyDataExtractor(station=self.station, graph=graph)
+        # The extractor takes no session, hand it the pooled one for its
+        # requests to go through it
+        client.session = get_session()
         data = client.get_station_data()
         return CFTBuoyRawDataUTC(x=data["x"], y=data["y"], unit=graph.unit)
 
+    @staticmethod
+    def get_graphs(as_of: datetime, hours: int) -> "dict[str, Graph]":
+        day = as_of.date().strftime("%d/%m/%Y")
+        return {
+            "wave_height": SignificantWaveHeight(date=day, hours=hours),
+            "period": PeakPeriod(date=day, hours=hours),
+            "direction": PeakDirection(date=day, hours=hours),
+        }
+
+    def fetch_graphs(
+        self, as_of: datetime, hours: int
+    ) -> "dict[str, CFTBuoyRawDataUTC]":
+        """Download the three graphs of the station concurrently."""
+        graphs = self.get_graphs(as_of=as_of, hours=hours)
+        raw_data = bounded_map(
+            lambda graph: self.fetch_data(graph=graph),
+            graphs.values(),
+            max_workers=len(graphs),
+        )
+        return dict(zip(graphs.keys(), raw_data))
+
     def take_snapshot(self, as_of: datetime) -> "CFTBuoyDataDomain":
         # Data from Centro Funzionale Toscana is in CET (no DST)
         # meaning x-axis would always be 1 hour ahead of UTC.
@@ -67,15 +312,10 @@ class CFTBuoyStationDomain:
         hours = int((as_of - start_of_day).seconds / 3600)
         # end-of-utc-unintentional-hack
 
-        graph_dirp = PeakDirection(date=as_of.date().strftime("%d/%m/%Y"), hours=hours)
-        graph_tp = PeakPeriod(date=as_of.date().strftime("%d/%m/%Y"), hours=hours)
-        graph_hm0 = SignificantWaveHeight(
-            date=as_of.date().strftime("%d/%m/%Y"), hours=hours
-        )
-
-        wave_height = self.fetch_data(graph=graph_hm0)
-        period = self.fetch_data(graph=graph_tp)
-        direction = self.fetch_data(graph=graph_dirp)
+        raw_data = CFTBuoyRawDataCache.get(self.station_uid, as_of.date(), hours)
+        if raw_data is None:
+            raw_data = self.fetch_graphs(as_of=as_of, hours=hours)
+            CFTBuoyRawDataCache.set(self.station_uid, as_of.date(), hours, raw_data)
 
         return CFTBuoyDataDomain(
             pk=None,
@@ -83,9 +323,9 @@ class CFTBuoyStationDomain:
             created=None,
             as_of=as_of,
             station=self,
-            wave_height=wave_height,
-            period=period,
-            direction=direction,
+            wave_height=raw_data["wave_height"],
+            period=raw_data["period"],
+            direction=raw_data["direction"],
         )
 
 
@@ -111,11 +351,11 @@ class CFTBuoyDataDomain:
         delay = self.as_of - last_datapoint_dt
         return delay - timedelta(microseconds=delay.microseconds)
 
-    def get_feature_std(self, feature: "CFTBuoyRawDataUTC", hours: int) -> float:
-        df = pd.DataFrame({"y": feature.y}, index=feature.x)
+    def get_feature_std(
+        self, feature: "CFTBuoyRawDataUTC", hours: int
+    ) -> Optional[float]:
         cutoff_hour = self.wave_height.x[-1] - hours
-        slice = df[df.index >= cutoff_hour]
-        return slice.y.std()
+        return feature.std_since(cutoff_hour)
 
     def get_wave_height_std(self, hours: int):
         return self.get_feature_std(feature=self.wave_height, hours=hours)
@@ -127,8 +367,7 @@ class CFTBuoyDataDomain:
         return self.get_feature_std(feature=self.period, hours=hours)
 
     def get_feature_at(self, feature: "CFTBuoyRawDataUTC", as_of_hour: float) -> float:
-        df = pd.DataFrame({"y": feature.y}, index=feature.x)
-        return df.iloc[df.index <= as_of_hour].iloc[-1].y
+        return feature.value_at(as_of_hour)
 
     def get_wave_height(self, hours_lag: float):
         as_of_hour = self.wave_height.x[-1] - hours_lag
@@ -156,6 +395,22 @@ class CFTBuoyDataDomain:
             "period": period,
         }
 
+    @classmethod
+    def get_raw_data(cls, orm_obj: "CFTBuoyData", graph: str) -> "CFTBuoyRawDataUTC":
+        encoded, legacy = getattr(orm_obj, f"{graph}_bin"), getattr(orm_obj, graph)
+        if encoded is not None and (
+            legacy is None or not settings.CFT_BUOY_DATA_LEGACY_JSON
+        ):
+            return CFTBuoyRawDataUTC.from_bytes(encoded)
+        if orm_obj.daily_series_id is None:
+            return CFTBuoyRawDataUTC(**legacy)
+        # Compacted, the snapshot saw the beginning of the daily series
+        raw_data = getattr(orm_obj.daily_series, graph)
+        length = orm_obj.series_lengths[graph]
+        return CFTBuoyRawDataUTC(
+            x=raw_data["x"][:length], y=raw_data["y"][:length], unit=raw_data["unit"]
+        )
+
     @classmethod
     def from_orm_obj(cls, orm_obj: "CFTBuoyData"):
         return cls(
@@ -164,25 +419,40 @@ class CFTBuoyDataDomain:
             station=orm_obj.station,
             created=orm_obj.created,
             as_of=orm_obj.as_of,
-            wave_height=CFTBuoyRawDataUTC(**orm_obj.wave_height),
-            period=CFTBuoyRawDataUTC(**orm_obj.period),
-            direction=CFTBuoyRawDataUTC(**orm_obj.direction),
+            wave_height=cls.get_raw_data(orm_obj, "wave_height"),
+            period=cls.get_raw_data(orm_obj, "period"),
+            direction=cls.get_raw_data(orm_obj, "direction"),
         )
 
-    def persist(self, snapshot: "SpotSnapshot") -> "CFTBuoyData":
-        return CFTBuoyData.objects.create(
+    def to_orm_obj(self, snapshot: "Optional[SpotSnapshot]" = None) -> "CFTBuoyData":
+        obj = CFTBuoyData(
             pk=self.pk,
             station_id=self.station.pk,
             as_of=self.as_of,
-            wave_height=self.wave_height.to_dict(),
-            period=self.period.to_dict(),
-            direction=self.direction.to_dict(),
+            wave_height_bin=self.wave_height.to_bytes(),
+            period_bin=self.period.to_bytes(),
+            direction_bin=self.direction.to_bytes(),
             snapshot=snapshot,
         )
+        if settings.CFT_BUOY_DATA_LEGACY_JSON:
+            # Keep writing JSON too so that rows stay readable either way
+            obj.wave_height = self.wave_height.to_dict()
+            obj.period = self.period.to_dict()
+            obj.direction = self.direction.to_dict()
+        return obj
+
+    @classmethod
+    def load_range(
+        cls, station: "CFTBuoyStation", start: datetime, end: datetime
+    ) -> "Optional[CFTBuoyDataDomain]":
+        """Data of `station` published between `start` and `end`, x-axis in hours from `start`."""
+        return CFTBuoyObservationService.load_range(station, start, end)
 
     @classmethod
     def load_for_snapshot(cls, snapshot_id: int):
-        orm_obj = CFTBuoyData.objects.get(snapshot_id=snapshot_id)
+        orm_obj = CFTBuoyData.objects.select_related(
+            "snapshot", "station", "daily_series"
+        ).get(snapshot_id=snapshot_id)
         return cls.from_orm_obj(orm_obj)
 
 
@@ -190,32 +460,332 @@ class CFTBuoyDataSetDomain(List["CFTBuoyDataDomain"]):
     class BuoyDataNotFoundForSpot(Exception):
         pass
 
-    def for_spot(self, spot: "SpotDomain") -> "CFTBuoyDataDomain":
+    def __init__(self, data_set: Iterable["CFTBuoyDataDomain"] = ()):
+        super().__init__(data_set)
+        # Data sets are not added to once fetched, index them upfront
+        self.by_spot: "dict[int, CFTBuoyDataDomain]" = {}
         for data in self:
-            spot_ids = [s.pk for s in data.station.spots_orm]
-            if spot.pk in spot_ids:
-                return data
-        raise self.BuoyDataNotFoundForSpot(f"{spot}")
+            for spot_pk in data.station.spot_pks:
+                self.by_spot.setdefault(spot_pk, data)
+
+    def for_spot(self, spot: "SpotDomain") -> "CFTBuoyDataDomain":
+        try:
+            return self.by_spot[spot.pk]
+        except KeyError:
+            raise self.BuoyDataNotFoundForSpot(f"{spot}")
 
     def for_date(self, date: date) -> "CFTBuoyDataSetDomain":
         return self.__class__([data for data in self if data.as_of.date() == date])
 
 
 class CFTBuoyService:
+    max_workers = 4
+    timeout = 90
+
     @classmethod
     def get_buoy_stations(cls, spots: "SpotSetDomain") -> tuple["CFTBuoyStationDomain"]:
-        qs = CFTBuoyStation.objects.filter(spots__in=[spot.pk for spot in spots])
-        buoy_stations = tuple(
-            CFTBuoyStationDomain.from_orm_obj(orm_obj) for orm_obj in qs
+        """Stations of `spots`, along with which of them they serve."""
+        topology = topology_cache.get()
+        return tuple(
+            CFTBuoyStationDomain(
+                pk=station.pk,
+                station_uid=station.station_uid,
+                spot_pks=topology.station_spot_pks[station.pk],
+            )
+            for station in topology.get_buoy_stations(spot.pk for spot in spots)
         )
-        return buoy_stations
 
     @classmethod
-    def get_current_data(cls, spots: "SpotSetDomain") -> "CFTBuoyDataSetDomain":
+    def fetch_current_data(
+        cls,
+        buoy_stations: tuple["CFTBuoyStationDomain"],
+        max_workers: Optional[int] = None,
+    ) -> "CFTBuoyDataSetDomain":
         now = timezone.now()
-        buoy_stations = cls.get_buoy_stations(spots)
-        data_set = []
-        for buoy_station in buoy_stations:
-            data = buoy_station.take_snapshot(as_of=now)
-            data_set.append(data)
+        data_set = bounded_map(
+            lambda buoy_station: buoy_station.take_snapshot(as_of=now),
+            buoy_stations,
+            max_workers=max_workers or cls.max_workers,
+            timeout=cls.timeout,
+        )
         return CFTBuoyDataSetDomain(data_set)
+
+    @classmethod
+    def get_current_data(cls, spots: "SpotSetDomain") -> "CFTBuoyDataSetDomain":
+        buoy_stations = cls.get_buoy_stations(spots)
+        return cls.fetch_current_data(buoy_stations)
+
+
+@dataclass
+class CFTBuoyCompactionResult:
+    days: int = 0
+    compacted: int = 0
+    skipped: int = 0
+    reclaimed_bytes: int = 0
+
+    def add(self, other: "CFTBuoyCompactionResult"):
+        self.days += other.days
+        self.compacted += other.compacted
+        self.skipped += other.skipped
+        self.reclaimed_bytes += other.reclaimed_bytes
+
+
+class CFTBuoyCompactionService:
+    """Fold the series of past snapshots into one series per station and day.
+
+    Each snapshot stores the series published so far that day, which is the
+    beginning of the series held by the last snapshot of the day. Compacted
+    rows only keep how many datapoints they saw and point at the shared
+    daily series. Rows that are not a prefix of it (upstream revised past
+    datapoints) are left untouched so that compaction never alters data.
+    """
+
+    graphs = ("wave_height", "period", "direction")
+
+    @classmethod
+    def get_size(cls, obj: "CFTBuoyData | CFTBuoyDailySeries") -> int:
+        size = sum(len(json.dumps(getattr(obj, graph))) for graph in cls.graphs)
+        if isinstance(obj, CFTBuoyData):
+            for graph in cls.graphs:
+                encoded = getattr(obj, f"{graph}_bin")
+                size += len(encoded) if encoded is not None else 0
+        return size
+
+    @classmethod
+    def get_series(cls, obj: "CFTBuoyData") -> "dict[str, dict]":
+        return {
+            graph: CFTBuoyDataDomain.get_raw_data(obj, graph).to_dict()
+            for graph in cls.graphs
+        }
+
+    @classmethod
+    def is_prefix(
+        cls, series: "dict[str, dict]", daily_series: "CFTBuoyDailySeries"
+    ) -> bool:
+        for graph in cls.graphs:
+            raw_data, daily = series[graph], getattr(daily_series, graph)
+            length = len(raw_data["x"])
+            if (
+                raw_data["unit"] != daily["unit"]
+                or raw_data["x"] != daily["x"][:length]
+                or raw_data["y"] != daily["y"][:length]
+            ):
+                return False
+        return True
+
+    @classmethod
+    def compact_day(
+        cls, station_id: int, day: date, objs: "list[CFTBuoyData]", dry_run: bool
+    ) -> "CFTBuoyCompactionResult":
+        daily_series = CFTBuoyDailySeries.objects.filter(
+            station_id=station_id, day=day
+        ).first()
+        series = {obj.pk: cls.get_series(obj) for obj in objs}
+        reclaimed_bytes = 0
+        if daily_series is None:
+            longest = max(
+                series.values(),
+                key=lambda raw_data: sum(len(raw_data[g]["x"]) for g in cls.graphs),
+            )
+            daily_series = CFTBuoyDailySeries(station_id=station_id, day=day, **longest)
+            reclaimed_bytes -= cls.get_size(daily_series)
+
+        compactable = [
+            obj for obj in objs if cls.is_prefix(series[obj.pk], daily_series)
+        ]
+        result = CFTBuoyCompactionResult(
+            days=1,
+            compacted=len(compactable),
+            skipped=len(objs) - len(compactable),
+            reclaimed_bytes=reclaimed_bytes + sum(map(cls.get_size, compactable)),
+        )
+        if dry_run or not compactable:
+            return result
+
+        encoded_fields = [f"{graph}_bin" for graph in cls.graphs]
+        for obj in compactable:
+            obj.series_lengths = {
+                graph: len(series[obj.pk][graph]["x"]) for graph in cls.graphs
+            }
+            obj.daily_series = daily_series
+            for field in [*cls.graphs, *encoded_fields]:
+                setattr(obj, field, None)
+        with transaction.atomic():
+            if daily_series.pk is None:
+                daily_series.save()
+            CFTBuoyData.objects.bulk_update(
+                compactable,
+                ["daily_series", "series_lengths", *cls.graphs, *encoded_fields],
+            )
+        return result
+
+    @classmethod
+    def get_uncompacted(cls, before: datetime) -> "QuerySet[CFTBuoyData]":
+        return CFTBuoyData.objects.filter(
+            as_of__lt=before, daily_series__isnull=True
+        ).order_by("station_id", "as_of")
+
+    @classmethod
+    def compact(
+        cls, before: datetime, dry_run: bool = False, chunk_size: int = 1000
+    ) -> "CFTBuoyCompactionResult":
+        """Compact the rows of every station and day taken before `before`."""
+        qs = cls.get_uncompacted(before)
+        result = CFTBuoyCompactionResult()
+        days = groupby(
+            qs.iterator(chunk_size=chunk_size),
+            key=lambda obj: (obj.station_id, obj.as_of.date()),
+        )
+        for (station_id, day), objs in days:
+            result.add(cls.compact_day(station_id, day, list(objs), dry_run))
+        return result
+
+    @classmethod
+    def drop_legacy_json(
+        cls, dry_run: bool = False, chunk_size: int = 1000
+    ) -> "CFTBuoyCompactionResult":
+        """Clear the JSON series of rows that have the binary encoding too."""
+        if settings.CFT_BUOY_DATA_LEGACY_JSON:
+            return CFTBuoyCompactionResult()
+        qs = CFTBuoyData.objects.filter(
+            wave_height__isnull=False, wave_height_bin__isnull=False
+        )
+        result = CFTBuoyCompactionResult()
+        for obj in qs.only("pk", *cls.graphs).iterator(chunk_size=chunk_size):
+            result.compacted += 1
+            result.reclaimed_bytes += sum(
+                len(json.dumps(getattr(obj, graph))) for graph in cls.graphs
+            )
+        if not dry_run:
+            qs.update(**{graph: None for graph in cls.graphs})
+        return result
+
+
+class CFTBuoyObservationService:
+    """Canonical timeserie of each station, one row per published datapoint.
+
+    Every fetch is upserted so rows hold the last published values, reading
+    a window is a range scan on the (station, timestamp) unique index.
+    """
+
+    fields = {"wave_height": "hm0", "period": "tp", "direction": "dirp"}
+    batch_size = 1000
+
+    @classmethod
+    def get_start_of_day(cls, as_of: datetime) -> datetime:
+        # The x-axis is in hours since midnight UTC, see take_snapshot
+        utc = as_of.astimezone(dt_timezone.utc)
+        return utc.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def to_orm_objs(
+        cls,
+        station_id: int,
+        as_of: datetime,
+        raw_data: "dict[str, CFTBuoyRawDataUTC]",
+    ) -> "list[CFTBuoyObservation]":
+        start_of_day = cls.get_start_of_day(as_of)
+        values: "dict[float, dict[str, Optional[float]]]" = {}
+        for graph, field in cls.fields.items():
+            for x, y in zip(raw_data[graph].x, raw_data[graph].y):
+                is_null = y is None or math.isnan(y)
+                values.setdefault(x, {})[field] = None if is_null else float(y)
+        return [
+            CFTBuoyObservation(
+                station_id=station_id,
+                timestamp=start_of_day + timedelta(seconds=round(x * 3600)),
+                **fields,
+            )
+            for x, fields in values.items()
+        ]
+
+    @classmethod
+    def upsert(cls, objs: "Iterable[CFTBuoyObservation]"):
+        """Insert new datapoints and update the values of known ones.
+
+        A value missing from a fetch, where a graph lacks the datapoint or
+        publishes null, keeps the one stored. Known rows are updated one
+        column at a time, from the rows having a value for it.
+        """
+        # A statement cannot update the same row twice, values are merged
+        unique: "dict[tuple[int, datetime], CFTBuoyObservation]" = {}
+        for obj in objs:
+            key = (obj.station_id, obj.timestamp)
+            if key not in unique:
+                unique[key] = obj
+                continue
+            for field in cls.fields.values():
+                if getattr(obj, field) is not None:
+                    setattr(unique[key], field, getattr(obj, field))
+
+        CFTBuoyObservation.objects.bulk_create(
+            unique.values(), batch_size=cls.batch_size, ignore_conflicts=True
+        )
+        for field in cls.fields.values():
+            CFTBuoyObservation.objects.bulk_create(
+                [obj for obj in unique.values() if getattr(obj, field) is not None],
+                batch_size=cls.batch_size,
+                update_conflicts=True,
+                unique_fields=["station", "timestamp"],
+                update_fields=[field],
+            )
+
+    @classmethod
+    def store_data_set(cls, data_set: "Iterable[CFTBuoyDataDomain]"):
+        objs = []
+        for data in data_set:
+            raw_data = {graph: getattr(data, graph) for graph in cls.fields}
+            objs.extend(cls.to_orm_objs(data.station.pk, data.as_of, raw_data))
+        cls.upsert(objs)
+
+    @classmethod
+    def backfill(cls, chunk_size: int = 500) -> int:
+        """Upsert the datapoints of every stored snapshot, oldest first."""
+        qs = CFTBuoyData.objects.select_related("daily_series").order_by("as_of", "pk")
+        count, objs = 0, []
+        for orm_obj in qs.iterator(chunk_size=chunk_size):
+            raw_data = {
+                graph: CFTBuoyDataDomain.get_raw_data(orm_obj, graph)
+                for graph in cls.fields
+            }
+            objs.extend(cls.to_orm_objs(orm_obj.station_id, orm_obj.as_of, raw_data))
+            count += 1
+            if count % chunk_size == 0:
+                cls.upsert(objs)
+                objs = []
+        cls.upsert(objs)
+        return count
+
+    @classmethod
+    def load_range(
+        cls, station: "CFTBuoyStation", start: datetime, end: datetime
+    ) -> "Optional[CFTBuoyDataDomain]":
+        rows = CFTBuoyObservation.objects.filter(
+            station=station, timestamp__gte=start, timestamp__lt=end
+        ).order_by("timestamp")
+        rows = list(rows.values_list("timestamp", *cls.fields.values()))
+        if not rows:
+            return None
+
+        units = {
+            graph: obj.unit
+            for graph, obj in CFTBuoyStationDomain.get_graphs(start, hours=0).items()
+        }
+        raw_data = {}
+        for index, graph in enumerate(cls.fields, start=1):
+            points = [
+                ((row[0] - start).total_seconds() / 3600, row[index])
+                for row in rows
+                if row[index] is not None
+            ]
+            raw_data[graph] = CFTBuoyRawDataUTC(
+                x=[x for x, _ in points], y=[y for _, y in points], unit=units[graph]
+            )
+        return CFTBuoyDataDomain(
+            pk=None,
+            snapshot=None,
+            station=station,
+            created=None,
+            as_of=end,
+            **raw_data,
+        )
@@ -0,0 +1,76 @@
+# Generated by Django 4.2 on 2026-10-18 10:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cftoscana", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cftbuoydata",
+            name="series_lengths",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="cftbuoydata",
+            name="direction",
+            field=models.JSONField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="cftbuoydata",
+            name="period",
+            field=models.JSONField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="cftbuoydata",
+            name="wave_height",
+            field=models.JSONField(null=True),
+        ),
+        migrations.CreateModel(
+            name="CFTBuoyDailySeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(default=django.utils.timezone.now)),
+                ("day", models.DateField()),
+                ("wave_height", models.JSONField()),
+                ("period", models.JSONField()),
+                ("direction", models.JSONField()),
+                (
+                    "station",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="cftoscana.cftbuoystation",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="cftbuoydata",
+            name="daily_series",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                to="cftoscana.cftbuoydailyseries",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="cftbuoydailyseries",
+            constraint=models.UniqueConstraint(
+                fields=("station", "day"), name="unique_station_daily_series"
+            ),
+        ),
+    ]
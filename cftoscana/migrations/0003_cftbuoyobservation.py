@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18 11:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cftoscana", "0002_cftbuoydailyseries"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CFTBuoyObservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                ("hm0", models.FloatField(null=True)),
+                ("tp", models.FloatField(null=True)),
+                ("dirp", models.FloatField(null=True)),
+                (
+                    "station",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="cftoscana.cftbuoystation",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="cftbuoyobservation",
+            constraint=models.UniqueConstraint(
+                fields=("station", "timestamp"), name="unique_station_observation"
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2 on 2026-10-18 12:00
+
+import numpy as np
+from django.db import migrations, models
+
+GRAPHS = ("wave_height", "period", "direction")
+
+
+def encode(raw_data):
+    # Same layout as CFTBuoyRawDataUTC.to_bytes, frozen here
+    unit = raw_data["unit"].encode()
+    header = bytes([len(unit)]) + unit
+    header += b"\0" * (-len(header) % 8)
+    values = np.concatenate(
+        [
+            np.asarray(raw_data["x"], dtype=np.float64),
+            np.asarray(raw_data["y"], dtype=np.float64),
+        ]
+    )
+    return header + values.astype("<f8").tobytes()
+
+
+def encode_series(apps, schema_editor):
+    # Legacy JSON is kept, see CFT_BUOY_DATA_LEGACY_JSON
+    CFTBuoyData = apps.get_model("cftoscana", "CFTBuoyData")
+    qs = CFTBuoyData.objects.filter(
+        wave_height__isnull=False, wave_height_bin__isnull=True
+    ).only("pk", *GRAPHS)
+    batch = []
+    for obj in qs.iterator(chunk_size=500):
+        for graph in GRAPHS:
+            setattr(obj, f"{graph}_bin", encode(getattr(obj, graph)))
+        batch.append(obj)
+        if len(batch) == 500:
+            CFTBuoyData.objects.bulk_update(batch, [f"{g}_bin" for g in GRAPHS])
+            batch = []
+    CFTBuoyData.objects.bulk_update(batch, [f"{g}_bin" for g in GRAPHS])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cftoscana", "0003_cftbuoyobservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cftbuoydata",
+            name="wave_height_bin",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name="cftbuoydata",
+            name="period_bin",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name="cftbuoydata",
+            name="direction_bin",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.RunPython(encode_series, migrations.RunPython.noop),
+    ]
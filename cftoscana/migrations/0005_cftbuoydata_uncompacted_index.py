@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cftoscana", "0004_cftbuoydata_binary_series"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cftbuoydata",
+            index=models.Index(
+                condition=models.Q(("daily_series__isnull", True)),
+                fields=["station", "as_of"],
+                name="cftbuoydata_uncompacted",
+            ),
+        ),
+    ]
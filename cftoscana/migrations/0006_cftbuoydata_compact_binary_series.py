@@ -0,0 +1,111 @@
+# Generated by Django 4.2 on 2026-10-18 14:00
+
+import numpy as np
+from django.db import migrations
+
+GRAPHS = ("wave_height", "period", "direction")
+
+
+def decode_float64(buffer):
+    # Layout written by 0004: unit and padding on 8 bytes, x and y as float64
+    buffer = memoryview(buffer).cast("B")
+    unit_length = buffer[0]
+    offset = 1 + unit_length + (-(1 + unit_length) % 8)
+    values = np.frombuffer(buffer, dtype="<f8", offset=offset)
+    length = len(values) // 2
+    unit = bytes(buffer[1 : 1 + unit_length]).decode()
+    return values[:length], values[length:], unit
+
+
+def encode_float64(x, y, unit):
+    unit = unit.encode()
+    header = bytes([len(unit)]) + unit
+    header += b"\0" * (-len(header) % 8)
+    return header + np.concatenate([x, y]).astype("<f8").tobytes()
+
+
+def decode(buffer):
+    buffer = memoryview(buffer).cast("B")
+    unit_length = buffer[0]
+    width = buffer[1 + unit_length] & 0x7F
+    y_float64 = buffer[1 + unit_length] & 0x80
+    offset = 2 + unit_length + (-(2 + unit_length) % 4)
+    length, first_minute = map(
+        int, np.frombuffer(buffer, dtype="<u2", count=2, offset=offset)
+    )
+    offset += 4
+    if y_float64:
+        y = np.frombuffer(buffer, dtype="<f8", count=length, offset=offset)
+        offset += 8 * length
+    else:
+        y = np.frombuffer(buffer, dtype="<f4", count=length, offset=offset)
+        y = np.round(y.astype(np.float64), 4)
+        offset += 4 * length
+    if width == 8:
+        x = np.frombuffer(buffer, dtype="<f8", count=length, offset=offset)
+    else:
+        deltas = np.frombuffer(
+            buffer, dtype=f"<u{width}", count=max(length - 1, 0), offset=offset
+        )
+        x = np.concatenate([[first_minute], deltas]).cumsum()[:length] / 60
+    return x, y, bytes(buffer[1 : 1 + unit_length]).decode()
+
+
+def encode(x, y, unit):
+    # Same layout as CFTBuoyRawDataUTC.to_bytes, frozen here
+    minutes = np.rint(x * 60)
+    deltas = np.diff(minutes)
+    if (
+        np.array_equal(minutes / 60, x)
+        and ((minutes >= 0) & (minutes < 2**16)).all()
+        and ((deltas >= 0) & (deltas < 2**16)).all()
+    ):
+        width = 1 if (deltas < 2**8).all() else 2
+        first_minute = int(minutes[0]) if len(minutes) else 0
+        x = deltas.astype(f"<u{width}")
+    else:
+        width, first_minute, x = 8, 0, x.astype("<f8")
+    # float32 only when it restores every reading
+    compact = y.astype("<f4")
+    if np.array_equal(np.round(compact.astype(np.float64), 4), y, equal_nan=True):
+        y_flag, y = 0, compact
+    else:
+        y_flag, y = 0x80, y.astype("<f8")
+    unit = unit.encode()
+    header = bytes([len(unit)]) + unit + bytes([width | y_flag])
+    header += b"\0" * (-len(header) % 4)
+    header += np.array([len(y), first_minute], dtype="<u2").tobytes()
+    return header + y.tobytes() + x.tobytes()
+
+
+def reencode_series(apps, decode_series, encode_series):
+    CFTBuoyData = apps.get_model("cftoscana", "CFTBuoyData")
+    fields = [f"{graph}_bin" for graph in GRAPHS]
+    qs = CFTBuoyData.objects.filter(wave_height_bin__isnull=False).only("pk", *fields)
+    batch = []
+    for obj in qs.iterator(chunk_size=500):
+        for field in fields:
+            setattr(obj, field, encode_series(*decode_series(getattr(obj, field))))
+        batch.append(obj)
+        if len(batch) == 500:
+            CFTBuoyData.objects.bulk_update(batch, fields)
+            batch = []
+    CFTBuoyData.objects.bulk_update(batch, fields)
+
+
+def compact_series(apps, schema_editor):
+    reencode_series(apps, decode_float64, encode)
+
+
+def expand_series(apps, schema_editor):
+    reencode_series(apps, decode, encode_float64)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cftoscana", "0005_cftbuoydata_uncompacted_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_series, expand_series),
+    ]
@@ -22,14 +22,78 @@ class CFTBuoyStation(models.Model):
         return f"{dict(Stations.choices)[self.station_uid]} - {self.station_uid}"
 
 
-class CFTBuoyData(models.Model):
+class CFTBuoyDailySeries(models.Model):
+    """Full day of data of a station, shared by the compacted snapshots of the day"""
+
     created = models.DateTimeField(default=timezone.now)
-    snapshot = models.ForeignKey("spots.SpotSnapshot", on_delete=models.CASCADE)
-    as_of = models.DateTimeField()
     station = models.ForeignKey(CFTBuoyStation, on_delete=models.PROTECT)
+    day = models.DateField()
     wave_height = models.JSONField()
     period = models.JSONField()
     direction = models.JSONField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["station", "day"], name="unique_station_daily_series"
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{dict(Stations.choices)[self.station.station_uid]} {self.day} #{self.pk}"
+        )
+
+
+class CFTBuoyObservation(models.Model):
+    """Datapoint of a station, as last published"""
+
+    station = models.ForeignKey(CFTBuoyStation, on_delete=models.PROTECT)
+    timestamp = models.DateTimeField()
+    hm0 = models.FloatField(null=True)  # Significant wave height
+    tp = models.FloatField(null=True)  # Peak period
+    dirp = models.FloatField(null=True)  # Peak direction
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["station", "timestamp"], name="unique_station_observation"
+            )
+        ]
+
+    def __str__(self):
+        return f"{dict(Stations.choices)[self.station.station_uid]} {self.timestamp} #{self.pk}"
+
+
+class CFTBuoyData(models.Model):
+    created = models.DateTimeField(default=timezone.now)
+    snapshot = models.ForeignKey("spots.SpotSnapshot", on_delete=models.CASCADE)
+    as_of = models.DateTimeField()
+    station = models.ForeignKey(CFTBuoyStation, on_delete=models.PROTECT)
+    # Legacy JSON encoding, see CFT_BUOY_DATA_LEGACY_JSON
+    wave_height = models.JSONField(null=True)
+    period = models.JSONField(null=True)
+    direction = models.JSONField(null=True)
+    # Encoded by CFTBuoyRawDataUTC.to_bytes
+    wave_height_bin = models.BinaryField(null=True)
+    period_bin = models.BinaryField(null=True)
+    direction_bin = models.BinaryField(null=True)
+    # Set once compacted, the series are then the first `series_lengths`
+    # datapoints of the daily series
+    daily_series = models.ForeignKey(
+        CFTBuoyDailySeries, null=True, blank=True, on_delete=models.PROTECT
+    )
+    series_lengths = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Rows left to compact, see CFTBuoyCompactionService
+            models.Index(
+                fields=["station", "as_of"],
+                condition=models.Q(daily_series__isnull=True),
+                name="cftbuoydata_uncompacted",
+            ),
+        ]
+
     def __str__(self):
         return f"{dict(Stations.choices)[self.station.station_uid]} {self.created} #{self.pk}"
@@ -0,0 +1,55 @@
+from datetime import date
+from unittest.mock import patch
+
+import responses
+from django.conf import settings as django_settings
+from django.test import TestCase
+from django.utils import timezone
+
+from cftoscana.cache import CFTBuoyRawDataCache
+from cftoscana.domain import CFTBuoyRawDataUTC
+from spots.models import SpotSnapshot
+from spots.tests.mixins import SpotSetProvidersMixin, run_in_process
+from surfin import settings
+
+
+class CFTBuoyRawDataCacheTestCase(SpotSetProvidersMixin, TestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_buoy_data_reused_within_the_hour(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        now = timezone.now().replace(minute=10)
+        with patch("cftoscana.domain.timezone.now", return_value=now):
+            for _ in range(2):
+                with responses.RequestsMock(
+                    assert_all_requests_are_fired=False
+                ) as rsps:
+                    self.add_responses(rsps)
+                    self.spots.take_snapshots(cached=False)
+
+        self.assertEqual(SpotSnapshot.objects.count(), 2)
+        self.assertEqual(mock_get_station_data.call_count, 3)
+
+    def test_buoy_data_reused_across_processes(self):
+        run_in_process(
+            """
+            from datetime import date
+
+            from cftoscana.cache import CFTBuoyRawDataCache
+            from cftoscana.domain import CFTBuoyRawDataUTC
+
+            raw_data = {"wave_height": CFTBuoyRawDataUTC(x=[0], y=[1.5], unit="m")}
+            CFTBuoyRawDataCache.set("station", date(2026, 10, 18), 9, raw_data)
+            """
+        )
+
+        raw_data = CFTBuoyRawDataCache.get("station", date(2026, 10, 18), 9)
+        self.assertEqual(
+            raw_data, {"wave_height": CFTBuoyRawDataUTC(x=[0], y=[1.5], unit="m")}
+        )
+
+    def test_tests_cache_apart(self):
+        # Clearing it leaves the deployment's cache alone, see surfin.testrunner
+        self.assertNotEqual(
+            django_settings.CACHES["default"]["LOCATION"],
+            settings.CACHES["default"]["LOCATION"],
+        )
@@ -0,0 +1,51 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import responses
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from cftoscana.domain import CFTBuoyCompactionService, CFTBuoyDataDomain
+from cftoscana.models import CFTBuoyDailySeries, CFTBuoyData
+from spots.analytics.domain import SpotSnapshotTimeserieV1
+from spots.tests.mixins import SpotSetProvidersMixin
+
+
+class CFTBuoyCompactionTestCase(SpotSetProvidersMixin, TestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_buoy_data_compaction(self, mock_get_station_data):
+        for length in (3, 4, 5):
+            cache.clear()
+            mock_get_station_data.return_value = {
+                "x": list(range(length)),
+                "y": [float(i) for i in range(length)],
+            }
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                self.add_responses(rsps)
+                snapshots = self.spots.take_snapshots()
+
+        from_date = snapshots[0].created - timedelta(days=1)
+        before = SpotSnapshotTimeserieV1.build_for_spot(
+            self.spot, from_date, use_store=False
+        )
+        loaded_before = [CFTBuoyDataDomain.load_for_snapshot(s.id) for s in before]
+        self.assertEqual(len(before), 3)
+
+        result = CFTBuoyCompactionService.compact(
+            before=timezone.now() + timedelta(days=1)
+        )
+        self.assertEqual((result.days, result.compacted, result.skipped), (1, 3, 0))
+        self.assertEqual(CFTBuoyDailySeries.objects.count(), 1)
+        self.assertFalse(CFTBuoyData.objects.filter(wave_height__isnull=False))
+
+        after = SpotSnapshotTimeserieV1.build_for_spot(
+            self.spot, from_date, use_store=False
+        )
+        self.assertEqual(
+            [s.to_record() for s in before], [s.to_record() for s in after]
+        )
+        self.assertEqual(
+            loaded_before,
+            [CFTBuoyDataDomain.load_for_snapshot(s.id) for s in before],
+        )
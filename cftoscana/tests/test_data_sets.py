@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from cftoscana.domain import (
+    CFTBuoyDataDomain,
+    CFTBuoyDataSetDomain,
+    CFTBuoyRawDataUTC,
+    CFTBuoyStationDomain,
+)
+from spots.domain import SpotDomain
+
+
+def get_spot(pk: int) -> SpotDomain:
+    return SpotDomain(pk=pk, name=f"spot {pk}", lat="0", lon="0")
+
+
+class CFTBuoyDataSetTestCase(SimpleTestCase):
+    def get_data(self, pk: int, spot_pks: "tuple[int, ...]") -> CFTBuoyDataDomain:
+        raw_data = CFTBuoyRawDataUTC(x=[0, 1], y=[0.5, 1.0], unit="m")
+        return CFTBuoyDataDomain(
+            pk=None,
+            snapshot=None,
+            station=CFTBuoyStationDomain(pk=pk, station_uid="", spot_pks=spot_pks),
+            created=None,
+            as_of=datetime(2024, 4, 20, 2, tzinfo=timezone.utc),
+            wave_height=raw_data,
+            period=raw_data,
+            direction=raw_data,
+        )
+
+    def test_indexed_by_spot(self):
+        first = self.get_data(pk=1, spot_pks=(1, 2))
+        second = self.get_data(pk=2, spot_pks=(2, 3))
+        data_set = CFTBuoyDataSetDomain([first, second])
+
+        self.assertIs(data_set.for_spot(get_spot(1)), first)
+        # Spots served by more than one station get the first one
+        self.assertIs(data_set.for_spot(get_spot(2)), first)
+        self.assertIs(data_set.for_spot(get_spot(3)), second)
+        with self.assertRaises(CFTBuoyDataSetDomain.BuoyDataNotFoundForSpot):
+            data_set.for_spot(get_spot(4))
+
+    def test_for_date_keeps_the_index(self):
+        data_set = CFTBuoyDataSetDomain([self.get_data(pk=1, spot_pks=(1,))])
+
+        same_day = data_set.for_date(datetime(2024, 4, 20).date())
+        other_day = data_set.for_date(datetime(2024, 4, 21).date())
+
+        self.assertEqual(same_day.for_spot(get_spot(1)).station.pk, 1)
+        self.assertEqual(other_day.by_spot, {})
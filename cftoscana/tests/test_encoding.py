@@ -0,0 +1,98 @@
+import uuid
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from cftoscana.domain import CFTBuoyDataDomain, CFTBuoyRawDataUTC
+from cftoscana.models import CFTBuoyData
+
+
+class CFTBuoyRawDataEncodingTestCase(SimpleTestCase):
+    def assertRoundTrip(self, raw_data: CFTBuoyRawDataUTC):
+        decoded = CFTBuoyRawDataUTC.from_bytes(raw_data.to_bytes())
+        self.assertEqual(decoded.to_dict(), raw_data.to_dict())
+
+    def test_round_trip(self):
+        self.assertRoundTrip(
+            CFTBuoyRawDataUTC(
+                x=[0, 0.5, 1, 9 + 1 / 6, 23.5],
+                y=[1.23, None, 2.5, 359.9, 0.01],
+                unit="deg",
+            )
+        )
+        self.assertRoundTrip(CFTBuoyRawDataUTC(x=[], y=[], unit="m"))
+        # Gaps longer than 255 minutes
+        self.assertRoundTrip(CFTBuoyRawDataUTC(x=[0, 6, 23], y=[1, 2, 3], unit="s"))
+        # Off the minute grid, x is kept as is
+        self.assertRoundTrip(
+            CFTBuoyRawDataUTC(x=[0.123, 1.0001], y=[1.0, 2.0], unit="s")
+        )
+
+    def test_precise_readings_kept(self):
+        x = [i / 2 for i in range(48)]
+        compact = CFTBuoyRawDataUTC(x=x, y=[1.2345] * 48, unit="m")
+        # More than Y_DECIMALS decimals, or beyond what float32 restores
+        for y in (1.23456, 123456.7):
+            raw_data = CFTBuoyRawDataUTC(x=x, y=[1.2345] * 47 + [y], unit="m")
+            decoded = CFTBuoyRawDataUTC.from_bytes(raw_data.to_bytes())
+            self.assertEqual(decoded.y[-1], y)
+            # y stored as float64 rather than rounded
+            self.assertEqual(len(raw_data.to_bytes()) - len(compact.to_bytes()), 4 * 48)
+
+    def test_day_fits_in_a_quarter(self):
+        x = [i / 2 for i in range(48)]
+        raw_data = CFTBuoyRawDataUTC(x=x, y=[1.23] * 48, unit="m")
+        # float64 x and y
+        self.assertLess(len(raw_data.to_bytes()), 2 * 48 * 8 / 3)
+
+
+class CFTBuoyDataMigrationTestCase(TransactionTestCase):
+    migrate_from = [("cftoscana", "0003_cftbuoyobservation")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.migrate_to = executor.loader.graph.leaf_nodes()
+        executor.migrate(self.migrate_from)
+        # Other apps stay migrated
+        state = self.migrate_from + [
+            node for node in self.migrate_to if node[0] != "cftoscana"
+        ]
+        self.apps = executor.loader.project_state(state).apps
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.migrate_to)
+
+    @override_settings(CFT_BUOY_DATA_LEGACY_JSON=False)
+    def test_legacy_json_encoded(self):
+        raw_data = {"x": [0, 0.5, 1.0], "y": [1.2, None, 1.35], "unit": "m"}
+        # Not rounded to Y_DECIMALS on the way
+        precise_data = {**raw_data, "y": [1.2, None, 1.23456]}
+        spot = self.apps.get_model("spots", "Spot").objects.create(
+            uid=uuid.uuid4(), name="spot", lat="0", lon="0"
+        )
+        snapshot = self.apps.get_model("spots", "SpotSnapshot").objects.create(
+            spot=spot
+        )
+        station = self.apps.get_model("cftoscana", "CFTBuoyStation").objects.create(
+            station_uid="station"
+        )
+        self.apps.get_model("cftoscana", "CFTBuoyData").objects.create(
+            snapshot=snapshot,
+            station=station,
+            as_of=timezone.now(),
+            wave_height=raw_data,
+            period=raw_data,
+            direction=precise_data,
+        )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+
+        obj = CFTBuoyData.objects.get()
+        self.assertIsNotNone(obj.wave_height_bin)
+        data = CFTBuoyDataDomain.from_orm_obj(obj)
+        self.assertEqual(data.wave_height.to_dict(), raw_data)
+        self.assertEqual(data.period.to_dict(), raw_data)
+        self.assertEqual(data.direction.to_dict(), precise_data)
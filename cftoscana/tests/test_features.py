@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from cftoscana.domain import (
+    CFTBuoyDataDomain,
+    CFTBuoyFeatureMatrix,
+    CFTBuoyRawDataUTC,
+    CFTBuoyStationDomain,
+)
+
+
+class CFTBuoyFeatureMatrixTestCase(SimpleTestCase):
+    def get_data(self, x: "list[float]", y: "list[float]") -> CFTBuoyDataDomain:
+        return CFTBuoyDataDomain(
+            pk=None,
+            snapshot=None,
+            station=CFTBuoyStationDomain(pk=1, station_uid="", spot_pks=(1,)),
+            created=None,
+            as_of=datetime(2024, 4, 20, 12, tzinfo=timezone.utc),
+            wave_height=CFTBuoyRawDataUTC(x=x, y=y, unit="m"),
+            period=CFTBuoyRawDataUTC(x=x, y=[v and v * 3 for v in y], unit="s"),
+            direction=CFTBuoyRawDataUTC(x=x, y=[v and v * 90 for v in y], unit="deg"),
+        )
+
+    def assert_std_equal(self, values: np.ndarray, expected: list):
+        # Bit for bit, NaN and None included
+        self.assertEqual(
+            [None if v is None else np.float64(v).tobytes() for v in values],
+            [None if v is None else np.float64(v).tobytes() for v in expected],
+        )
+
+    def test_std_matches_per_snapshot(self):
+        rng = np.random.default_rng(0)
+        buoys = []
+        for _ in range(300):
+            length = int(rng.integers(1, 48))
+            x = np.sort(rng.choice(np.arange(0, 24, 1 / 6), length, replace=False))
+            y = rng.uniform(0.1, 4, length).round(2)
+            y[rng.random(length) < 0.1] = np.nan
+            buoys.append(self.get_data(x.tolist(), y.tolist()))
+        matrix = CFTBuoyFeatureMatrix(buoys)
+
+        for feature in ("wave_height", "period", "direction"):
+            values, has_value = matrix.get_std(feature, hours=2)
+            expected = [getattr(b, f"get_{feature}_std")(hours=2) for b in buoys]
+            self.assert_std_equal(values, expected)
+            self.assertTrue(has_value.all())
+
+    def test_std_of_short_windows(self):
+        buoys = [
+            self.get_data([], []),
+            self.get_data([0.0], [1.0]),
+            # Only the last datapoint within the last 2 hours
+            self.get_data([0.0, 5.0], [1.0, 2.0]),
+            self.get_data([0.0, 0.5, 1.0], [1.0, float("nan"), 2.0]),
+            self.get_data([0.0, 0.5], [None, None]),
+        ]
+        matrix = CFTBuoyFeatureMatrix(buoys)
+
+        values, has_value = matrix.get_std("wave_height", hours=2)
+
+        self.assertEqual(has_value.tolist(), [False, True, True, True, True])
+        self.assertIsNone(values[0])
+        self.assert_std_equal(
+            values[1:], [b.get_wave_height_std(hours=2) for b in buoys[1:]]
+        )
+        self.assertTrue(np.isnan(values[1:3].astype(float)).all())
+        self.assertIsNone(values[4])
@@ -0,0 +1,54 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
+
+import responses
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from cftoscana.domain import CFTBuoyDataDomain, CFTBuoyObservationService
+from cftoscana.models import CFTBuoyObservation
+from spots.tests.mixins import SpotSetProvidersMixin
+
+
+class CFTBuoyObservationTestCase(SpotSetProvidersMixin, TestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_buoy_observations_upserted(self, mock_get_station_data):
+        for y in ([0, 1, 2], [0, 1.5, 2, 3]):
+            cache.clear()
+            x = list(range(len(y)))
+            mock_get_station_data.return_value = {"x": x, "y": y}
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                self.add_responses(rsps)
+                data = self.spots.take_snapshots()
+
+        self.assertEqual(CFTBuoyObservation.objects.count(), 4)
+        start_of_day = CFTBuoyObservationService.get_start_of_day(data[0].created)
+        buoy_data = CFTBuoyDataDomain.load_range(
+            self.buoy_station_orm, start_of_day, timezone.now()
+        )
+        self.assertEqual(buoy_data.wave_height.x, [0, 1, 2, 3])
+        self.assertEqual(buoy_data.wave_height.y, [0, 1.5, 2, 3])
+        self.assertEqual(buoy_data.direction.y, [0, 1.5, 2, 3])
+
+    def test_missing_values_kept(self):
+        timestamp = datetime(2024, 4, 20, 9, tzinfo=dt_timezone.utc)
+
+        def get_obj(hm0, tp, dirp):
+            return CFTBuoyObservation(
+                station_id=self.buoy_station_orm.pk,
+                timestamp=timestamp,
+                hm0=hm0,
+                tp=tp,
+                dirp=dirp,
+            )
+
+        CFTBuoyObservationService.upsert([get_obj(1.0, 7.0, 180.0)])
+        CFTBuoyObservationService.upsert(
+            # Merged within a fetch too
+            [get_obj(None, 8.0, None), get_obj(None, None, 190.0)]
+        )
+
+        obj = CFTBuoyObservation.objects.get()
+        self.assertEqual((obj.hm0, obj.tp, obj.dirp), (1.0, 8.0, 190.0))
@@ -0,0 +1,31 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
+
+from cft_buoy_data_extractor.constants import Station
+from django.test import SimpleTestCase
+
+from cftoscana.domain import CFTBuoyStationDomain
+from surfin.http import get_session
+
+
+class CFTBuoyStationDomainTestCase(SimpleTestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor")
+    def test_graphs_fetched_through_pooled_session(self, mock_extractor):
+        mock_extractor.return_value.get_station_data.return_value = {
+            "x": [0, 1],
+            "y": [1.0, 1.5],
+        }
+        station = CFTBuoyStationDomain(
+            pk=1, station_uid=Station.BOA_GORGONA, spot_pks=(1,)
+        )
+        as_of = datetime(2026, 10, 18, 9, tzinfo=dt_timezone.utc)
+
+        raw_data = station.fetch_graphs(as_of=as_of, hours=9)
+
+        self.assertEqual(mock_extractor.call_count, 3)
+        for call in mock_extractor.call_args_list:
+            # Built the way the extractor takes it, session set afterwards
+            self.assertEqual(set(call.kwargs), {"station", "graph"})
+        self.assertIs(mock_extractor.return_value.session, get_session())
+        self.assertEqual(raw_data["period"].to_dict()["y"], [1.0, 1.5])
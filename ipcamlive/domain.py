@@ -1,13 +1,23 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Optional
 
-import requests
 from django.core.files import File
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 
 from ipcamlive.models import IPCamLiveData, IPCamLiveWebcam
+from spots.topology.domain import topology_cache
+from surfin.concurrency import bounded_map
+from surfin.derivatives import DerivativeUrls
+from surfin.previews import (
+    Preview,
+    PreviewDownload,
+    attach_preview,
+    fetch_preview,
+    get_cached_file,
+    share_stored_preview,
+)
 
 if TYPE_CHECKING:
     from spots.domain import SpotDomain, SpotSetDomain
@@ -32,21 +42,28 @@ class IPCamLiveWebcamDomain:
             spot=orm_obj.spot,
         )
 
-    def get_preview(self):
+    def get_preview(self, last: Optional[Preview] = None) -> Preview:
         url = f"https://ipcamlive.com/player/snapshot.php?alias={self.alias}"
-        return requests.get(url, allow_redirects=True).content
+        return fetch_preview(
+            url,
+            filename="ipcamlive.jpg",
+            last=last,
+            allow_redirects=True,
+        )
 
-    def fetch_data(self):
-        raw_preview = self.get_preview()
-        tmp_file = NamedTemporaryFile()
-        tmp_file.write(raw_preview)
-        preview = File(tmp_file)
+    def fetch_data(self, last_data: "Optional[IPCamLiveDataDomain]" = None):
+        last = last_data.to_preview() if last_data is not None else None
+        preview = self.get_preview(last=last)
         return IPCamLiveDataDomain(
             pk=None,
             snapshot=None,
             created=timezone.now(),
             webcam=self,
-            preview=preview,
+            preview=preview.file,
+            preview_sha256=preview.sha256,
+            etag=preview.etag,
+            last_modified=preview.last_modified,
+            download=preview.download,
         )
 
 
@@ -54,11 +71,18 @@ class IPCamLiveDataSetDomain(list[IPCamLiveWebcamDomain]):
     class IPCamLiveDataNotFoundForSpot(Exception):
         pass
 
-    def for_spot(self, spot: "SpotDomain") -> "IPCamLiveDataDomain":
+    def __init__(self, data_set: Iterable["IPCamLiveDataDomain"] = ()):
+        super().__init__(data_set)
+        # Data sets are not added to once fetched, index them upfront
+        self.by_spot: "dict[int, IPCamLiveDataDomain]" = {}
         for data in self:
-            if spot.pk == data.webcam.spot.pk:
-                return data
-        raise self.IPCamLiveDataNotFoundForSpot(f"{spot}")
+            self.by_spot.setdefault(data.webcam.spot.pk, data)
+
+    def for_spot(self, spot: "SpotDomain") -> "IPCamLiveDataDomain":
+        try:
+            return self.by_spot[spot.pk]
+        except KeyError:
+            raise self.IPCamLiveDataNotFoundForSpot(f"{spot}")
 
 
 @dataclass
@@ -68,12 +92,24 @@ class IPCamLiveDataDomain:
     created: datetime
     webcam: "IPCamLiveWebcam"
     preview: File
+    preview_sha256: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    download: Optional[PreviewDownload] = field(default=None, compare=False)
+
+    def to_preview(self) -> Preview:
+        return Preview(
+            file=get_cached_file(self.preview),
+            sha256=self.preview_sha256,
+            etag=self.etag,
+            last_modified=self.last_modified,
+        )
 
     def to_assessment_view(self):
         return {
             "created": self.created,
             "webcam": self.webcam,
-            "preview": self.preview.url,
+            "preview": DerivativeUrls(self.preview),
         }
 
     @classmethod
@@ -84,16 +120,22 @@ class IPCamLiveDataDomain:
             created=orm_obj.created,
             webcam=orm_obj.webcam,
             preview=orm_obj.preview,
+            preview_sha256=orm_obj.preview_sha256,
+            etag=orm_obj.etag,
+            last_modified=orm_obj.last_modified,
         )
 
-    def persist(self, snapshot: "SpotSnapshot") -> IPCamLiveData:
+    def to_orm_obj(self, snapshot: "Optional[SpotSnapshot]" = None) -> IPCamLiveData:
         obj = IPCamLiveData(
             created=self.created,
             snapshot=snapshot,
             webcam_id=self.webcam.pk,
+            preview_sha256=self.preview_sha256,
+            etag=self.etag,
+            last_modified=self.last_modified,
         )
-        obj.preview.save(name="ipcamlive.jpg", content=self.preview)
-        return self.from_orm_obj(obj)
+        attach_preview(obj.preview, self.preview, name="ipcamlive.jpg")
+        return obj
 
     @classmethod
     def load_for_snapshot(cls, snapshot_id: int):
@@ -102,12 +144,58 @@ class IPCamLiveDataDomain:
 
 
 class IPCamLiveService:
+    max_workers = 8
+    timeout = 60
+
     @classmethod
-    def get_current_data(cls, spots: "SpotSetDomain") -> "IPCamLiveDataSetDomain":
-        webcams = IPCamLiveWebcam.objects.filter(spot__in=[s.pk for s in spots])
-        data_set = []
-        for webcam in webcams:
-            iplivecam = IPCamLiveWebcamDomain.from_orm_obj(webcam)
-            data = iplivecam.fetch_data()
-            data_set.append(data)
+    def get_webcams(cls, spots: "SpotSetDomain") -> "list[IPCamLiveWebcamDomain]":
+        webcams = topology_cache.get().get_ipcamlive_webcams(s.pk for s in spots)
+        return [IPCamLiveWebcamDomain.from_orm_obj(webcam) for webcam in webcams]
+
+    @classmethod
+    def get_last_data(
+        cls, webcams: "list[IPCamLiveWebcamDomain]"
+    ) -> "dict[int, IPCamLiveDataDomain]":
+        """Latest data of each webcam, to revalidate its preview against."""
+        last_data_ids = IPCamLiveWebcam.objects.filter(
+            pk__in=[webcam.pk for webcam in webcams]
+        ).annotate(
+            last_data_id=Subquery(
+                IPCamLiveData.objects.filter(webcam=OuterRef("pk"))
+                .order_by("-pk")
+                .values("pk")[:1]
+            )
+        )
+        qs = IPCamLiveData.objects.filter(
+            pk__in=last_data_ids.values("last_data_id")
+        ).select_related("snapshot", "webcam")
+        return {obj.webcam_id: IPCamLiveDataDomain.from_orm_obj(obj) for obj in qs}
+
+    @classmethod
+    def share_stored_previews(cls, data_set: "IPCamLiveDataSetDomain"):
+        """Frames unchanged since the last stored data share its preview."""
+        last_data = cls.get_last_data([data.webcam for data in data_set])
+        for data in data_set:
+            share_stored_preview(data, last_data.get(data.webcam.pk))
+
+    @classmethod
+    def fetch_current_data(
+        cls,
+        webcams: "list[IPCamLiveWebcamDomain]",
+        max_workers: Optional[int] = None,
+        last_data: "Optional[dict[int, IPCamLiveDataDomain]]" = None,
+    ) -> "IPCamLiveDataSetDomain":
+        last_data = last_data or {}
+        data_set = bounded_map(
+            lambda webcam: webcam.fetch_data(last_data=last_data.get(webcam.pk)),
+            webcams,
+            max_workers=max_workers or cls.max_workers,
+            timeout=cls.timeout,
+        )
         return IPCamLiveDataSetDomain(data_set)
+
+    @classmethod
+    def get_current_data(cls, spots: "SpotSetDomain") -> "IPCamLiveDataSetDomain":
+        webcams = cls.get_webcams(spots)
+        last_data = cls.get_last_data(webcams)
+        return cls.fetch_current_data(webcams, last_data=last_data)
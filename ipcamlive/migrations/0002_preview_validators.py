@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ipcamlive", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ipcamlivedata",
+            name="etag",
+            field=models.CharField(blank=True, default="", max_length=1000),
+        ),
+        migrations.AddField(
+            model_name="ipcamlivedata",
+            name="last_modified",
+            field=models.CharField(blank=True, default="", max_length=1000),
+        ),
+        migrations.AddField(
+            model_name="ipcamlivedata",
+            name="preview_sha256",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ipcamlive", "0003_preview_blank"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ipcamlivedata",
+            index=models.Index(
+                fields=["webcam", "-id"], name="ipcamlivedata_webcam_latest"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ipcamlivedata",
+            index=models.Index(
+                condition=models.Q(("preview", ""), _negated=True),
+                fields=["created"],
+                name="ipcamlivedata_preview_created",
+            ),
+        ),
+    ]
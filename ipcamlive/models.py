@@ -18,4 +18,20 @@ class IPCamLiveData(models.Model):
     created = models.DateTimeField(default=timezone.now)
     snapshot = models.ForeignKey("spots.SpotSnapshot", on_delete=models.CASCADE)
     webcam = models.ForeignKey(IPCamLiveWebcam, on_delete=models.PROTECT)
-    preview = models.ImageField(upload_to=settings.IPCAMLIVE_ROOT)
+    preview = models.ImageField(upload_to=settings.IPCAMLIVE_ROOT, blank=True)
+    # Identical frames share the same stored preview
+    preview_sha256 = models.CharField(max_length=64, blank=True, default="")
+    etag = models.CharField(max_length=1000, blank=True, default="")
+    last_modified = models.CharField(max_length=1000, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Latest data of a webcam
+            models.Index(fields=["webcam", "-id"], name="ipcamlivedata_webcam_latest"),
+            # Previews still stored, see PreviewRetentionService
+            models.Index(
+                fields=["created"],
+                condition=~models.Q(preview=""),
+                name="ipcamlivedata_preview_created",
+            ),
+        ]
@@ -1,13 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
-from typing import TYPE_CHECKING, List, Optional
+from decimal import ROUND_HALF_UP, Decimal
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
 from django.utils import timezone
-from meteonetwork_api.client import MeteoNetworkClient
 
 from meteonetwork.models import MeteoNetworkIRTData
 from surfin import settings
+from surfin.concurrency import bounded_map
+from surfin.http import get_session
 
 if TYPE_CHECKING:
     from spots.domain import SpotDomain, SpotSetDomain
@@ -88,20 +89,40 @@ class MeteoNetworkIRTDataDomain:
             current_radmax=None,
         )
 
-    def persist(self, snapshot: "SpotSnapshot") -> MeteoNetworkIRTData:
-        return MeteoNetworkIRTData.objects.create(
+    @staticmethod
+    def to_decimal(value: Optional[str], field: str) -> Optional[Decimal]:
+        """`value` as `field` stores it, rounded half away from zero like
+        PostgreSQL numeric, so that rows read back the same.
+        """
+        if value is None or value == "":
+            return None
+        decimal_places = MeteoNetworkIRTData._meta.get_field(field).decimal_places
+        return Decimal(value).quantize(
+            Decimal(1).scaleb(-decimal_places), rounding=ROUND_HALF_UP
+        )
+
+    def to_orm_obj(
+        self, snapshot: "Optional[SpotSnapshot]" = None
+    ) -> MeteoNetworkIRTData:
+        decimal_fields = (
+            "temperature",
+            "rh",
+            "dew_point",
+            "daily_rain",
+            "smlp",
+            "wind_direction",
+            "wind_speed",
+            "distance",
+        )
+        return MeteoNetworkIRTData(
             lat=self.lat,
             lon=self.lon,
-            temperature=Decimal(self.temperature),
-            rh=Decimal(self.rh),
-            dew_point=Decimal(self.dew_point),
-            daily_rain=Decimal(self.daily_rain) if self.daily_rain else None,
-            smlp=Decimal(self.smlp),
-            wind_direction=Decimal(self.wind_direction),
             wind_direction_cardinal=self.wind_direction_cardinal,
-            wind_speed=Decimal(self.wind_speed),
-            distance=Decimal(self.distance),
             snapshot=snapshot,
+            **{
+                field: self.to_decimal(getattr(self, field), field)
+                for field in decimal_fields
+            },
         )
 
     @classmethod
@@ -114,10 +135,21 @@ class MeteoNetworkIRTDataDomain:
 class MeteoNetworkService:
     """Interpolated Real Time at location"""
 
+    # Endpoint and auth header of meteonetwork-api-client-python, which it
+    # replaces, keep them in sync with upstream by hand
+    api_url = "https://api.meteonetwork.it/v3/interpolated-realtime/"
+    max_workers = 8
+    timeout = 60
+
     @classmethod
     def fetch_irt_data(cls, spot: "SpotDomain") -> "MeteoNetworkIRTDataDomain":
-        client = MeteoNetworkClient(access_token=settings.METEONETWORK_API_TOKEN)
-        data = client.interpolated_real_time_data(lat=spot.lat, lon=spot.lon)
+        response = get_session().get(
+            cls.api_url,
+            params={"lat": spot.lat, "lon": spot.lon},
+            headers={"Authorization": f"Bearer {settings.METEONETWORK_API_TOKEN}"},
+        )
+        response.raise_for_status()
+        data = response.json()
         # no need lat/lon from api but saving lat/lon input instead!
         data.pop("lat")
         data.pop("lon")
@@ -127,20 +159,35 @@ class MeteoNetworkService:
             created=timezone.now(),
             lat=spot.lat,
             lon=spot.lon,
-            **data
+            **data,
         )
 
     @classmethod
-    def get_current_data(cls, spots: "SpotSetDomain") -> "MeteoNetworkIRTDataSetDomain":
-        data_set: List["MeteoNetworkIRTDataDomain"] = []
-        for spot in spots:
-            data = cls.fetch_irt_data(spot)
-            data_set.append(data)
+    def fetch_current_data(
+        cls, spots: "SpotSetDomain", max_workers: Optional[int] = None
+    ) -> "MeteoNetworkIRTDataSetDomain":
+        data_set: List["MeteoNetworkIRTDataDomain"] = bounded_map(
+            cls.fetch_irt_data,
+            spots,
+            max_workers=max_workers or cls.max_workers,
+            timeout=cls.timeout,
+        )
         return MeteoNetworkIRTDataSetDomain(data_set)
 
+    @classmethod
+    def get_current_data(cls, spots: "SpotSetDomain") -> "MeteoNetworkIRTDataSetDomain":
+        return cls.fetch_current_data(spots)
+
 
 class MeteoNetworkIRTDataSetDomain(List["MeteoNetworkIRTDataDomain"]):
+    def __init__(self, data_set: Iterable["MeteoNetworkIRTDataDomain"] = ()):
+        super().__init__(data_set)
+        # Data is fetched by location, spots are told apart by theirs
+        self.by_location: "dict[tuple[str, str], list[MeteoNetworkIRTDataDomain]]" = {}
+        for data in self:
+            self.by_location.setdefault((data.lat, data.lon), []).append(data)
+
     def for_spot(self, spot: "SpotDomain") -> "MeteoNetworkIRTDataDomain":
-        data = [data for data in self if data.lat == spot.lat and data.lon == spot.lon]
+        data = self.by_location.get((spot.lat, spot.lon), [])
         assert len(data) == 1
         return data[0]
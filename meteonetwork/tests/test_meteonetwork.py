@@ -0,0 +1,47 @@
+import responses
+from django.test import TestCase
+from responses import matchers
+
+from meteonetwork.domain import MeteoNetworkService
+from spots.tests.mixins import SpotSetProvidersMixin
+from surfin import settings
+
+
+class MeteoNetworkServiceTestCase(SpotSetProvidersMixin, TestCase):
+    def add_irt_response(self, rsps, status=200):
+        rsps.add(
+            "GET",
+            MeteoNetworkService.api_url,
+            json=self.meteonetwork_resp,
+            status=status,
+            match=[
+                matchers.query_param_matcher(
+                    {"lat": str(self.spot.lat), "lon": str(self.spot.lon)}
+                ),
+                matchers.header_matcher(
+                    {"Authorization": f"Bearer {settings.METEONETWORK_API_TOKEN}"}
+                ),
+            ],
+        )
+
+    def test_fetch_irt_data(self):
+        with responses.RequestsMock() as rsps:
+            self.add_irt_response(rsps)
+            data = MeteoNetworkService.fetch_irt_data(self.spot)
+            self.assertEqual(
+                rsps.calls[0].request.req_kwargs["timeout"],
+                (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+            )
+
+        # Location of the spot rather than of the interpolation
+        self.assertEqual((data.lat, data.lon), (self.spot.lat, self.spot.lon))
+        self.assertEqual(data.wind_speed, self.meteonetwork_resp["wind_speed"])
+
+    def test_fetch_irt_data_retried(self):
+        with responses.RequestsMock() as rsps:
+            self.add_irt_response(rsps, status=503)
+            self.add_irt_response(rsps)
+            data = MeteoNetworkService.fetch_irt_data(self.spot)
+            self.assertEqual(len(rsps.calls), 2)
+
+        self.assertEqual(data.temperature, self.meteonetwork_resp["temperature"])
@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Optional
+
+from django.core.cache import cache
+
+if TYPE_CHECKING:
+    from cftoscana.domain import CFTBuoyDataDomain
+
+
+@dataclass
+class SpotDayTimeserie:
+    model_version: "tuple[int, int]"
+    last_snapshot_id: Optional[int] = None
+    wss1h: "list[tuple[datetime, float]]" = field(default_factory=list)
+    buoy_data: "Optional[CFTBuoyDataDomain]" = None
+    response: "Optional[list[dict]]" = None
+
+
+class SpotTimeserieCache:
+    """Per spot and day timeserie, built once and extended as snapshots come.
+
+    `take_snapshots` records the latest snapshot of each spot so that, with
+    a cache backend shared across processes, readers can tell the cached
+    day is up to date without touching the database.
+    """
+
+    timeout = 60 * 60 * 26
+
+    @classmethod
+    def get_key(cls, spot_id: int, day: date) -> str:
+        return f"spots:timeserie:{spot_id}:{day.isoformat()}"
+
+    @classmethod
+    def get_latest_key(cls, spot_id: int) -> str:
+        return f"spots:timeserie:{spot_id}:latest"
+
+    @classmethod
+    def get(cls, spot_id: int, day: date) -> Optional["SpotDayTimeserie"]:
+        return cache.get(cls.get_key(spot_id, day))
+
+    @classmethod
+    def set(cls, spot_id: int, day: date, timeserie: "SpotDayTimeserie"):
+        cache.set(cls.get_key(spot_id, day), timeserie, timeout=cls.timeout)
+
+    @classmethod
+    def get_latest_snapshot_id(cls, spot_id: int) -> Optional[int]:
+        return cache.get(cls.get_latest_key(spot_id))
+
+    @classmethod
+    def set_latest_snapshot_id(cls, spot_id: int, snapshot_id: int):
+        cache.set(cls.get_latest_key(spot_id), snapshot_id, timeout=cls.timeout)
@@ -1,31 +1,44 @@
+import heapq
+import os
 import pickle
-from dataclasses import asdict, dataclass
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import TYPE_CHECKING, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import numpy as np
 import pandas as pd
-from django.db.models import F, OuterRef
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db.models import F, OuterRef, QuerySet
+from joblib import parallel_backend
 from pydantic import UUID4
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error
 from sklearn.model_selection import train_test_split
 
-from cftoscana.domain import CFTBuoyDataDomain
-from spots.models import SnapshotAssessment, Spot, SpotSnapshot
+from cftoscana.domain import CFTBuoyDataDomain, CFTBuoyFeatureMatrix
+from cftoscana.models import CFTBuoyDailySeries, CFTBuoyData, CFTBuoyStation
+from spots.models import SnapshotAssessment, SnapshotFeaturesV1, Spot, SpotSnapshot
+from surfin import settings
 
 if TYPE_CHECKING:
     from sklearn.ensemble import RandomForestRegressor
 
-    from spots.domain import SpotDomain
+    from spots.domain import SpotDomain, SpotSnapshotDomain
 
 
 @dataclass
 class SpotSnapshotV1:
     id: int
     created: datetime
-    buoy_data: "CFTBuoyDataDomain"
+    # Raw buoy series, not available when loaded from the feature store
+    buoy_data: "Optional[CFTBuoyDataDomain]"
+    data_delay: timedelta
 
     wave_size_score: Optional[float]
 
@@ -53,8 +66,38 @@ class SpotSnapshotV1:
     wave_hp_lag_2: float
 
     @classmethod
-    def from_orm(cls, snapshot: "SpotSnapshot"):
-        buoy = CFTBuoyDataDomain.load_for_snapshot(snapshot)
+    def get_buoy_data(
+        cls, snapshot: "SpotSnapshot", stations: "dict[int, CFTBuoyStation]"
+    ) -> "CFTBuoyDataDomain":
+        # Buoy data comes annotated on the snapshot, see iter_chunks_for_spot
+        daily_series = None
+        if snapshot.buoy_daily_series_id is not None:
+            daily_series = CFTBuoyDailySeries(
+                pk=snapshot.buoy_daily_series_id,
+                wave_height=snapshot.buoy_daily_wave_height,
+                period=snapshot.buoy_daily_period,
+                direction=snapshot.buoy_daily_direction,
+            )
+        buoy_orm = CFTBuoyData(
+            pk=snapshot.buoy_id,
+            snapshot=snapshot,
+            station=stations[snapshot.buoy_station_id],
+            created=snapshot.buoy_created,
+            as_of=snapshot.buoy_as_of,
+            wave_height=snapshot.buoy_wave_height,
+            period=snapshot.buoy_period,
+            direction=snapshot.buoy_direction,
+            wave_height_bin=snapshot.buoy_wave_height_bin,
+            period_bin=snapshot.buoy_period_bin,
+            direction_bin=snapshot.buoy_direction_bin,
+            daily_series=daily_series,
+            series_lengths=snapshot.buoy_series_lengths,
+        )
+        return CFTBuoyDataDomain.from_orm_obj(buoy_orm)
+
+    @classmethod
+    def from_orm(cls, snapshot: "SpotSnapshot", stations: "dict[int, CFTBuoyStation]"):
+        buoy = cls.get_buoy_data(snapshot, stations=stations)
 
         wave_height_lag_0 = buoy.get_wave_height(hours_lag=0)
         wave_height_lag_1 = buoy.get_wave_height(hours_lag=1)
@@ -68,6 +111,7 @@ class SpotSnapshotV1:
             id=snapshot.pk,
             created=snapshot.created,
             buoy_data=buoy,
+            data_delay=buoy.data_delay,
             wave_size_score=(
                 float(snapshot.wave_size_score)
                 if snapshot.wave_size_score is not None
@@ -92,36 +136,406 @@ class SpotSnapshotV1:
             wave_hp_lag_2=wave_height_lag_2 * period_lag_2,
         )
 
+    @classmethod
+    def get_buoy_features(
+        cls, buoys: "list[CFTBuoyDataDomain]"
+    ) -> "tuple[dict[str, np.ndarray], np.ndarray]":
+        """Buoy features of a batch, along with a mask of the rows having
+        enough buoy data to compute every lag.
+        """
+        matrix = CFTBuoyFeatureMatrix(buoys)
+
+        features = {}
+        valid = np.ones(len(buoys), dtype=bool)
+        for feature in ("wave_height", "period", "direction"):
+            for lag in (0, 1, 2):
+                values, has_value = matrix.get_lag(feature, hours_lag=lag)
+                features[f"{feature}_lag_{lag}"] = values
+                valid &= has_value
+            values, has_value = matrix.get_std(feature, hours=2)
+            features[f"{feature}_std_2h"] = values
+            valid &= has_value
+        for lag in (0, 1, 2):
+            features[f"wave_hp_lag_{lag}"] = (
+                features[f"wave_height_lag_{lag}"] * features[f"period_lag_{lag}"]
+            )
+        return features, valid
+
+    @classmethod
+    def from_orm_batch(
+        cls, snapshots: "list[SpotSnapshot]", stations: "dict[int, CFTBuoyStation]"
+    ) -> "list[SpotSnapshotV1]":
+        """Same as from_orm for many snapshots, buoy features are computed
+        for the whole batch at once. Snapshots without enough buoy data to
+        compute every lag are left out, where from_orm raises IndexError.
+        """
+        buoys = [cls.get_buoy_data(snapshot, stations) for snapshot in snapshots]
+        features, valid = cls.get_buoy_features(buoys)
+        return [
+            cls(
+                id=snapshot.pk,
+                created=snapshot.created,
+                buoy_data=buoy,
+                data_delay=buoy.data_delay,
+                wave_size_score=(
+                    float(snapshot.wave_size_score)
+                    if snapshot.wave_size_score is not None
+                    else None
+                ),
+                wind_direction=float(snapshot.wind_direction),
+                wind_speed=float(snapshot.wind_speed),
+                **{name: values[row] for name, values in features.items()},
+            )
+            for row, (snapshot, buoy) in enumerate(zip(snapshots, buoys))
+            if valid[row]
+        ]
+
+    @classmethod
+    def from_domain_batch(
+        cls, snapshots: "list[SpotSnapshotDomain]"
+    ) -> "list[SpotSnapshotV1]":
+        """Features of freshly taken snapshots, see from_orm_batch"""
+        buoys = [snapshot.cft_buoy_data for snapshot in snapshots]
+        features, valid = cls.get_buoy_features(buoys)
+        return [
+            cls(
+                id=snapshot.pk,
+                created=snapshot.created,
+                buoy_data=buoy,
+                data_delay=buoy.data_delay,
+                wave_size_score=None,
+                wind_direction=float(snapshot.meteonetwork_data.wind_direction),
+                wind_speed=float(snapshot.meteonetwork_data.wind_speed),
+                **{name: values[row] for name, values in features.items()},
+            )
+            for row, (snapshot, buoy) in enumerate(zip(snapshots, buoys))
+            if valid[row]
+        ]
+
+    @classmethod
+    def from_features_orm(cls, snapshot: "SpotSnapshot") -> "SpotSnapshotV1":
+        stored = snapshot.features_v1
+        return cls(
+            id=snapshot.pk,
+            created=snapshot.created,
+            buoy_data=None,
+            data_delay=stored.data_delay,
+            wave_size_score=(
+                float(snapshot.wave_size_score)
+                if snapshot.wave_size_score is not None
+                else None
+            ),
+            **{name: getattr(stored, name) for name in SPOT_SNAPSHOT_V1_FEATURES},
+        )
+
+    def to_features_orm_obj(self) -> "SnapshotFeaturesV1":
+        return SnapshotFeaturesV1(
+            snapshot_id=self.id,
+            data_delay=self.data_delay,
+            **{name: float(getattr(self, name)) for name in SPOT_SNAPSHOT_V1_FEATURES},
+        )
+
     def to_dict(self):
         return asdict(self)
 
+    def to_record(self):
+        """Same as to_dict but without the raw buoy series"""
+        return {
+            field.name: getattr(self, field.name)
+            for field in fields(self)
+            if field.name != "buoy_data"
+        }
+
+
+# Model input columns, in the order the model is trained on
+SPOT_SNAPSHOT_V1_FEATURES = [
+    field.name
+    for field in fields(SpotSnapshotV1)
+    if field.name not in ("id", "created", "buoy_data", "data_delay", "wave_size_score")
+]
+
 
 class SpotSnapshotTimeserieV1(list["SpotSnapshotV1"]):
     @classmethod
-    def build_for_spot(
-        cls, spot: "SpotDomain", from_date: datetime
-    ) -> "SpotSnapshotTimeserieV1":
-        snapshots = SpotSnapshot.objects.filter(
-            spot_id=spot.pk, created__gte=from_date
-        ).annotate(
-            wind_direction=F("meteonetworkirtdata__wind_direction"),
-            wind_speed=F("meteonetworkirtdata__wind_speed"),
+    def get_snapshots(
+        cls, spot: "SpotDomain", from_date: datetime, after_id: Optional[int] = None
+    ) -> "QuerySet[SpotSnapshot]":
+        snapshots = SpotSnapshot.objects.filter(spot_id=spot.pk, created__gte=from_date)
+        if after_id is not None:
+            snapshots = snapshots.filter(id__gt=after_id)
+        return snapshots.annotate(
             wave_size_score=SnapshotAssessment.objects.filter(
                 snapshot=OuterRef("id")
             ).values("wave_size_score"),
+        ).order_by("created", "id")
+
+    @classmethod
+    def iter_stored(
+        cls, snapshots: "QuerySet[SpotSnapshot]", chunk_size: int
+    ) -> Iterator["SpotSnapshotV1"]:
+        snapshots = snapshots.filter(features_v1__isnull=False).select_related(
+            "features_v1"
+        )
+        for snapshot in snapshots.iterator(chunk_size=chunk_size):
+            yield SpotSnapshotV1.from_features_orm(snapshot)
+
+    @classmethod
+    def annotate_computed(
+        cls, snapshots: "QuerySet[SpotSnapshot]"
+    ) -> "QuerySet[SpotSnapshot]":
+        # Partial snapshots lacking buoy or wind data have no features
+        return snapshots.filter(
+            cftbuoydata__isnull=False, meteonetworkirtdata__isnull=False
+        ).annotate(
+            wind_direction=F("meteonetworkirtdata__wind_direction"),
+            wind_speed=F("meteonetworkirtdata__wind_speed"),
+            buoy_id=F("cftbuoydata__id"),
+            buoy_station_id=F("cftbuoydata__station_id"),
+            buoy_created=F("cftbuoydata__created"),
+            buoy_as_of=F("cftbuoydata__as_of"),
+            buoy_wave_height=F("cftbuoydata__wave_height"),
+            buoy_period=F("cftbuoydata__period"),
+            buoy_direction=F("cftbuoydata__direction"),
+            buoy_wave_height_bin=F("cftbuoydata__wave_height_bin"),
+            buoy_period_bin=F("cftbuoydata__period_bin"),
+            buoy_direction_bin=F("cftbuoydata__direction_bin"),
+            buoy_series_lengths=F("cftbuoydata__series_lengths"),
+            buoy_daily_series_id=F("cftbuoydata__daily_series_id"),
+            buoy_daily_wave_height=F("cftbuoydata__daily_series__wave_height"),
+            buoy_daily_period=F("cftbuoydata__daily_series__period"),
+            buoy_daily_direction=F("cftbuoydata__daily_series__direction"),
         )
 
-        spot_assessments = []
+    @classmethod
+    def iter_computed(
+        cls, snapshots: "QuerySet[SpotSnapshot]", chunk_size: int
+    ) -> Iterator["SpotSnapshotV1"]:
+        stations = CFTBuoyStation.objects.in_bulk()
+        snapshots = cls.annotate_computed(snapshots)
+        batch = []
+        for snapshot in snapshots.iterator(chunk_size=chunk_size):
+            batch.append(snapshot)
+            if len(batch) == chunk_size:
+                yield from SpotSnapshotV1.from_orm_batch(batch, stations=stations)
+                batch = []
+        if batch:
+            yield from SpotSnapshotV1.from_orm_batch(batch, stations=stations)
 
-        for snapshot in snapshots:
-            try:
-                spot_assessment = SpotSnapshotV1.from_orm(snapshot)
-            except IndexError:
-                continue
+    @classmethod
+    def iter_chunks_for_spot(
+        cls,
+        spot: "SpotDomain",
+        from_date: datetime,
+        chunk_size: int = 2000,
+        after_id: Optional[int] = None,
+        use_store: bool = True,
+    ) -> Iterator["SpotSnapshotTimeserieV1"]:
+        """Yield the timeserie in chunks of at most `chunk_size` snapshots.
+
+        Features are read from the feature store, snapshots missing there are
+        computed from the raw buoy data, fetched in the same query as the
+        snapshots. Rows are streamed from server-side cursors. Only snapshots
+        newer than `after_id` are included when given.
+        """
+        snapshots = cls.get_snapshots(spot, from_date=from_date, after_id=after_id)
+        if use_store:
+            timeserie = heapq.merge(
+                cls.iter_stored(snapshots, chunk_size=chunk_size),
+                cls.iter_computed(
+                    snapshots.filter(features_v1__isnull=True), chunk_size=chunk_size
+                ),
+                key=lambda snapshot: (snapshot.created, snapshot.id),
+            )
+        else:
+            timeserie = cls.iter_computed(snapshots, chunk_size=chunk_size)
+
+        chunk = cls()
+        for snapshot in timeserie:
+            chunk.append(snapshot)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = cls()
+        if chunk:
+            yield chunk
+
+    @classmethod
+    def build_for_spot(
+        cls,
+        spot: "SpotDomain",
+        from_date: datetime,
+        after_id: Optional[int] = None,
+        use_store: bool = True,
+    ) -> "SpotSnapshotTimeserieV1":
+        timeserie = cls()
+        chunks = cls.iter_chunks_for_spot(
+            spot, from_date=from_date, after_id=after_id, use_store=use_store
+        )
+        for chunk in chunks:
+            timeserie.extend(chunk)
+        return timeserie
+
+
+class SnapshotFeaturesV1Store:
+    @classmethod
+    def store(cls, snapshots: "list[SpotSnapshotV1]") -> int:
+        objs = SnapshotFeaturesV1.objects.bulk_create(
+            [snapshot.to_features_orm_obj() for snapshot in snapshots],
+            ignore_conflicts=True,
+        )
+        return len(objs)
+
+    @classmethod
+    def store_for_snapshots(cls, snapshots: "list[SpotSnapshotDomain]") -> int:
+        snapshots = [
+            snapshot
+            for snapshot in snapshots
+            if snapshot.cft_buoy_data is not None
+            and snapshot.meteonetwork_data is not None
+        ]
+        return cls.store(SpotSnapshotV1.from_domain_batch(snapshots))
+
+    @classmethod
+    def backfill(cls, spot: "SpotDomain", chunk_size: int = 2000) -> int:
+        snapshots = SpotSnapshotTimeserieV1.get_snapshots(
+            spot, from_date=datetime.min
+        ).filter(features_v1__isnull=True)
+        stored = 0
+        timeserie = SpotSnapshotTimeserieV1.iter_computed(snapshots, chunk_size)
+        chunk = []
+        for snapshot in timeserie:
+            chunk.append(snapshot)
+            if len(chunk) == chunk_size:
+                stored += cls.store(chunk)
+                chunk = []
+        if chunk:
+            stored += cls.store(chunk)
+        return stored
+
+
+@dataclass
+class DatasetExportResult:
+    spot: UUID4
+    days: int = 0
+    rows: int = 0
+    bytes_written: int = 0
+
+
+class SpotDatasetV1:
+    """Timeserie of a spot exported to Parquet, one partition per UTC day.
+
+    Files are laid out as `<DATASETS_ROOT>/<spot uid>/date=<day>/part-0.parquet`
+    so that pyarrow reads the directory as a hive partitioned dataset. Only
+    days already over are exported, each partition is written once and later
+    exports start from the day after the last one found on disk.
+    """
+
+    filename = "part-0.parquet"
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("created", pa.timestamp("us", tz="UTC")),
+            ("data_delay", pa.duration("us")),
+            ("wave_size_score", pa.float64()),
+            *((name, pa.float64()) for name in SPOT_SNAPSHOT_V1_FEATURES),
+        ]
+    )
+
+    @classmethod
+    def get_root(cls, spot_uid: UUID4) -> Path:
+        return Path(settings.DATASETS_ROOT) / str(spot_uid)
+
+    @classmethod
+    def get_partition(cls, spot_uid: UUID4, day: date) -> Path:
+        return cls.get_root(spot_uid) / f"date={day.isoformat()}" / cls.filename
+
+    @classmethod
+    def get_exported_days(cls, spot_uid: UUID4) -> "list[date]":
+        root = cls.get_root(spot_uid)
+        if not root.is_dir():
+            return []
+        return sorted(
+            date.fromisoformat(path.parent.name.removeprefix("date="))
+            for path in root.glob(f"date=*/{cls.filename}")
+        )
+
+    @classmethod
+    def to_table(cls, snapshots: "list[SpotSnapshotV1]") -> "pa.Table":
+        return pa.Table.from_pylist(
+            [snapshot.to_record() for snapshot in snapshots], schema=cls.schema
+        )
+
+    @classmethod
+    def write_day(
+        cls, spot_uid: UUID4, day: date, snapshots: "list[SpotSnapshotV1]"
+    ) -> int:
+        path = cls.get_partition(spot_uid, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write aside and swap in, readers never see a partial file
+        tmp_path = path.with_suffix(".tmp")
+        pq.write_table(cls.to_table(snapshots), tmp_path)
+        os.replace(tmp_path, path)
+        return path.stat().st_size
+
+    @classmethod
+    def export(
+        cls,
+        spot: "Spot",
+        until: Optional[date] = None,
+        full: bool = False,
+        chunk_size: int = 2000,
+    ) -> "DatasetExportResult":
+        """Export the days before `until`, today by default, not exported yet.
+
+        With `full` every day is exported again, for instance to pick up
+        assessments added after their day was exported.
+        """
+        until = until or datetime.now(tz=timezone.utc).date()
+        exported_days = [] if full else cls.get_exported_days(spot.uid)
+        from_date = datetime.min.replace(tzinfo=timezone.utc)
+        if exported_days:
+            from_date = datetime.combine(
+                exported_days[-1] + timedelta(days=1), datetime.min.time(), timezone.utc
+            )
+
+        result = DatasetExportResult(spot=spot.uid)
+
+        def write(day: date, snapshots: "list[SpotSnapshotV1]"):
+            result.bytes_written += cls.write_day(spot.uid, day, snapshots)
+            result.days += 1
+            result.rows += len(snapshots)
+
+        day, snapshots = None, []
+        chunks = SpotSnapshotTimeserieV1.iter_chunks_for_spot(
+            spot, from_date=from_date, chunk_size=chunk_size
+        )
+        for chunk in chunks:
+            for snapshot in chunk:
+                snapshot_day = snapshot.created.astimezone(timezone.utc).date()
+                if snapshot_day >= until:
+                    break
+                if snapshot_day != day and snapshots:
+                    write(day, snapshots)
+                    snapshots = []
+                day = snapshot_day
+                snapshots.append(snapshot)
             else:
-                spot_assessments.append(spot_assessment)
+                continue
+            break
+        if snapshots:
+            write(day, snapshots)
+        return result
 
-        return cls(spot_assessments)
+    @classmethod
+    def load(cls, spot_uid: UUID4) -> "pd.DataFrame":
+        """Exported timeserie of a spot, files are memory mapped while read."""
+        table = pq.read_table(
+            cls.get_root(spot_uid),
+            schema=cls.schema,
+            partitioning="hive",
+            memory_map=True,
+        )
+        return table.to_pandas()
 
 
 @dataclass
@@ -145,7 +559,7 @@ class SpotWSS1hPrediction:
             "wave_height": self.snapshot.wave_height_lag_0,
             "period": self.snapshot.period_lag_0,
             "direction": self.snapshot.direction_lag_0,
-            "lag": self.snapshot.buoy_data.data_delay.seconds / 3600,
+            "lag": self.snapshot.data_delay.seconds / 3600,
         }
 
 
@@ -155,6 +569,66 @@ class TrainOutput:
     rmse: float
     stored: bool
     filename: Optional[str]
+    duration: Optional[float] = None
+    model_size: Optional[int] = None
+
+
+@dataclass
+class RegisteredModel:
+    model: "RandomForestRegressor"
+    mtime_ns: int
+    size: int
+
+
+class ModelRegistry:
+    """Per-process LRU of unpickled models.
+
+    A model is loaded once and served from memory until its file changes
+    on disk, in which case the new version is loaded on the next lookup.
+    Pickle sizes are used as an estimate of the memory held by models.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._models: "OrderedDict[Path, RegisteredModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> "RandomForestRegressor":
+        stat = path.stat()
+        with self._lock:
+            entry = self._models.get(path)
+            if (
+                entry is not None
+                and entry.mtime_ns == stat.st_mtime_ns
+                and entry.size == stat.st_size
+            ):
+                self._models.move_to_end(path)
+                return entry.model
+
+            with open(path, "rb") as file:
+                model = pickle.load(file)
+            self._models[path] = RegisteredModel(
+                model=model, mtime_ns=stat.st_mtime_ns, size=stat.st_size
+            )
+            self._models.move_to_end(path)
+            self.evict()
+            return model
+
+    def evict(self):
+        # Always keep the most recently used model
+        while len(self._models) > 1 and self.size > self.max_bytes:
+            self._models.popitem(last=False)
+
+    @property
+    def size(self) -> int:
+        return sum(entry.size for entry in self._models.values())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+model_registry = ModelRegistry(max_bytes=settings.MODELS_CACHE_MAX_BYTES)
 
 
 @dataclass
@@ -163,34 +637,67 @@ class WSS1hPredictor:
 
     @classmethod
     def initialize(cls, spot_uid: UUID4) -> "WSS1hPredictor":
-        filename = cls.get_filename(spot_uid=spot_uid)
-        with open(filename, "rb") as file:
-            model = pickle.load(file)
+        model = model_registry.get(cls.get_path(spot_uid=spot_uid))
         return cls(model=model)
 
     @classmethod
     def get_filename(cls, spot_uid: UUID4) -> str:
         return f"{cls.__name__}_{spot_uid}.pkl"
 
-    def predict(self, snapshots: "list[SpotSnapshotV1]") -> "list[SpotWSS1hPrediction]":
-        wss1h_snapshots = []
-        for snapshot in snapshots:
-            data = snapshot.to_dict()
-            df = pd.DataFrame([data])
-            df.drop(
-                columns=["id", "created", "wave_size_score", "buoy_data"], inplace=True
-            )
-            prediction = self.model.predict(df)
-            wss1h = prediction[0]
-            spot_wss1h = SpotWSS1hPrediction.from_data(snapshot, wss1h=wss1h)
-            wss1h_snapshots.append(spot_wss1h)
-        return wss1h_snapshots
+    @classmethod
+    def get_path(cls, spot_uid: UUID4) -> Path:
+        return Path(settings.MODELS_ROOT) / cls.get_filename(spot_uid=spot_uid)
 
     @classmethod
-    def train(cls, spot_uid: UUID4, store: bool = False) -> "TrainOutput":
+    def get_version(cls, spot_uid: UUID4) -> "tuple[int, int]":
+        stat = cls.get_path(spot_uid=spot_uid).stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def predict(
+        self, snapshots: "list[SpotSnapshotV1]", n_jobs: Optional[int] = None
+    ) -> "list[SpotWSS1hPrediction]":
+        if not snapshots:
+            return []
+        features = pd.DataFrame(
+            [
+                [getattr(s, name) for name in SPOT_SNAPSHOT_V1_FEATURES]
+                for s in snapshots
+            ],
+            columns=SPOT_SNAPSHOT_V1_FEATURES,
+        )
+        # Only affects models trained without an explicit n_jobs
+        with parallel_backend("threading", n_jobs=n_jobs):
+            predictions = self.model.predict(features)
+        return [
+            SpotWSS1hPrediction.from_data(snapshot, wss1h=wss1h)
+            for snapshot, wss1h in zip(snapshots, predictions)
+        ]
+
+    @classmethod
+    def get_dataframe(cls, spot_uid: UUID4, from_dataset: bool) -> "pd.DataFrame":
+        if from_dataset:
+            # See the exportdataset command
+            return SpotDatasetV1.load(spot_uid)
         spot = Spot.objects.get(uid=spot_uid)
-        timeserie = SpotSnapshotTimeserieV1.build_for_spot(spot, from_date=datetime.min)
-        df = pd.DataFrame(snapshot.to_dict() for snapshot in timeserie)
+        # Raw buoy series are only needed to derive features, drop them
+        # chunk by chunk to keep memory bounded on long histories.
+        chunks = SpotSnapshotTimeserieV1.iter_chunks_for_spot(
+            spot, from_date=datetime.min
+        )
+        return pd.DataFrame(
+            snapshot.to_record() for chunk in chunks for snapshot in chunk
+        )
+
+    @classmethod
+    def train(
+        cls,
+        spot_uid: UUID4,
+        store: bool = False,
+        n_jobs: Optional[int] = None,
+        from_dataset: bool = False,
+    ) -> "TrainOutput":
+        started = time.monotonic()
+        df = cls.get_dataframe(spot_uid, from_dataset=from_dataset)
         df = df[~df.wave_size_score.isnull()]
         df["date"] = df.created.apply(lambda dt: str(dt.date()))
         df.set_index(["created"], inplace=True)
@@ -199,10 +706,10 @@ class WSS1hPredictor:
 
         df["wss1h"] = df.groupby("date")["wave_size_score"].shift(periods=2)
         df = df[~df.wss1h.isnull()]
-        df.drop(columns=["buoy_data", "wave_size_score", "date"], inplace=True)
+        df.drop(columns=["wave_size_score", "date"], inplace=True)
 
         # Separate features and target variable
-        X = df.drop(columns=["wss1h"])
+        X = df[SPOT_SNAPSHOT_V1_FEATURES]
         y = df["wss1h"]
 
         # Split into training and testing datasets
@@ -211,8 +718,10 @@ class WSS1hPredictor:
         )
 
         # Train a Random Forest Regressor
-        model = RandomForestRegressor(random_state=42)
+        model = RandomForestRegressor(random_state=42, n_jobs=n_jobs)
         model.fit(X_train, y_train)
+        # Inference parallelism is up to the caller, see predict
+        model.set_params(n_jobs=None)
 
         # Predict on the test set
         y_pred = model.predict(X_test)
@@ -220,15 +729,21 @@ class WSS1hPredictor:
         # Evaluate the model
         rmse = np.sqrt(mean_squared_error(y_test, y_pred))
 
-        filename = cls.get_filename(spot_uid=spot_uid)
+        filename = cls.get_path(spot_uid=spot_uid)
+        pickled = pickle.dumps(model)
 
         if store:
-            with open(filename, "wb") as file:
-                pickle.dump(model, file)
+            # Write aside and swap in, workers never see a partial file
+            tmp_filename = filename.with_suffix(".tmp")
+            with open(tmp_filename, "wb") as file:
+                file.write(pickled)
+            os.replace(tmp_filename, filename)
 
         return TrainOutput(
             spot=spot_uid,
             rmse=rmse,
             stored=store,
-            filename=filename,
+            filename=str(filename),
+            duration=time.monotonic() - started,
+            model_size=len(pickled),
         )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SpotsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "spots"
+
+    def ready(self):
+        from spots import signals  # noqa: F401
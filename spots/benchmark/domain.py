@@ -0,0 +1,307 @@
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from cftoscana.domain import CFTBuoyCompactionService, CFTBuoyRawDataUTC
+from cftoscana.models import (
+    CFTBuoyDailySeries,
+    CFTBuoyData,
+    CFTBuoyStation,
+    Stations,
+)
+from ipcamlive.models import IPCamLiveData, IPCamLiveWebcam
+from meteonetwork.models import MeteoNetworkIRTData
+from spots.analytics.domain import SpotSnapshotTimeserieV1
+from spots.models import (
+    SnapshotAssessment,
+    SnapshotFeaturesV1,
+    Spot,
+    SpotSnapshot,
+)
+from spots.retention.domain import PreviewRetentionService
+
+
+@dataclass
+class SyntheticHistory:
+    """Snapshots of a few spots taken every `interval` over daylight hours.
+
+    Each call to `add_year` fills the year before the history generated so
+    far, so that the most recent days stay put while the tables grow.
+    """
+
+    spots: int = 2
+    per_day: int = 48
+    interval: timedelta = timedelta(minutes=15)
+    assessed_every: int = 10  # One snapshot every `assessed_every` is assessed
+    batch_size: int = 5000
+    buoy_days: int = 30  # Older buoy rows are compacted, see compactdata
+    preview_days: int = 90  # Older previews are pruned, see compactdata
+    now: datetime = field(default_factory=timezone.now)
+    years: int = 0
+
+    def __post_init__(self):
+        self.station = CFTBuoyStation.objects.create(station_uid=Stations.values[0])
+        self.spot_objs = []
+        self.webcams = []
+        for _ in range(self.spots):
+            spot = Spot.objects.create(
+                uid=uuid.uuid4(), name=f"Synthetic {uuid.uuid4()}", lat="0", lon="0"
+            )
+            self.station.spots.add(spot)
+            self.spot_objs.append(spot)
+            self.webcams.append(
+                IPCamLiveWebcam.objects.create(
+                    alias=str(uuid.uuid4()), name=str(uuid.uuid4()), spot=spot
+                )
+            )
+        series = CFTBuoyRawDataUTC(x=list(range(24)), y=[1.0] * 24, unit="m")
+        self.series_bytes = series.to_bytes()
+        self.series_dict = series.to_dict()
+
+    @property
+    def first_day(self) -> datetime:
+        # Today included
+        start_of_tomorrow = self.now.replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+        return start_of_tomorrow - timedelta(days=365 * self.years)
+
+    def add_year(self) -> int:
+        end = self.first_day
+        self.years += 1
+        day = self.first_day
+        created = 0
+        while day < end:
+            created += self.add_day(day)
+            day += timedelta(days=1)
+        return created
+
+    def add_day(self, day: datetime) -> int:
+        age = self.now - day
+        compacted = age > timedelta(days=self.buoy_days)
+        daily_series = None
+        if compacted:
+            daily_series = CFTBuoyDailySeries.objects.create(
+                station=self.station,
+                day=day.date(),
+                wave_height=self.series_dict,
+                period=self.series_dict,
+                direction=self.series_dict,
+            )
+
+        first = day + timedelta(hours=6)
+        snapshots = [
+            SpotSnapshot(spot=spot)
+            for spot in self.spot_objs
+            for _ in range(self.per_day)
+        ]
+        snapshots = SpotSnapshot.objects.bulk_create(
+            snapshots, batch_size=self.batch_size
+        )
+        # `created` is set on insert, backdate it
+        for i, snapshot in enumerate(snapshots):
+            snapshot.created = first + self.interval * (i % self.per_day)
+        SpotSnapshot.objects.bulk_update(
+            snapshots, ["created"], batch_size=self.batch_size
+        )
+
+        webcams = dict(zip((spot.pk for spot in self.spot_objs), self.webcams))
+        buoy_data, meteo_data, webcam_data = [], [], []
+        features, assessments = [], []
+        for snapshot in snapshots:
+            buoy_data.append(
+                CFTBuoyData(
+                    snapshot=snapshot,
+                    created=snapshot.created,
+                    as_of=snapshot.created,
+                    station=self.station,
+                    wave_height_bin=None if compacted else self.series_bytes,
+                    period_bin=None if compacted else self.series_bytes,
+                    direction_bin=None if compacted else self.series_bytes,
+                    daily_series=daily_series,
+                    series_lengths=(
+                        {"wave_height": 24, "period": 24, "direction": 24}
+                        if compacted
+                        else None
+                    ),
+                )
+            )
+            meteo_data.append(
+                MeteoNetworkIRTData(
+                    snapshot=snapshot,
+                    lat="0",
+                    lon="0",
+                    temperature=20,
+                    rh=50,
+                    dew_point=10,
+                    smlp=1013,
+                    wind_direction=180,
+                    wind_direction_cardinal="S",
+                    wind_speed=10,
+                    distance=1,
+                )
+            )
+            preview = ""
+            if age <= timedelta(days=self.preview_days):
+                preview = f"synthetic/{snapshot.pk}.jpg"
+            webcam_data.append(
+                IPCamLiveData(
+                    snapshot=snapshot,
+                    created=snapshot.created,
+                    webcam=webcams[snapshot.spot_id],
+                    preview=preview,
+                )
+            )
+            features.append(
+                SnapshotFeaturesV1(
+                    snapshot=snapshot,
+                    data_delay=timedelta(minutes=30),
+                    **{
+                        f.name: 1.0
+                        for f in SnapshotFeaturesV1._meta.fields
+                        if f.get_internal_type() == "FloatField"
+                    },
+                )
+            )
+            if snapshot.pk % self.assessed_every == 0:
+                assessments.append(
+                    SnapshotAssessment(snapshot=snapshot, wave_size_score=1)
+                )
+
+        for model, objs in (
+            (CFTBuoyData, buoy_data),
+            (MeteoNetworkIRTData, meteo_data),
+            (IPCamLiveData, webcam_data),
+            (SnapshotFeaturesV1, features),
+            (SnapshotAssessment, assessments),
+        ):
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+        return len(snapshots)
+
+
+@dataclass
+class QueryPlan:
+    name: str
+    history_years: int
+    snapshots: int
+    rows: int
+    wall_ms: float
+    execution_ms: "float | None"
+    scans: "list[str]"
+    plan: str
+
+    @property
+    def index_only(self) -> bool:
+        return bool(self.scans) and all(
+            scan.startswith("Index Only Scan") or "COVERING INDEX" in scan
+            for scan in self.scans
+        )
+
+    def __str__(self):
+        execution = (
+            f"{self.execution_ms:.2f}ms" if self.execution_ms is not None else "n/a"
+        )
+        return (
+            f"{self.history_years}y {self.name}: {self.rows} rows, "
+            f"execution {execution}, wall {self.wall_ms:.2f}ms, "
+            f"scans: {'; '.join(self.scans) or 'n/a'}"
+        )
+
+
+class QueryPlanBenchmark:
+    """`EXPLAIN ANALYZE` of the queries on the snapshot hot paths.
+
+    Plans are only analyzed on PostgreSQL, other backends report the plan
+    the database would use along with the wall time of the query.
+    """
+
+    scan_pattern = re.compile(
+        r"((?:Index Only Scan|Index Scan|Bitmap Index Scan|Bitmap Heap Scan|Seq Scan)"
+        r"(?: Backward)?(?: using \S+)? on \S+"
+        # SQLite
+        r"|(?:SCAN|SEARCH) \S+"
+        r"(?: USING (?:COVERING INDEX \S+|INDEX \S+|INTEGER PRIMARY KEY))?)"
+    )
+    execution_pattern = re.compile(r"Execution Time: ([\d.]+) ms")
+
+    @classmethod
+    def get_queries(
+        cls, history: "SyntheticHistory"
+    ) -> "dict[str, Callable[[], QuerySet]]":
+        spot = history.spot_objs[0]
+        webcam = history.webcams[0]
+        start_of_day = history.now.replace(hour=0, minute=0, second=0, microsecond=0)
+        timeserie = SpotSnapshotTimeserieV1.get_snapshots(spot, from_date=start_of_day)
+        return {
+            # surfin.api.timeseries, see iter_chunks_for_spot
+            "api timeseries stored": lambda: timeserie.filter(
+                features_v1__isnull=False
+            ).select_related("features_v1"),
+            "api timeseries computed": lambda: SpotSnapshotTimeserieV1.annotate_computed(
+                timeserie
+            ),
+            "api timeseries ids": lambda: timeserie.values_list("id", "created"),
+            "admin changelist": lambda: SpotSnapshot.objects.filter(
+                discarded__isnull=True
+            ).order_by("-pk")[:100],
+            "webcam latest data": lambda: IPCamLiveData.objects.filter(
+                webcam=webcam
+            ).order_by("-pk")[:1],
+            "preview retention": lambda: PreviewRetentionService.get_expired(
+                IPCamLiveData,
+                before=history.now - timedelta(days=history.preview_days),
+            ),
+            "buoy compaction": lambda: CFTBuoyCompactionService.get_uncompacted(
+                before=history.now - timedelta(days=history.buoy_days)
+            ),
+        }
+
+    @classmethod
+    def analyze(cls):
+        if connection.vendor == "postgresql":
+            # Fresh statistics and visibility map, index only scans need both.
+            # VACUUM cannot run in a transaction, as in tests, ANALYZE can
+            statement = "ANALYZE" if connection.in_atomic_block else "VACUUM ANALYZE"
+            with connection.cursor() as cursor:
+                cursor.execute(statement)
+        elif connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    @classmethod
+    def explain(cls, qs: "QuerySet") -> str:
+        if connection.vendor == "postgresql":
+            return qs.explain(analyze=True, buffers=True)
+        return qs.explain()
+
+    @classmethod
+    def run(cls, history: "SyntheticHistory") -> "list[QueryPlan]":
+        cls.analyze()
+        snapshots = SpotSnapshot.objects.count()
+        plans = []
+        for name, get_qs in cls.get_queries(history).items():
+            started = time.perf_counter()
+            rows = len(list(get_qs()))
+            wall_ms = (time.perf_counter() - started) * 1000
+            plan = cls.explain(get_qs())
+            execution = cls.execution_pattern.search(plan)
+            plans.append(
+                QueryPlan(
+                    name=name,
+                    history_years=history.years,
+                    snapshots=snapshots,
+                    rows=rows,
+                    wall_ms=wall_ms,
+                    execution_ms=float(execution.group(1)) if execution else None,
+                    scans=cls.scan_pattern.findall(plan),
+                    plan=plan,
+                )
+            )
+        return plans
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from django.core.cache import cache
+
+from surfin import settings
+
+
+@dataclass
+class CircuitState:
+    failures: int = 0
+    opened_at: Optional[datetime] = None
+    error: str = ""
+
+    def to_dict(self):
+        return {
+            "failures": self.failures,
+            "opened_at": self.opened_at and self.opened_at.isoformat(),
+            "error": self.error,
+        }
+
+
+class ProviderCircuitBreaker:
+    """Stop polling a provider that keeps failing.
+
+    After `threshold` consecutive failures the circuit of a provider opens
+    and it is not polled for `cooldown` seconds, snapshots are taken without
+    it meanwhile. Past that one poll is let through: a success closes the
+    circuit, a failure opens it for another `cooldown`. State lives in the
+    shared Django cache, see CACHES, so that it carries over takesnapshots
+    runs and collectord.
+    """
+
+    threshold = settings.PROVIDER_BREAKER_THRESHOLD
+    cooldown = settings.PROVIDER_BREAKER_COOLDOWN
+
+    class CircuitOpen(Exception):
+        pass
+
+    @classmethod
+    def get_key(cls, name: str) -> str:
+        return f"spots:breaker:{name}"
+
+    @classmethod
+    def get_state(cls, name: str) -> "CircuitState":
+        return cache.get(cls.get_key(name)) or CircuitState()
+
+    @classmethod
+    def is_open(cls, name: str, now: datetime) -> bool:
+        opened_at = cls.get_state(name).opened_at
+        return (
+            opened_at is not None and (now - opened_at).total_seconds() < cls.cooldown
+        )
+
+    @classmethod
+    def check(cls, name: str, now: datetime):
+        if cls.is_open(name, now):
+            state = cls.get_state(name)
+            raise cls.CircuitOpen(
+                f"{name} failed {state.failures} times in a row, last {state.error}"
+            )
+
+    @classmethod
+    def record_success(cls, name: str):
+        cache.delete(cls.get_key(name))
+
+    @classmethod
+    def record_failure(cls, name: str, error: Exception, now: datetime):
+        state = cls.get_state(name)
+        state.failures += 1
+        state.error = repr(error)
+        if state.failures >= cls.threshold:
+            state.opened_at = now
+        cache.set(cls.get_key(name), state, timeout=None)
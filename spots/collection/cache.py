@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from django.core.cache import cache
+
+from surfin import settings
+
+
+@dataclass
+class ProviderValue:
+    """Latest data polled from a provider, for the spots polled at the time."""
+
+    spot_pks: "frozenset[int]"
+    data: Any
+    fetched_at: datetime
+
+    def get_age(self, now: datetime) -> float:
+        return (now - self.fetched_at).total_seconds()
+
+
+class ProviderValueCache:
+    """Latest value polled from each provider.
+
+    Providers are polled on their own cadence, see COLLECTORD_INTERVALS, and
+    snapshots are assembled out of whatever they last returned. A value is
+    used for as long as `max_age` of its provider, past that it is polled
+    again. With a cache backend shared across processes, collectord keeps it
+    warm for takesnapshots runs too.
+    """
+
+    max_age = settings.PROVIDER_VALUE_MAX_AGE
+
+    @classmethod
+    def get_key(cls, name: str) -> str:
+        return f"spots:provider:{name}"
+
+    @classmethod
+    def get(cls, name: str) -> "Optional[ProviderValue]":
+        return cache.get(cls.get_key(name))
+
+    @classmethod
+    def set(cls, name: str, value: "ProviderValue"):
+        cache.set(cls.get_key(name), value, timeout=cls.max_age[name])
+
+    @classmethod
+    def get_fresh(
+        cls, name: str, spot_pks: "set[int]", now: datetime
+    ) -> "Optional[ProviderValue]":
+        """Cached value of `name` covering all of `spot_pks` and not older
+        than its `max_age`, if any.
+        """
+        value = cls.get(name)
+        if value is None or not spot_pks <= value.spot_pks:
+            return None
+        if value.get_age(now) > cls.max_age[name]:
+            return None
+        return value
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import signal
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from spots.collection.breaker import ProviderCircuitBreaker
+from spots.collection.cache import ProviderValueCache
+from spots.collection.domain import SpotSetCollector
+from spots.domain import SpotDomain, SpotSetDomain
+
+
+@dataclass
+class JobState:
+    name: str
+    interval: float
+    started: Optional[datetime] = None
+    succeeded: Optional[datetime] = None
+    failed: Optional[datetime] = None
+    error: str = ""
+    runs: int = 0
+    failures: int = 0
+
+    def is_healthy(self, now: datetime, since: datetime) -> bool:
+        """Succeeded within two intervals, or has not had the chance to yet."""
+        deadline = now - timedelta(seconds=2 * self.interval)
+        return (self.succeeded or since) > deadline
+
+    def to_dict(self):
+        return {
+            "interval": self.interval,
+            "started": self.started and self.started.isoformat(),
+            "succeeded": self.succeeded and self.succeeded.isoformat(),
+            "failed": self.failed and self.failed.isoformat(),
+            "error": self.error,
+            "runs": self.runs,
+            "failures": self.failures,
+        }
+
+
+class CollectorDaemon:
+    """Poll every provider on its own interval into ProviderValueCache and
+    take snapshots out of the latest values, all in one long running process.
+
+    Jobs run on an asyncio loop. Their database work runs on the single
+    thread sync_to_async keeps for it, so the process holds one database
+    connection, and network I/O runs on worker threads, as with
+    SpotSetCollector. HTTP connections are shared through the process-wide
+    session.
+    """
+
+    snapshots = "snapshots"
+
+    def __init__(
+        self,
+        intervals: "dict[str, float]",
+        concurrent: bool = True,
+        log: Callable[[str], Any] = print,
+    ):
+        self.intervals = intervals
+        self.concurrent = concurrent
+        self.log = log
+        self.polled_names: "set[str]" = set()
+        self.states = {
+            name: JobState(name, interval) for name, interval in intervals.items()
+        }
+        self.started = timezone.now()
+        self.stopping: Optional[asyncio.Event] = None
+        self.polled: Optional[asyncio.Event] = None
+
+    def get_jobs(self) -> "dict[str, Callable[[], Awaitable[None]]]":
+        jobs = {
+            name: (lambda name=name: self.poll(name))
+            for name in SpotSetCollector.providers
+        }
+        jobs[self.snapshots] = self.take_snapshots
+        return jobs
+
+    @staticmethod
+    def load_spots() -> "SpotSetDomain":
+        # Drop connections the database closed or older than CONN_MAX_AGE
+        close_old_connections()
+        return SpotDomain.load_all()
+
+    async def poll(self, name: str):
+        try:
+            ProviderCircuitBreaker.check(name, timezone.now())
+            spots = await sync_to_async(self.load_spots)()
+            task = await sync_to_async(SpotSetCollector.get_task)(
+                name, spots, self.concurrent
+            )
+            fetched_at = timezone.now()
+            started = time.monotonic()
+            try:
+                data = await asyncio.wait_for(
+                    asyncio.to_thread(task.fetch), task.timeout
+                )
+            except Exception as e:
+                ProviderCircuitBreaker.record_failure(name, e, timezone.now())
+                raise
+            ProviderCircuitBreaker.record_success(name)
+            SpotSetCollector.store(name, spots, data, fetched_at)
+            self.log(f"{name}: polled in {time.monotonic() - started:.3f}s")
+        finally:
+            # Snapshots go ahead without providers failing from the start
+            self.polled_names.add(name)
+            if set(SpotSetCollector.providers) <= self.polled_names:
+                self.polled.set()
+
+    async def take_snapshots(self):
+        spots = await sync_to_async(self.load_spots)()
+        # Instant out of the cached values, those gone stale, say a poll
+        # running late or spots added since, are polled then and there
+        snapshots = await sync_to_async(spots.take_snapshots)(
+            concurrent=self.concurrent
+        )
+        self.log(f"Snapshots: {len(snapshots)} taken, {snapshots.metrics}")
+
+    async def wait(self, event: "asyncio.Event", timeout: Optional[float] = None):
+        """Wait for `event` until `timeout` or until the daemon is stopped."""
+        waiters = [asyncio.ensure_future(e.wait()) for e in (event, self.stopping)]
+        await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        for waiter in waiters:
+            waiter.cancel()
+
+    async def schedule(self, name: str, job: Callable[[], Awaitable[None]]):
+        state = self.states[name]
+        if name == self.snapshots:
+            # Start as soon as every provider has been polled once
+            await self.wait(self.polled)
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            state.started = timezone.now()
+            state.runs += 1
+            try:
+                await job()
+            except Exception as e:
+                state.failed = timezone.now()
+                state.failures += 1
+                state.error = repr(e)
+                self.log(f"{name}: failed {e!r}")
+            else:
+                state.succeeded = timezone.now()
+            # Fixed rate, a slow run does not push the following ones back
+            delay = max(state.interval - (time.monotonic() - started), 0)
+            await self.wait(self.stopping, timeout=delay)
+
+    def get_health(self) -> "tuple[bool, dict]":
+        now = timezone.now()
+        values = {
+            name: ProviderValueCache.get(name) for name in SpotSetCollector.providers
+        }
+        healthy = all(
+            state.is_healthy(now, since=self.started) for state in self.states.values()
+        )
+        return healthy, {
+            "status": "ok" if healthy else "unhealthy",
+            "started": self.started.isoformat(),
+            "jobs": {name: state.to_dict() for name, state in self.states.items()},
+            "latest": {
+                name: {
+                    "fetched_at": value.fetched_at.isoformat(),
+                    "age": value.get_age(now),
+                }
+                for name, value in values.items()
+                if value is not None
+            },
+            "circuits": {
+                name: ProviderCircuitBreaker.get_state(name).to_dict()
+                for name in SpotSetCollector.providers
+            },
+        }
+
+    async def handle_health(
+        self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter"
+    ):
+        """Minimal HTTP/1.0 responder: 200 when every job is on schedule, 503 otherwise."""
+        try:
+            await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            asyncio.TimeoutError,
+        ):
+            writer.close()
+            return
+        healthy, body = self.get_health()
+        content = json.dumps(body).encode()
+        status = "200 OK" if healthy else "503 Service Unavailable"
+        writer.write(
+            f"HTTP/1.0 {status}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n\r\n".encode() + content
+        )
+        await writer.drain()
+        writer.close()
+
+    def stop(self):
+        if self.stopping is not None and not self.stopping.is_set():
+            self.log("Stopping once running jobs complete")
+            self.stopping.set()
+
+    async def serve(
+        self, health_host: Optional[str] = None, health_port: Optional[int] = None
+    ):
+        """Run every job, and the health endpoint, until stopped."""
+        self.stopping = asyncio.Event()
+        self.polled = asyncio.Event()
+        server = None
+        if health_port is not None:
+            server = await asyncio.start_server(
+                self.handle_health, host=health_host, port=health_port
+            )
+            self.log(f"Health on http://{health_host}:{health_port}/")
+        try:
+            await asyncio.gather(
+                *(self.schedule(name, job) for name, job in self.get_jobs().items())
+            )
+        finally:
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+
+    async def run(
+        self, health_host: Optional[str] = None, health_port: Optional[int] = None
+    ):
+        """Serve until SIGINT or SIGTERM, jobs running by then complete first."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop)
+        try:
+            await self.serve(health_host=health_host, health_port=health_port)
+        finally:
+            # Close on the thread the connection was opened on
+            await sync_to_async(connections.close_all)()
@@ -0,0 +1,252 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from django.utils import timezone
+
+from cftoscana.domain import CFTBuoyDataSetDomain, CFTBuoyService
+from ipcamlive.domain import IPCamLiveDataSetDomain, IPCamLiveService
+from meteonetwork.domain import MeteoNetworkIRTDataSetDomain, MeteoNetworkService
+from spots.collection.breaker import ProviderCircuitBreaker
+from spots.collection.cache import ProviderValue, ProviderValueCache
+from windy.domain import WindyWebcamDataSetDomain, WindyWebcamService
+
+if TYPE_CHECKING:
+    from spots.domain import SpotSetDomain
+
+
+@dataclass
+class SpotSetDataDomain:
+    # None for providers missing from a partial set
+    ipcamlive_data: "Optional[IPCamLiveDataSetDomain]"
+    windy_webcam_data: "Optional[WindyWebcamDataSetDomain]"
+    meteonetwork_irt_data: "Optional[MeteoNetworkIRTDataSetDomain]"
+    cft_buoy_data: "Optional[CFTBuoyDataSetDomain]"
+    # Seconds since each provider's data was polled, as of assembling it
+    ages: "dict[str, float]" = field(default_factory=dict)
+    # Providers polled for this very set, the others came from the cache
+    polled: "frozenset[str]" = frozenset()
+    # Why each missing provider is missing
+    missing: "dict[str, str]" = field(default_factory=dict)
+
+
+@dataclass
+class ProviderTask:
+    name: str
+    fetch: Callable[[], Any]
+    timeout: float
+
+
+class SpotSetCollector:
+    """Collect current data for a set of spots from every provider.
+
+    Providers run concurrently, each of them fanning out its own per-spot
+    or per-station requests on a thread pool bounded by its `max_workers`.
+    Every provider must complete within its own `timeout`.
+    """
+
+    class ProvidersUnavailable(Exception):
+        pass
+
+    # Fields of SpotSetDataDomain, one per provider
+    providers = (
+        "ipcamlive_data",
+        "windy_webcam_data",
+        "meteonetwork_irt_data",
+        "cft_buoy_data",
+    )
+
+    # Database lookups happen in the get_*_task methods, on the calling
+    # thread, so that worker threads only ever do network I/O and never open
+    # DB connections.
+
+    @staticmethod
+    def get_last_polled(name: str, last_data: "dict[int, Any]") -> "dict[int, Any]":
+        """`last_data` stored for each webcam, superseded by the data last
+        polled when cached, so that previews revalidate against the latest
+        frame rather than download it again.
+        """
+        value = ProviderValueCache.get(name)
+        if value is None:
+            return last_data
+        return {**last_data, **{data.webcam.pk: data for data in value.data}}
+
+    @classmethod
+    def get_ipcamlive_data_task(
+        cls, spots: "SpotSetDomain", max_workers: Optional[int]
+    ) -> "ProviderTask":
+        webcams = IPCamLiveService.get_webcams(spots)
+        last_data = cls.get_last_polled(
+            "ipcamlive_data", IPCamLiveService.get_last_data(webcams)
+        )
+        return ProviderTask(
+            name="ipcamlive_data",
+            fetch=partial(
+                IPCamLiveService.fetch_current_data,
+                webcams,
+                max_workers,
+                last_data=last_data,
+            ),
+            timeout=IPCamLiveService.timeout,
+        )
+
+    @classmethod
+    def get_windy_webcam_data_task(
+        cls, spots: "SpotSetDomain", max_workers: Optional[int]
+    ) -> "ProviderTask":
+        webcams = WindyWebcamService.get_webcams(spots)
+        last_data = cls.get_last_polled(
+            "windy_webcam_data", WindyWebcamService.get_last_data(webcams)
+        )
+        return ProviderTask(
+            name="windy_webcam_data",
+            fetch=partial(
+                WindyWebcamService.fetch_current_data,
+                webcams,
+                max_workers,
+                last_data=last_data,
+            ),
+            timeout=WindyWebcamService.timeout,
+        )
+
+    @classmethod
+    def get_meteonetwork_irt_data_task(
+        cls, spots: "SpotSetDomain", max_workers: Optional[int]
+    ) -> "ProviderTask":
+        return ProviderTask(
+            name="meteonetwork_irt_data",
+            fetch=partial(MeteoNetworkService.fetch_current_data, spots, max_workers),
+            timeout=MeteoNetworkService.timeout,
+        )
+
+    @classmethod
+    def get_cft_buoy_data_task(
+        cls, spots: "SpotSetDomain", max_workers: Optional[int]
+    ) -> "ProviderTask":
+        buoy_stations = CFTBuoyService.get_buoy_stations(spots)
+        return ProviderTask(
+            name="cft_buoy_data",
+            fetch=partial(
+                CFTBuoyService.fetch_current_data, buoy_stations, max_workers
+            ),
+            timeout=CFTBuoyService.timeout,
+        )
+
+    @classmethod
+    def get_task(
+        cls, name: str, spots: "SpotSetDomain", concurrent: bool
+    ) -> "ProviderTask":
+        max_workers = None if concurrent else 1
+        return getattr(cls, f"get_{name}_task")(spots, max_workers)
+
+    @classmethod
+    def fetch(
+        cls, tasks: "list[ProviderTask]", concurrent: bool = True
+    ) -> "tuple[dict[str, Any], dict[str, Exception]]":
+        """Data of the tasks that completed, and errors of those that did not."""
+        data, errors = {}, {}
+        if not concurrent or not tasks:
+            for task in tasks:
+                try:
+                    data[task.name] = task.fetch()
+                except Exception as e:
+                    errors[task.name] = e
+            return data, errors
+
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=len(tasks))
+        try:
+            futures = {task.name: executor.submit(task.fetch) for task in tasks}
+            for task in tasks:
+                remaining = task.timeout - (time.monotonic() - started)
+                try:
+                    data[task.name] = futures[task.name].result(
+                        timeout=max(remaining, 0)
+                    )
+                except TimeoutError:
+                    errors[task.name] = TimeoutError(
+                        f"{task.name} did not complete within {task.timeout}s"
+                    )
+                except Exception as e:
+                    errors[task.name] = e
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return data, errors
+
+    @classmethod
+    def store(
+        cls, name: str, spots: "SpotSetDomain", data: Any, fetched_at: datetime
+    ) -> "ProviderValue":
+        value = ProviderValue(
+            spot_pks=frozenset(spot.pk for spot in spots),
+            data=data,
+            fetched_at=fetched_at,
+        )
+        ProviderValueCache.set(name, value)
+        return value
+
+    @classmethod
+    def collect(
+        cls,
+        spots: "SpotSetDomain",
+        concurrent: bool = True,
+        cached: bool = True,
+        partial: bool = True,
+    ) -> "SpotSetDataDomain":
+        """Assemble current data for `spots` out of the latest value of
+        each provider, polling only those whose value is missing, stale or
+        does not cover all of `spots`. With `cached` off every provider is
+        polled.
+
+        Providers failing, or whose circuit is open, are left out of a
+        `partial` set, otherwise they raise ProvidersUnavailable. A set
+        with no provider at all raises regardless.
+        """
+        spot_pks = {spot.pk for spot in spots}
+        now = timezone.now()
+        values = {}
+        if cached:
+            for name in cls.providers:
+                value = ProviderValueCache.get_fresh(name, spot_pks, now)
+                if value is not None:
+                    values[name] = value
+
+        errors = {}
+        tasks = []
+        for name in cls.providers:
+            if name in values:
+                continue
+            try:
+                ProviderCircuitBreaker.check(name, now)
+            except ProviderCircuitBreaker.CircuitOpen as e:
+                errors[name] = e
+                continue
+            tasks.append(cls.get_task(name, spots, concurrent))
+
+        fetched_at = timezone.now()
+        data, fetch_errors = cls.fetch(tasks, concurrent=concurrent)
+        for name, provider_data in data.items():
+            ProviderCircuitBreaker.record_success(name)
+            values[name] = cls.store(name, spots, provider_data, fetched_at)
+        now = timezone.now()
+        for name, error in fetch_errors.items():
+            ProviderCircuitBreaker.record_failure(name, error, now)
+        errors.update(fetch_errors)
+
+        if errors and (not partial or not values):
+            raise cls.ProvidersUnavailable(
+                ", ".join(f"{name}: {error!r}" for name, error in errors.items())
+            ) from next(iter(errors.values()))
+
+        return SpotSetDataDomain(
+            **{
+                name: values[name].data if name in values else None
+                for name in cls.providers
+            },
+            ages={name: value.get_age(now) for name, value in values.items()},
+            polled=frozenset(data),
+            missing={name: repr(error) for name, error in errors.items()},
+        )
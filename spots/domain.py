@@ -1,37 +1,168 @@
-from dataclasses import asdict, dataclass
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Any, List, Optional
 
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 
-from cftoscana.domain import CFTBuoyDataDomain, CFTBuoyService
+from cftoscana.domain import CFTBuoyDataDomain, CFTBuoyObservationService
+from cftoscana.models import CFTBuoyData
 from ipcamlive.domain import IPCamLiveDataDomain, IPCamLiveService
-from meteonetwork.domain import MeteoNetworkIRTDataDomain, MeteoNetworkService
+from ipcamlive.models import IPCamLiveData
+from meteonetwork.domain import MeteoNetworkIRTDataDomain
+from meteonetwork.models import MeteoNetworkIRTData
+from spots.analytics.cache import SpotTimeserieCache
+from spots.analytics.domain import SnapshotFeaturesV1Store
+from spots.collection.domain import SpotSetCollector, SpotSetDataDomain
 from spots.models import Spot, SpotSnapshot
+from spots.topology.domain import topology_cache
+from surfin.previews import PreviewDownload
 from windy.domain import WindyWebcamDataDomain, WindyWebcamService
+from windy.models import WindyWebcamData
 
 
 class SpotSetDomain(List["SpotDomain"]):
-    @transaction.atomic
-    def take_snapshots(self) -> List["SpotSnapshotDomain"]:
-        ipcamlive_data = IPCamLiveService.get_current_data(spots=self)
-        windy_webcam_data = WindyWebcamService.get_current_data(spots=self)
-        meteonetwork_irt_data = MeteoNetworkService.get_current_data(spots=self)
-        cft_buoy_data = CFTBuoyService.get_current_data(spots=self)
+    # Provider rows of a snapshot, by SpotSetDataDomain field
+    provider_models = {
+        "ipcamlive_data": IPCamLiveData,
+        "windy_webcam_data": WindyWebcamData,
+        "meteonetwork_irt_data": MeteoNetworkIRTData,
+        "cft_buoy_data": CFTBuoyData,
+    }
+    # SpotSnapshotDomain field and domain of each provider row
+    provider_domains = {
+        "ipcamlive_data": ("iplivecam_data", IPCamLiveDataDomain),
+        "windy_webcam_data": ("windy_webcam_data", WindyWebcamDataDomain),
+        "meteonetwork_irt_data": ("meteonetwork_data", MeteoNetworkIRTDataDomain),
+        "cft_buoy_data": ("cft_buoy_data", CFTBuoyDataDomain),
+    }
+
+    def take_snapshots(
+        self, concurrent: bool = True, cached: bool = True, partial: bool = True
+    ) -> "SpotSnapshotSetDomain":
+        # Network I/O happens before, and outside of, the database transaction
+        started = time.monotonic()
+        data = SpotSetCollector.collect(
+            spots=self, concurrent=concurrent, cached=cached, partial=partial
+        )
+        fetch_seconds = time.monotonic() - started
+        return self.store_snapshots(data, fetch_seconds=fetch_seconds)
+
+    def store_snapshots(
+        self, data: "SpotSetDataDomain", fetch_seconds: Optional[float] = None
+    ) -> "SpotSnapshotSetDomain":
+        """Persist snapshots of already collected `data` along with what
+        is derived from them.
+        """
+        snapshots = self.persist_snapshots(data)
+        snapshots.metrics.fetch_seconds = fetch_seconds
+        snapshots.metrics.data_ages = data.ages
+        snapshots.metrics.missing = data.missing
+        # Cached data had its previews downloaded by an earlier poll
+        snapshots.metrics.downloads = [
+            webcam_data.download
+            for name in ("ipcamlive_data", "windy_webcam_data")
+            if name in data.polled
+            for webcam_data in getattr(data, name)
+            if webcam_data.download is not None
+        ]
+        SnapshotFeaturesV1Store.store_for_snapshots(snapshots)
+        if data.cft_buoy_data is not None:
+            CFTBuoyObservationService.store_data_set(data.cft_buoy_data)
+        for snapshot in snapshots:
+            SpotTimeserieCache.set_latest_snapshot_id(snapshot.spot.pk, snapshot.pk)
+        return snapshots
 
-        snapshots = []
-        for spot in self:
-            snapshot = SpotSnapshotDomain.create_from_data(
+    def persist_snapshots(self, data: "SpotSetDataDomain") -> "SpotSnapshotSetDomain":
+        """Write all snapshots and their provider rows with bulk inserts.
+
+        The returned snapshots are built from the in-memory rows, so the
+        number of queries is constant whatever the number of spots. Providers
+        missing from `data` get no rows, snapshots record them as missing.
+        """
+        # Frames unchanged since the last snapshot share its preview, the
+        # others go to storage ahead of the transaction
+        if data.ipcamlive_data is not None:
+            IPCamLiveService.share_stored_previews(data.ipcamlive_data)
+        if data.windy_webcam_data is not None:
+            WindyWebcamService.share_stored_previews(data.windy_webcam_data)
+        provider_objs = {
+            name: [getattr(data, name).for_spot(spot).to_orm_obj() for spot in self]
+            for name in SpotSetCollector.providers
+            if getattr(data, name) is not None
+        }
+
+        topology = topology_cache.get()
+        webcams = topology.ipcamlive_webcams
+        stations = topology.buoy_stations
+
+        started = time.monotonic()
+        with transaction.atomic():
+            snapshot_objs = SpotSnapshot.objects.bulk_create(
+                [
+                    SpotSnapshot(
+                        spot_id=spot.pk,
+                        data_ages=data.ages,
+                        missing_data=data.missing or None,
+                    )
+                    for spot in self
+                ]
+            )
+            for name, objs in provider_objs.items():
+                for obj, snapshot_obj in zip(objs, snapshot_objs):
+                    obj.snapshot = snapshot_obj
+                self.provider_models[name].objects.bulk_create(objs)
+        transaction_seconds = time.monotonic() - started
+
+        snapshots = SpotSnapshotSetDomain()
+        for i, (spot, snapshot_obj) in enumerate(zip(self, snapshot_objs)):
+            row = {name: objs[i] for name, objs in provider_objs.items()}
+            if "ipcamlive_data" in row:
+                row["ipcamlive_data"].webcam = webcams[row["ipcamlive_data"].webcam_id]
+            if "cft_buoy_data" in row:
+                row["cft_buoy_data"].station = stations[row["cft_buoy_data"].station_id]
+            snapshot = SpotSnapshotDomain(
+                pk=snapshot_obj.pk,
                 spot=spot,
-                ipcamlive_data=ipcamlive_data.for_spot(spot),
-                meteonetwork_irt_data=meteonetwork_irt_data.for_spot(spot),
-                windy_webcam_data=windy_webcam_data.for_spot(spot),
-                cft_buoy_data=cft_buoy_data.for_spot(spot),
+                created=snapshot_obj.created,
+                **{
+                    attname: domain.from_orm_obj(row[name]) if name in row else None
+                    for name, (attname, domain) in self.provider_domains.items()
+                },
             )
             snapshots.append(snapshot)
+        snapshots.metrics = SnapshotRunMetrics(
+            fetch_seconds=None,
+            transaction_seconds=transaction_seconds,
+        )
         return snapshots
 
 
+@dataclass
+class SnapshotRunMetrics:
+    fetch_seconds: Optional[float]
+    transaction_seconds: float
+    downloads: "list[PreviewDownload]" = field(default_factory=list)
+    data_ages: "dict[str, float]" = field(default_factory=dict)
+    missing: "dict[str, str]" = field(default_factory=dict)
+
+    def __str__(self):
+        fetch = f"{self.fetch_seconds:.3f}s" if self.fetch_seconds is not None else "-"
+        downloaded = sum(download.bytes_written for download in self.downloads)
+        ages = ", ".join(f"{name} {age:.0f}s" for name, age in self.data_ages.items())
+        return (
+            f"fetch {fetch}, transaction held {self.transaction_seconds:.3f}s, "
+            f"{len(self.downloads)} previews downloaded ({downloaded} bytes), "
+            f"data ages: {ages or '-'}, "
+            f"missing: {', '.join(self.missing) or '-'}"
+        )
+
+
+class SpotSnapshotSetDomain(List["SpotSnapshotDomain"]):
+    metrics: Optional["SnapshotRunMetrics"] = None
+
+
 @dataclass
 class SpotDomain:
     pk: int
@@ -53,7 +184,7 @@ class SpotDomain:
 
     @classmethod
     def load_all(cls) -> "SpotSetDomain":
-        orm_objs = Spot.objects.all()
+        orm_objs = topology_cache.get().spots.values()
         return SpotSetDomain([cls.from_orm_obj(orm_obj) for orm_obj in orm_objs])
 
 
@@ -62,10 +193,11 @@ class SpotSnapshotDomain:
     pk: int
     created: "datetime"
     spot: "SpotDomain"
-    meteonetwork_data: "MeteoNetworkIRTDataDomain"
-    cft_buoy_data: "CFTBuoyDataDomain"
-    windy_webcam_data: "WindyWebcamDataDomain"
-    iplivecam_data: "IPCamLiveDataDomain"
+    # None when the provider was missing at snapshot time
+    meteonetwork_data: "Optional[MeteoNetworkIRTDataDomain]"
+    cft_buoy_data: "Optional[CFTBuoyDataDomain]"
+    windy_webcam_data: "Optional[WindyWebcamDataDomain]"
+    iplivecam_data: "Optional[IPCamLiveDataDomain]"
 
     @classmethod
     def load_all(cls, spot: "Spot"):
@@ -78,48 +210,33 @@ class SpotSnapshotDomain:
 
     @classmethod
     def from_orm_obj(cls, orm_obj: "SpotSnapshot"):
-        meteonetwork_data = MeteoNetworkIRTDataDomain.load_for_snapshot(
-            snapshot_id=orm_obj.pk
-        )
-        cft_buoy_data = CFTBuoyDataDomain.load_for_snapshot(snapshot_id=orm_obj.pk)
-        windy_webcam_data = WindyWebcamDataDomain.load_for_snapshot(
-            snapshot_id=orm_obj.pk
-        )
-        iplivecam_data = IPCamLiveDataDomain.load_for_snapshot(snapshot_id=orm_obj.pk)
         return cls(
             pk=orm_obj.pk,
             spot=SpotDomain.from_orm_obj(orm_obj.spot),
             created=orm_obj.created,
-            meteonetwork_data=meteonetwork_data,
-            cft_buoy_data=cft_buoy_data,
-            windy_webcam_data=windy_webcam_data,
-            iplivecam_data=iplivecam_data,
+            **{
+                attname: cls.load_provider_data(domain, snapshot_id=orm_obj.pk)
+                for attname, domain in SpotSetDomain.provider_domains.values()
+            },
         )
 
-    @classmethod
-    @transaction.atomic
-    def create_from_data(
-        cls,
-        spot: "SpotDomain",
-        ipcamlive_data: "IPCamLiveDataDomain",
-        meteonetwork_irt_data: "MeteoNetworkIRTDataDomain",
-        windy_webcam_data: "WindyWebcamDataDomain",
-        cft_buoy_data: "CFTBuoyDataDomain",
-    ) -> "SpotSnapshotDomain":
-        snapshot_orm = SpotSnapshot.objects.create(spot_id=spot.pk)
-
-        ipcamlive_data.persist(snapshot_orm)
-        meteonetwork_irt_data.persist(snapshot_orm)
-        windy_webcam_data.persist(snapshot_orm)
-        cft_buoy_data.persist(snapshot_orm)
-
-        return cls.from_orm_obj(snapshot_orm)
+    @staticmethod
+    def load_provider_data(domain: type, snapshot_id: int) -> Optional[Any]:
+        try:
+            return domain.load_for_snapshot(snapshot_id=snapshot_id)
+        except ObjectDoesNotExist:
+            return None
 
     def to_assessment_view(self):
         return {
             "spot": self.spot.to_dict(),
-            "meteonetwork": self.meteonetwork_data.to_assessment_view(),
-            "cft_buoy": self.cft_buoy_data.to_assessment_view(),
-            "windy_webcam": self.windy_webcam_data.to_assessment_view(),
-            "iplivecam": self.iplivecam_data.to_assessment_view(),
+            **{
+                section: data.to_assessment_view() if data is not None else None
+                for section, data in (
+                    ("meteonetwork", self.meteonetwork_data),
+                    ("cft_buoy", self.cft_buoy_data),
+                    ("windy_webcam", self.windy_webcam_data),
+                    ("iplivecam", self.iplivecam_data),
+                )
+            },
         }
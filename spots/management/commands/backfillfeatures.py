@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from spots.analytics.domain import SnapshotFeaturesV1Store
+from spots.domain import SpotDomain
+
+
+class Command(BaseCommand):
+    help = """Compute and store features of snapshots missing from the feature store."""
+
+    def handle(self, *args, **options):
+        for spot in SpotDomain.load_all():
+            stored = SnapshotFeaturesV1Store.backfill(spot)
+            self.stdout.write(
+                self.style.SUCCESS(f"{spot.name}: {stored} snapshots backfilled")
+            )
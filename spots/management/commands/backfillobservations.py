@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from cftoscana.domain import CFTBuoyObservationService
+
+
+class Command(BaseCommand):
+    help = (
+        """Fill the buoy observations table from the data of every stored snapshot."""
+    )
+
+    def handle(self, *args, **options):
+        count = CFTBuoyObservationService.backfill()
+        self.stdout.write(self.style.SUCCESS(f"{count} buoy snapshots upserted"))
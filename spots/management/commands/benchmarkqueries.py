@@ -0,0 +1,63 @@
+import json
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from spots.benchmark.domain import QueryPlanBenchmark, SyntheticHistory
+
+
+class Command(BaseCommand):
+    help = """Record query plans and timings of the snapshot hot paths as synthetic
+    history grows, year by year. Runs against a throwaway test database."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=3)
+        parser.add_argument("--spots", type=int, default=2)
+        parser.add_argument(
+            "--per-day", type=int, default=48, help="Snapshots a day per spot"
+        )
+        parser.add_argument("--output", type=str, help="Write the plans as JSON")
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Keep the test database"
+        )
+
+    def handle(self, *args, **options):
+        verbosity = options.get("verbosity")
+        keepdb = options.get("keepdb")
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=verbosity, autoclobber=True, keepdb=keepdb
+        )
+        try:
+            plans = self.benchmark(
+                years=options.get("years"),
+                spots=options.get("spots"),
+                per_day=options.get("per_day"),
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=verbosity, keepdb=keepdb
+            )
+
+        if options.get("output"):
+            with open(options.get("output"), "w") as file:
+                json.dump(
+                    [dict(asdict(plan), index_only=plan.index_only) for plan in plans],
+                    file,
+                    indent=2,
+                )
+
+    def benchmark(self, years: int, spots: int, per_day: int):
+        history = SyntheticHistory(spots=spots, per_day=per_day)
+        plans = []
+        for _ in range(years):
+            created = history.add_year()
+            self.stdout.write(
+                f"History of {history.years} years, {created} snapshots added"
+            )
+            for plan in QueryPlanBenchmark.run(history):
+                plans.append(plan)
+                style = self.style.SUCCESS if plan.index_only else self.style.WARNING
+                self.stdout.write(style(str(plan)))
+        return plans
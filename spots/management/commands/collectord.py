@@ -0,0 +1,41 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from spots.collection.daemon import CollectorDaemon
+from surfin import settings
+
+
+class Command(BaseCommand):
+    help = """Long running replacement of takesnapshots: poll providers on their own
+    intervals and take snapshots out of the latest data, until SIGINT/SIGTERM."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--health-host", type=str, default=settings.COLLECTORD_HEALTH_HOST
+        )
+        parser.add_argument(
+            "--health-port",
+            type=int,
+            default=settings.COLLECTORD_HEALTH_PORT,
+            help="0 to disable the health endpoint",
+        )
+        parser.add_argument("--serial", action="store_true", help="No thread pools")
+
+    def log(self, message: str):
+        self.stdout.write(f"[{timezone.now().isoformat(timespec='seconds')}] {message}")
+
+    def handle(self, *args, **options):
+        daemon = CollectorDaemon(
+            intervals=settings.COLLECTORD_INTERVALS,
+            concurrent=not options.get("serial"),
+            log=self.log,
+        )
+        asyncio.run(
+            daemon.run(
+                health_host=options.get("health_host"),
+                health_port=options.get("health_port") or None,
+            )
+        )
+        self.stdout.write(self.style.SUCCESS("Stopped"))
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from typing import Optional
+from zipfile import ZIP_STORED, ZipFile
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cftoscana.domain import CFTBuoyCompactionService
+from spots.retention.domain import PreviewRetentionService
+
+
+class Command(BaseCommand):
+    help = """Compact old buoy series and drop old previews of unassessed or discarded snapshots."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--buoy-days",
+            type=int,
+            default=30,
+            help="Keep full resolution buoy data of the last N days",
+        )
+        parser.add_argument(
+            "--preview-days",
+            type=int,
+            default=90,
+            help="Keep every preview of the last N days",
+        )
+        parser.add_argument(
+            "--archive", type=str, help="Zip file to archive dropped previews into"
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        start_of_today = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+        buoy = CFTBuoyCompactionService.compact(
+            before=start_of_today - timedelta(days=options["buoy_days"]),
+            dry_run=dry_run,
+        )
+        self.stdout.write(
+            f"Buoy data: {buoy.compacted} rows over {buoy.days} station days "
+            f"compacted, {buoy.skipped} left as is, "
+            f"~{self.format_bytes(buoy.reclaimed_bytes)} reclaimed"
+        )
+        legacy = CFTBuoyCompactionService.drop_legacy_json(dry_run=dry_run)
+        self.stdout.write(
+            f"Buoy data: legacy JSON of {legacy.compacted} binary encoded rows "
+            f"dropped, ~{self.format_bytes(legacy.reclaimed_bytes)} reclaimed"
+        )
+
+        archive: Optional[ZipFile] = None
+        if options["archive"] and not dry_run:
+            archive = ZipFile(options["archive"], "a", compression=ZIP_STORED)
+        try:
+            previews = PreviewRetentionService.prune(
+                before=start_of_today - timedelta(days=options["preview_days"]),
+                archive=archive,
+                dry_run=dry_run,
+            )
+        finally:
+            if archive is not None:
+                archive.close()
+        self.stdout.write(
+            f"Previews: {previews.files} files of {previews.rows} rows dropped, "
+            f"{self.format_bytes(previews.reclaimed_bytes)} reclaimed"
+        )
+
+        total = buoy.reclaimed_bytes + legacy.reclaimed_bytes + previews.reclaimed_bytes
+        verb = "Would reclaim" if dry_run else "Reclaimed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {self.format_bytes(total)}"))
+
+    def format_bytes(self, size: int) -> str:
+        return f"{size / 2**20:.1f} MiB"
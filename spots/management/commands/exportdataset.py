@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from spots.analytics.domain import SpotDatasetV1
+from spots.models import Spot
+
+
+class Command(BaseCommand):
+    help = """Export the feature timeserie of each spot to Parquet, one file per day.
+    Days already exported are skipped unless --full is given."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spot", type=str)
+        parser.add_argument(
+            "--until",
+            type=date.fromisoformat,
+            default=None,
+            help="Export days before this one (YYYY-MM-DD), today by default",
+        )
+        parser.add_argument(
+            "--full", action="store_true", help="Export every day again"
+        )
+
+    def handle(self, *args, **options):
+        spots = Spot.objects.all()
+        if options.get("spot"):
+            spots = spots.filter(uid=options.get("spot"))
+        for spot in spots:
+            out = SpotDatasetV1.export(
+                spot, until=options.get("until"), full=options.get("full")
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{spot.name}: {out.rows} snapshots over {out.days} days "
+                    f"exported, {out.bytes_written / 2**20:.1f} MiB written to "
+                    f"{SpotDatasetV1.get_root(spot.uid)}"
+                )
+            )
@@ -1,12 +1,34 @@
 from django.core.management.base import BaseCommand
 
 from spots.domain import SpotDomain
+from surfin.http import get_connection_stats
 
 
 class Command(BaseCommand):
     help = """Fetch latest spots data and crystallise it into a snapshot ready for assessement."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Poll every provider rather than using their latest cached values",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Fail rather than take partial snapshots when a provider fails",
+        )
+
     def handle(self, *args, **options):
         spots = SpotDomain.load_all()
-        data = spots.take_snapshots()
+        data = spots.take_snapshots(
+            cached=not options.get("no_cache"), partial=not options.get("strict")
+        )
         self.stdout.write(self.style.SUCCESS(f"Data collected!\n {data}"))
+        self.stdout.write(f"Timings: {data.metrics}")
+        for name, error in data.metrics.missing.items():
+            self.stdout.write(self.style.WARNING(f"Missing {name}: {error}"))
+        for download in data.metrics.downloads:
+            self.stdout.write(f"Preview {download}")
+        for stats in get_connection_stats():
+            self.stdout.write(f"HTTP {stats}")
@@ -1,6 +1,22 @@
-from django.core.management.base import BaseCommand
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
 
-from spots.analytics.domain import WSS1hPredictor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from spots.analytics.domain import TrainOutput, WSS1hPredictor
+from spots.models import Spot
+
+
+def train_spot(
+    spot_uid: str, store: bool, n_jobs: int, from_dataset: bool
+) -> "TrainOutput":
+    return WSS1hPredictor.train(
+        spot_uid=spot_uid, store=store, n_jobs=n_jobs, from_dataset=from_dataset
+    )
 
 
 class Command(BaseCommand):
@@ -8,13 +24,80 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--store", type=int, default=0)
-        parser.add_argument("--spot", type=str, required=True)
+        parser.add_argument("--spot", type=str)
+        parser.add_argument("--all", action="store_true", help="Train every spot")
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--from-dataset",
+            action="store_true",
+            help="Train on the Parquet export, see exportdataset",
+        )
 
     def handle(self, *args, **options):
         store = bool(options.get("store"))
         spot_uid = options.get("spot")
+        from_dataset = options.get("from_dataset")
+
+        if options.get("all"):
+            return self.train_all(
+                store=store, workers=options.get("workers"), from_dataset=from_dataset
+            )
+        if not spot_uid:
+            raise CommandError("Either --spot or --all is required")
+
+        out = WSS1hPredictor.train(
+            spot_uid=spot_uid, store=store, from_dataset=from_dataset
+        )
+        self.write_output(out)
+
+    def train_all(
+        self, store: bool, workers: Optional[int] = None, from_dataset: bool = False
+    ):
+        spot_uids = [str(uid) for uid in Spot.objects.values_list("uid", flat=True)]
+        if not spot_uids:
+            return
+
+        cpus = os.cpu_count() or 1
+        workers = min(workers or cpus, len(spot_uids))
+        # Share the remaining cores among the trees of each forest
+        n_jobs = max(cpus // workers, 1)
+
+        # Forked workers must open their own database connections
+        connections.close_all()
+        started = time.monotonic()
+        trained = 0
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            futures = {
+                executor.submit(
+                    train_spot, spot_uid, store, n_jobs, from_dataset
+                ): spot_uid
+                for spot_uid in spot_uids
+            }
+            for future in as_completed(futures):
+                try:
+                    out = future.result()
+                except Exception as e:
+                    self.stderr.write(f"Spot {futures[future]} failed: {e!r}")
+                else:
+                    trained += 1
+                    self.write_output(out)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Trained {trained}/{len(spot_uids)} spots in {elapsed:.1f}s "
+                f"({workers} workers, n_jobs={n_jobs})"
+            )
+        )
 
-        out = WSS1hPredictor.train(spot_uid=spot_uid, store=store)
+    def write_output(self, out: "TrainOutput"):
         if out.stored:
             self.stdout.write(self.style.SUCCESS(f"{out.filename} stored!"))
-        self.stdout.write(self.style.SUCCESS(f"Root Mean Squared Error: {out.rmse}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Spot {out.spot}: Root Mean Squared Error: {out.rmse} "
+                f"in {out.duration:.1f}s, model size {out.model_size / 2**20:.1f} MiB"
+            )
+        )
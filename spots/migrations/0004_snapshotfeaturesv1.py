@@ -0,0 +1,54 @@
+# Generated by Django 4.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spots", "0003_snapshotdiscarded"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SnapshotFeaturesV1",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("data_delay", models.DurationField()),
+                ("wind_direction", models.FloatField()),
+                ("wind_speed", models.FloatField()),
+                ("wave_height_lag_0", models.FloatField()),
+                ("wave_height_lag_1", models.FloatField()),
+                ("wave_height_lag_2", models.FloatField()),
+                ("period_lag_0", models.FloatField()),
+                ("period_lag_1", models.FloatField()),
+                ("period_lag_2", models.FloatField()),
+                ("direction_lag_0", models.FloatField()),
+                ("direction_lag_1", models.FloatField()),
+                ("direction_lag_2", models.FloatField()),
+                ("wave_height_std_2h", models.FloatField()),
+                ("period_std_2h", models.FloatField()),
+                ("direction_std_2h", models.FloatField()),
+                ("wave_hp_lag_0", models.FloatField()),
+                ("wave_hp_lag_1", models.FloatField()),
+                ("wave_hp_lag_2", models.FloatField()),
+                (
+                    "snapshot",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="features_v1",
+                        to="spots.spotsnapshot",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spots", "0004_snapshotfeaturesv1"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="snapshotassessment",
+            index=models.Index(
+                fields=["snapshot"],
+                include=("wave_size_score",),
+                name="assessment_snapshot_score",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="spotsnapshot",
+            index=models.Index(
+                fields=["spot", "created", "id"], name="spotsnapshot_spot_created"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spots", "0005_snapshot_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="spotsnapshot",
+            name="data_ages",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
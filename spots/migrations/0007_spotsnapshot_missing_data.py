@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spots", "0006_spotsnapshot_data_ages"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="spotsnapshot",
+            name="missing_data",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
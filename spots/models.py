@@ -18,6 +18,18 @@ class Spot(models.Model):
 class SpotSnapshot(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     spot = models.ForeignKey("spots.Spot", on_delete=models.PROTECT)
+    # Seconds since each provider's data was polled, null on older snapshots
+    data_ages = models.JSONField(null=True, blank=True)
+    # Why each provider missing from a partial snapshot is, null when complete
+    missing_data = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Timeseries of a spot, ordered as they are read
+            models.Index(
+                fields=["spot", "created", "id"], name="spotsnapshot_spot_created"
+            ),
+        ]
 
     def __str__(self):
         return f"Snapshot #{self.spot_id} {self.created} #{self.pk}"
@@ -52,3 +64,51 @@ class SnapshotAssessment(models.Model):
         ],
         help_text=WaveSizeScore.help_text,
     )
+
+    class Meta:
+        indexes = [
+            # Lets the score subquery of the timeseries skip the table
+            models.Index(
+                fields=["snapshot"],
+                include=["wave_size_score"],
+                name="assessment_snapshot_score",
+            ),
+        ]
+
+
+class SnapshotFeaturesV1(models.Model):
+    """Precomputed `SpotSnapshotV1` features of a snapshot"""
+
+    feature_set = "V1"
+
+    created = models.DateTimeField(auto_now_add=True)
+    snapshot = models.OneToOneField(
+        "spots.SpotSnapshot", related_name="features_v1", on_delete=models.CASCADE
+    )
+    data_delay = models.DurationField()
+
+    wind_direction = models.FloatField()
+    wind_speed = models.FloatField()
+
+    wave_height_lag_0 = models.FloatField()
+    wave_height_lag_1 = models.FloatField()
+    wave_height_lag_2 = models.FloatField()
+
+    period_lag_0 = models.FloatField()
+    period_lag_1 = models.FloatField()
+    period_lag_2 = models.FloatField()
+
+    direction_lag_0 = models.FloatField()
+    direction_lag_1 = models.FloatField()
+    direction_lag_2 = models.FloatField()
+
+    wave_height_std_2h = models.FloatField()
+    period_std_2h = models.FloatField()
+    direction_std_2h = models.FloatField()
+
+    wave_hp_lag_0 = models.FloatField()
+    wave_hp_lag_1 = models.FloatField()
+    wave_hp_lag_2 = models.FloatField()
+
+    def __str__(self):
+        return f"Features {self.feature_set} {self.snapshot}"
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Type
+from zipfile import ZipFile
+
+from django.db import models
+from django.db.models import Q
+
+from ipcamlive.models import IPCamLiveData
+from surfin.previews import remove_preview
+from windy.models import WindyWebcamData
+
+
+@dataclass
+class PreviewRetentionResult:
+    rows: int = 0
+    files: int = 0
+    reclaimed_bytes: int = 0
+
+    def add(self, other: "PreviewRetentionResult"):
+        self.rows += other.rows
+        self.files += other.files
+        self.reclaimed_bytes += other.reclaimed_bytes
+
+
+class PreviewRetentionService:
+    """Drop old previews nobody is going to look at again.
+
+    Previews of snapshots that were discarded, or never assessed before
+    `before`, are removed from storage (optionally archived first) and their
+    rows are left without a preview. A file shared with a row that is kept
+    stays in storage.
+    """
+
+    models: "tuple[Type[models.Model], ...]" = (IPCamLiveData, WindyWebcamData)
+
+    @classmethod
+    def get_expired(cls, model: "Type[models.Model]", before: datetime):
+        return (
+            model.objects.filter(created__lt=before)
+            .exclude(preview="")
+            .filter(
+                Q(snapshot__snapshotassessment__isnull=True)
+                | Q(snapshot__discarded__isnull=False)
+            )
+        )
+
+    @classmethod
+    def prune_model(
+        cls,
+        model: "Type[models.Model]",
+        before: datetime,
+        archive: Optional[ZipFile],
+        dry_run: bool,
+    ) -> "PreviewRetentionResult":
+        expired = cls.get_expired(model, before)
+        names = set(expired.values_list("preview", flat=True))
+        kept = set(
+            model.objects.filter(preview__in=names)
+            .exclude(pk__in=expired.values("pk"))
+            .values_list("preview", flat=True)
+        )
+        storage = model._meta.get_field("preview").storage
+        result = PreviewRetentionResult(rows=expired.count())
+        for name in sorted(names - kept):
+            result.files += 1
+            result.reclaimed_bytes += remove_preview(
+                storage, name, archive=archive, dry_run=dry_run
+            )
+        if not dry_run:
+            expired.update(preview="")
+        return result
+
+    @classmethod
+    def prune(
+        cls,
+        before: datetime,
+        archive: Optional[ZipFile] = None,
+        dry_run: bool = False,
+    ) -> "PreviewRetentionResult":
+        result = PreviewRetentionResult()
+        for model in cls.models:
+            result.add(cls.prune_model(model, before, archive, dry_run))
+        return result
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from cftoscana.models import CFTBuoyStation
+from ipcamlive.models import IPCamLiveWebcam
+from spots.models import Spot
+from spots.topology.domain import topology_cache
+from windy.models import WindyWebcam
+
+
+def invalidate_topology():
+    topology_cache.invalidate()
+    # Again once committed, a lookup meanwhile would load the old rows
+    transaction.on_commit(topology_cache.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Spot)
+@receiver([post_save, post_delete], sender=CFTBuoyStation)
+@receiver([post_save, post_delete], sender=IPCamLiveWebcam)
+@receiver([post_save, post_delete], sender=WindyWebcam)
+def topology_changed(sender, **kwargs):
+    invalidate_topology()
+
+
+@receiver(m2m_changed, sender=CFTBuoyStation.spots.through)
+def station_spots_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_topology()
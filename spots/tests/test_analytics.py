@@ -0,0 +1,114 @@
+import os
+import pickle
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from sklearn.ensemble import RandomForestRegressor
+
+from spots.analytics.domain import (
+    SPOT_SNAPSHOT_V1_FEATURES,
+    ModelRegistry,
+    SpotSnapshotV1,
+    WSS1hPredictor,
+)
+
+
+def get_snapshots(count: int, seed: int = 0) -> "list[SpotSnapshotV1]":
+    rng = np.random.default_rng(seed)
+    created = datetime(2024, 4, 20, 6, tzinfo=timezone.utc)
+    return [
+        SpotSnapshotV1(
+            id=i,
+            created=created + timedelta(minutes=10 * i),
+            buoy_data=None,
+            data_delay=timedelta(minutes=20),
+            wave_size_score=None,
+            **{
+                name: float(value)
+                for name, value in zip(
+                    SPOT_SNAPSHOT_V1_FEATURES,
+                    rng.uniform(0, 4, len(SPOT_SNAPSHOT_V1_FEATURES)),
+                )
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def get_model(seed: int = 0) -> RandomForestRegressor:
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        rng.uniform(0, 4, (50, len(SPOT_SNAPSHOT_V1_FEATURES))),
+        columns=SPOT_SNAPSHOT_V1_FEATURES,
+    )
+    model = RandomForestRegressor(n_estimators=10, random_state=seed)
+    model.fit(X, X.wave_height_lag_0 + rng.normal(0, 0.1, 50))
+    return model
+
+
+class WSS1hPredictorTestCase(SimpleTestCase):
+    def test_batch_matches_single_rows(self):
+        predictor = WSS1hPredictor(model=get_model())
+        snapshots = get_snapshots(20)
+        single = [predictor.predict([snapshot])[0].wss1h for snapshot in snapshots]
+
+        batch = predictor.predict(snapshots, n_jobs=1)
+        self.assertEqual([p.snapshot for p in batch], snapshots)
+        self.assertEqual([p.wss1h for p in batch], single)
+
+        # Trees are then summed in whichever order they finish
+        batch = predictor.predict(snapshots, n_jobs=2)
+        np.testing.assert_allclose([p.wss1h for p in batch], single, rtol=1e-12)
+
+    def test_no_snapshots(self):
+        self.assertEqual(WSS1hPredictor(model=get_model()).predict([]), [])
+
+
+class ModelRegistryTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def write_model(self, name: str, model) -> Path:
+        path = self.root / name
+        path.write_bytes(pickle.dumps(model))
+        return path
+
+    def test_least_recently_used_evicted(self):
+        paths = [self.write_model(f"{i}.pkl", b"x" * 1000) for i in range(3)]
+        registry = ModelRegistry(max_bytes=2 * paths[0].stat().st_size)
+
+        first = registry.get(paths[0])
+        registry.get(paths[1])
+        # Served from memory, and now the most recently used
+        self.assertIs(registry.get(paths[0]), first)
+        registry.get(paths[2])
+
+        self.assertEqual(list(registry._models), [paths[0], paths[2]])
+        self.assertLessEqual(registry.size, registry.max_bytes)
+
+    def test_model_over_the_limit_kept(self):
+        path = self.write_model("large.pkl", b"x" * 1000)
+        registry = ModelRegistry(max_bytes=10)
+
+        model = registry.get(path)
+
+        self.assertIs(registry.get(path), model)
+
+    def test_reloaded_when_file_changes(self):
+        path = self.write_model("model.pkl", "first")
+        registry = ModelRegistry(max_bytes=2**20)
+        self.assertEqual(registry.get(path), "first")
+
+        # Same size, only the modification time tells the versions apart
+        self.write_model("model.pkl", "other")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        self.assertEqual(registry.get(path), "other")
+        self.assertEqual(len(registry._models), 1)
@@ -0,0 +1,97 @@
+import os
+import pickle
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+import responses
+from django.core.cache import cache
+from django.test import TestCase
+
+from spots.analytics.cache import SpotTimeserieCache
+from spots.analytics.domain import SpotSnapshotTimeserieV1, WSS1hPredictor
+from spots.tests.mixins import SpotSetProvidersMixin
+from surfin import settings
+
+
+class ConstantModel:
+    def predict(self, features):
+        return np.ones(len(features))
+
+
+class TimeseriesTestCase(SpotSetProvidersMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        models_root = patch.object(settings, "MODELS_ROOT", directory.name)
+        models_root.start()
+        self.addCleanup(models_root.stop)
+        self.model_path = WSS1hPredictor.get_path(self.spot_orm.uid)
+        self.model_path.write_bytes(pickle.dumps(ConstantModel()))
+
+        self.url = f"/api/spots/{self.spot_orm.uid}/timeseries/"
+        self.build_for_spot = self.spy(SpotSnapshotTimeserieV1, "build_for_spot")
+        # Called on the predictor, autospec passes it along
+        self.predict = self.spy(WSS1hPredictor, "predict", autospec=True)
+
+    def spy(self, cls, name, **kwargs):
+        mock = patch.object(cls, name, side_effect=getattr(cls, name), **kwargs)
+        self.addCleanup(mock.stop)
+        return mock.start()
+
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def take_snapshots(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self.add_responses(rsps)
+            return self.spots.take_snapshots(cached=False)
+
+    def get_predicted(self) -> "list[list[int]]":
+        """Ids of the snapshots predicted by each request since the last call."""
+        predicted = [
+            [snapshot.id for snapshot in call.args[1]]
+            for call in self.predict.call_args_list
+        ]
+        self.predict.reset_mock()
+        return predicted
+
+    def test_new_snapshots_folded_in(self):
+        first = self.take_snapshots()[0]
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_predicted(), [[first.pk]])
+
+        # Up to date, served without reading snapshots
+        self.build_for_spot.reset_mock()
+        self.assertEqual(self.client.get(self.url).json(), response.json())
+        self.build_for_spot.assert_not_called()
+
+        second = self.take_snapshots()[0]
+        self.client.get(self.url)
+        self.assertEqual(self.build_for_spot.call_args.kwargs["after_id"], first.pk)
+        self.assertEqual(self.get_predicted(), [[second.pk]])
+
+    def test_latest_snapshot_unknown(self):
+        snapshot = self.take_snapshots()[0]
+        response = self.client.get(self.url)
+        self.get_predicted()
+        # Say evicted, or recorded by a process using another cache
+        cache.delete(SpotTimeserieCache.get_latest_key(self.spot.pk))
+
+        self.build_for_spot.reset_mock()
+        self.assertEqual(self.client.get(self.url).json(), response.json())
+        self.assertEqual(self.build_for_spot.call_args.kwargs["after_id"], snapshot.pk)
+        self.assertEqual(self.get_predicted(), [])
+
+    def test_model_changed(self):
+        snapshot = self.take_snapshots()[0]
+        self.client.get(self.url)
+        self.get_predicted()
+
+        stat = self.model_path.stat()
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.client.get(self.url)
+
+        self.assertIsNone(self.build_for_spot.call_args.kwargs["after_id"])
+        self.assertEqual(self.get_predicted(), [[snapshot.pk]])
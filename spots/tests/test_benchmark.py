@@ -0,0 +1,34 @@
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+class BenchmarkQueriesTestCase(TestCase):
+    # Runs in the test database rather than a throwaway one
+    @patch.object(connection.creation, "destroy_test_db")
+    @patch.object(connection.creation, "create_test_db")
+    def test_one_year(self, mock_create_test_db, mock_destroy_test_db):
+        stdout = StringIO()
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            call_command(
+                "benchmarkqueries",
+                years=1,
+                spots=1,
+                per_day=2,
+                output=output.name,
+                stdout=stdout,
+            )
+            plans = json.load(output)
+
+        self.assertIn("History of 1 years, 730 snapshots added", stdout.getvalue())
+        self.assertIn("api timeseries ids", [plan["name"] for plan in plans])
+        for plan in plans:
+            self.assertEqual(plan["snapshots"], 730)
+            self.assertTrue(plan["scans"], plan["plan"])
+            if connection.vendor == "postgresql":
+                self.assertIsNotNone(plan["execution_ms"], plan["plan"])
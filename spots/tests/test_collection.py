@@ -0,0 +1,224 @@
+import asyncio
+import os
+import pickle
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+import responses
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from ipcamlive.models import IPCamLiveData
+from spots.collection.breaker import ProviderCircuitBreaker
+from spots.collection.cache import ProviderValueCache
+from spots.collection.daemon import CollectorDaemon, JobState
+from spots.collection.domain import SpotSetCollector
+from spots.domain import SpotSnapshotDomain
+from spots.models import SnapshotFeaturesV1, SpotSnapshot
+from spots.tests.mixins import SpotSetProvidersMixin, run_in_process
+from surfin.previews import StoredFile
+from windy.models import WindyWebcamData
+
+
+class CollectorDaemonTestCase(SpotSetProvidersMixin, TestCase):
+    # It closes connections left in a transaction, the test one included,
+    # the test client disables it the same way
+    @patch("spots.collection.daemon.close_old_connections")
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_collector_daemon(self, mock_get_station_data, mock_close_connections):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        daemon = CollectorDaemon(
+            intervals={
+                "snapshots": 60,
+                "ipcamlive_data": 60,
+                "windy_webcam_data": 60,
+                "meteonetwork_irt_data": 60,
+                "cft_buoy_data": 60,
+            },
+            log=lambda message: None,
+        )
+
+        async def serve_until_snapshot():
+            serving = asyncio.ensure_future(daemon.serve())
+            while daemon.states["snapshots"].runs == 0:
+                await asyncio.sleep(0.01)
+            daemon.stop()
+            await asyncio.wait_for(serving, timeout=5)
+
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self.add_responses(rsps)
+            # Database work runs back on this thread, within the test transaction
+            async_to_sync(serve_until_snapshot)()
+
+        healthy, health = daemon.get_health()
+        self.assertTrue(healthy)
+        self.assertEqual(health["jobs"]["snapshots"]["failures"], 0)
+        self.assertEqual(SpotSnapshot.objects.filter(spot_id=self.spot.pk).count(), 1)
+
+
+class SpotSetCollectorTestCase(SpotSetProvidersMixin, TestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_snapshots_from_cached_values(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self.add_responses(rsps)
+            first = self.spots.take_snapshots()
+            polls = len(rsps.calls)
+            second = self.spots.take_snapshots()
+            # Every provider served out of the latest values cached
+            self.assertEqual(len(rsps.calls), polls)
+
+        self.assertEqual(
+            first.metrics.data_ages.keys(), second.metrics.data_ages.keys()
+        )
+        self.assertEqual(len(second.metrics.downloads), 0)
+        snapshot = SpotSnapshot.objects.get(pk=second[0].pk)
+        self.assertEqual(set(snapshot.data_ages), set(SpotSetCollector.providers))
+        self.assertEqual(
+            second[0].iplivecam_data.preview.name, first[0].iplivecam_data.preview.name
+        )
+
+        # Stale values are polled again at snapshot time
+        value = ProviderValueCache.get("cft_buoy_data")
+        value.fetched_at -= timedelta(
+            seconds=ProviderValueCache.max_age["cft_buoy_data"] + 1
+        )
+        ProviderValueCache.set("cft_buoy_data", value)
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self.add_responses(rsps)
+            third = self.spots.take_snapshots()
+            self.assertEqual(len(rsps.calls), 0)
+        self.assertLess(third.metrics.data_ages["cft_buoy_data"], 60)
+
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_polled_previews_stored_with_snapshots(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root
+        ):
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                self.add_responses(rsps)
+                SpotSetCollector.collect(self.spots, cached=False)
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                rsps.add("GET", self.ipcamlive_screenshot_uri, body="next_frame")
+                self.add_responses(rsps)
+                SpotSetCollector.collect(self.spots, cached=False)
+                fetched_urls = [call.request.url for call in rsps.calls]
+            # Polls leave storage alone, the superseded frame is dropped
+            self.assertEqual(self.get_stored(media_root), set())
+            self.assertEqual(len(os.listdir(self.pending_root)), 2)
+            # Cached by name, the frames stay on disk
+            for name in ("ipcamlive_data", "windy_webcam_data"):
+                cached = pickle.dumps(ProviderValueCache.get(name))
+                self.assertNotIn(b"next_frame", cached)
+                self.assertNotIn(b"dummy_windy_webcam_preview_payload", cached)
+            # Windy revalidated against the last polled data, not stored yet
+            self.assertNotIn(self.windy_preview_uri, fetched_urls)
+
+            snapshot = self.spots.take_snapshots()[0]
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                rsps.add("GET", self.ipcamlive_screenshot_uri, body="next_frame")
+                self.add_responses(rsps)
+                other = self.spots.take_snapshots(cached=False)[0]
+            stored = self.get_stored(media_root)
+            with snapshot.iplivecam_data.preview.open() as file:
+                self.assertEqual(file.read(), b"next_frame")
+            self.assertEqual(os.listdir(self.pending_root), [])
+
+            # Once stored, previews are revalidated against their stored name
+            cache.clear()
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                self.add_responses(rsps)
+                SpotSetCollector.collect(self.spots, cached=False)
+            windy_data = ProviderValueCache.get("windy_webcam_data").data[0]
+            self.assertIsInstance(windy_data.preview, StoredFile)
+            self.assertEqual(
+                windy_data.preview.name, snapshot.windy_webcam_data.preview.name
+            )
+
+        self.assertEqual(
+            other.iplivecam_data.preview.name, snapshot.iplivecam_data.preview.name
+        )
+        referenced = {
+            *IPCamLiveData.objects.values_list("preview", flat=True),
+            *WindyWebcamData.objects.values_list("preview", flat=True),
+        }
+        self.assertEqual(stored, referenced)
+        self.assertEqual(len(stored), 2)
+
+    @staticmethod
+    def get_stored(root: str) -> "set[str]":
+        return {
+            os.path.relpath(os.path.join(path, name), root)
+            for path, _, names in os.walk(root)
+            for name in names
+        }
+
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    @patch("windy.domain.WindyWebcamService.fetch_current_data")
+    def test_partial_snapshots(self, mock_fetch_windy, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        mock_fetch_windy.side_effect = AssertionError
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self.add_responses(rsps)
+            with self.assertRaises(SpotSetCollector.ProvidersUnavailable):
+                self.spots.take_snapshots(cached=False, partial=False)
+            for _ in range(ProviderCircuitBreaker.threshold):
+                snapshots = self.spots.take_snapshots(cached=False)
+            # Circuit open, windy is no longer polled
+            self.spots.take_snapshots(cached=False)
+
+        self.assertEqual(mock_fetch_windy.call_count, ProviderCircuitBreaker.threshold)
+        self.assertEqual(set(snapshots.metrics.missing), {"windy_webcam_data"})
+        self.assertFalse(WindyWebcamData.objects.exists())
+        self.assertEqual(SnapshotFeaturesV1.objects.count(), 4)
+
+        orm_obj = SpotSnapshot.objects.latest("pk")
+        self.assertIn("CircuitOpen", orm_obj.missing_data["windy_webcam_data"])
+        snapshot = SpotSnapshotDomain.from_orm_obj(orm_obj)
+        self.assertIsNone(snapshot.windy_webcam_data)
+        self.assertIsNone(snapshot.to_assessment_view()["windy_webcam"])
+        self.assertIsNotNone(snapshot.iplivecam_data)
+
+
+class ProviderCircuitBreakerTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_failures_carry_over_runs(self):
+        run_in_process(
+            """
+            from django.utils import timezone
+
+            from spots.collection.breaker import ProviderCircuitBreaker
+
+            for _ in range(ProviderCircuitBreaker.threshold):
+                ProviderCircuitBreaker.record_failure(
+                    "windy_webcam_data", ConnectionError("timeout"), timezone.now()
+                )
+            """
+        )
+
+        now = timezone.now()
+        self.assertTrue(ProviderCircuitBreaker.is_open("windy_webcam_data", now))
+        with self.assertRaises(ProviderCircuitBreaker.CircuitOpen):
+            ProviderCircuitBreaker.check("windy_webcam_data", now)
+        self.assertFalse(ProviderCircuitBreaker.is_open("ipcamlive_data", now))
+
+
+class JobStateTestCase(SimpleTestCase):
+    def test_healthy_within_two_intervals(self):
+        now = timezone.now()
+        state = JobState(name="snapshots", interval=60)
+
+        # Not run yet, given two intervals from the start
+        self.assertTrue(state.is_healthy(now, since=now - timedelta(seconds=90)))
+        self.assertFalse(state.is_healthy(now, since=now - timedelta(seconds=150)))
+
+        state.succeeded = now - timedelta(seconds=100)
+        self.assertTrue(state.is_healthy(now, since=now - timedelta(days=1)))
+        state.succeeded = now - timedelta(seconds=130)
+        self.assertFalse(state.is_healthy(now, since=now - timedelta(days=1)))
@@ -0,0 +1,52 @@
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+import responses
+from django.core.cache import cache
+from django.test import TestCase
+
+from spots.analytics.domain import (
+    SPOT_SNAPSHOT_V1_FEATURES,
+    SpotDatasetV1,
+    SpotSnapshotTimeserieV1,
+)
+from spots.tests.mixins import SpotSetProvidersMixin
+from surfin import settings
+
+
+class SpotDatasetV1TestCase(SpotSetProvidersMixin, TestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_dataset_exported_incrementally(self, mock_get_station_data):
+        for length in (3, 4, 5):
+            cache.clear()
+            mock_get_station_data.return_value = {
+                "x": list(range(length)),
+                "y": [float(i) for i in range(length)],
+            }
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                self.add_responses(rsps)
+                snapshots = self.spots.take_snapshots()
+        until = snapshots[0].created.date() + timedelta(days=1)
+
+        with tempfile.TemporaryDirectory() as root, patch.object(
+            settings, "DATASETS_ROOT", root
+        ):
+            first = SpotDatasetV1.export(self.spot_orm, until=until)
+            second = SpotDatasetV1.export(self.spot_orm, until=until)
+            df = SpotDatasetV1.load(self.spot_orm.uid)
+
+        self.assertEqual((first.days, first.rows), (1, 3))
+        self.assertEqual((second.days, second.rows), (0, 0))
+        timeserie = SpotSnapshotTimeserieV1.build_for_spot(
+            self.spot, snapshots[0].created - timedelta(days=1)
+        )
+        self.assertEqual(list(df.id), [s.id for s in timeserie])
+        self.assertEqual(list(df.created), [s.created for s in timeserie])
+        self.assertEqual(
+            df[SPOT_SNAPSHOT_V1_FEATURES].to_dict("records"),
+            [
+                {name: getattr(s, name) for name in SPOT_SNAPSHOT_V1_FEATURES}
+                for s in timeserie
+            ],
+        )
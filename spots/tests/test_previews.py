@@ -0,0 +1,180 @@
+import os
+import tempfile
+from collections import defaultdict
+from io import BytesIO
+from unittest.mock import patch
+
+import requests
+import responses
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.views.static import serve
+from PIL import Image
+
+from ipcamlive.models import IPCamLiveData
+from spots.tests.mixins import SpotSetProvidersMixin
+from surfin import settings
+from surfin.derivatives import (
+    MEDIUM,
+    THUMBNAIL,
+    WEBP,
+    DerivativeUrls,
+    get_derivative_name,
+    render_derivative,
+)
+
+
+class SnapshotPreviewsTestCase(SpotSetProvidersMixin, TestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_previews_streamed_to_storage(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        frame = bytes(range(256)) * 1000
+        chunks = defaultdict(list)
+        read = []
+        iter_content = requests.Response.iter_content
+        content = requests.Response.content
+
+        def spy_iter_content(response, *args, **kwargs):
+            for chunk in iter_content(response, *args, **kwargs):
+                chunks[response.url].append(len(chunk))
+                yield chunk
+
+        def spy_content(response):
+            read.append(response.url)
+            return content.fget(response)
+
+        with patch.object(
+            requests.Response, "iter_content", spy_iter_content
+        ), patch.object(
+            requests.Response, "content", property(spy_content)
+        ), responses.RequestsMock(
+            assert_all_requests_are_fired=False
+        ) as rsps:
+            rsps.add("GET", self.ipcamlive_screenshot_uri, body=frame)
+            self.add_responses(rsps)
+            data = self.spots.take_snapshots()
+
+        # Bodies went through in chunks, never read as a whole
+        self.assertEqual(
+            chunks[self.ipcamlive_screenshot_uri],
+            [File.DEFAULT_CHUNK_SIZE] * 3 + [len(frame) - 3 * File.DEFAULT_CHUNK_SIZE],
+        )
+        self.assertEqual(
+            chunks[self.windy_preview_uri],
+            [len("dummy_windy_webcam_preview_payload")],
+        )
+        self.assertNotIn(self.ipcamlive_screenshot_uri, read)
+        self.assertNotIn(self.windy_preview_uri, read)
+        self.assertEqual(
+            sorted(download.bytes_written for download in data.metrics.downloads),
+            [len("dummy_windy_webcam_preview_payload"), len(frame)],
+        )
+        preview = data[0].iplivecam_data.preview
+        with preview.storage.open(preview.name) as file:
+            self.assertEqual(file.read(), frame)
+        # Moved out of PENDING_PREVIEWS_ROOT
+        self.assertEqual(os.listdir(self.pending_root), [])
+
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_unchanged_previews_shared(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        with responses.RequestsMock() as rsps:
+            self.add_responses(rsps)
+            first = self.spots.take_snapshots()[0]
+
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self.add_responses(rsps)
+            second = self.spots.take_snapshots(cached=False)[0]
+            fetched_urls = [call.request.url for call in rsps.calls]
+
+        # Windy's lastUpdatedOn did not move, ipcamlive served the same frame
+        self.assertNotIn(self.windy_preview_uri, fetched_urls)
+        self.assertIn(self.ipcamlive_screenshot_uri, fetched_urls)
+        self.assertEqual(
+            first.windy_webcam_data.preview.name,
+            second.windy_webcam_data.preview.name,
+        )
+        self.assertEqual(
+            first.iplivecam_data.preview.name, second.iplivecam_data.preview.name
+        )
+
+
+class PreviewDerivativesTestCase(SimpleTestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.media_root = media_root.name
+
+    def get_preview(self, content: bytes) -> FieldFile:
+        name = default_storage.save(
+            f"{settings.IPCAMLIVE_ROOT}/preview.png", ContentFile(content)
+        )
+        return IPCamLiveData(preview=name).preview
+
+    def get_image(self, size) -> bytes:
+        buffer = BytesIO()
+        Image.new("RGBA", size, (0, 128, 255, 255)).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def serve(self, url: str):
+        # The way MEDIA_URL is served with DEBUG, see surfin.urls
+        path = url.removeprefix("/").removeprefix(settings.MEDIA_URL)
+        return serve(RequestFactory().get(url), path, document_root=self.media_root)
+
+    def test_derivatives_rendered(self):
+        preview = self.get_preview(self.get_image((1920, 1080)))
+        urls = DerivativeUrls(preview)
+
+        for spec, url in (
+            (THUMBNAIL, urls.thumbnail),
+            (MEDIUM, urls.medium),
+            (WEBP, urls.webp),
+        ):
+            self.assertEqual(
+                url,
+                f"/{settings.MEDIA_URL}{settings.DERIVATIVES_ROOT}/{spec.name}/"
+                f"{settings.IPCAMLIVE_ROOT}/preview.{spec.extension}",
+            )
+            response = self.serve(url)
+            self.assertEqual(response.status_code, 200)
+            image = Image.open(BytesIO(b"".join(response.streaming_content)))
+            self.assertEqual(image.format, spec.format)
+            self.assertEqual(image.size, (spec.max_size, spec.max_size * 9 // 16))
+
+        self.assertEqual(self.serve(urls.original).status_code, 200)
+
+    def test_derivatives_rendered_once(self):
+        preview = self.get_preview(self.get_image((640, 360)))
+        with patch(
+            "surfin.derivatives.render_derivative", wraps=render_derivative
+        ) as mock_render:
+            first = DerivativeUrls(preview).thumbnail
+            second = DerivativeUrls(preview).thumbnail
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_render.call_count, 1)
+
+    def test_small_previews_not_upscaled(self):
+        preview = self.get_preview(self.get_image((200, 100)))
+        response = self.serve(DerivativeUrls(preview).medium)
+        image = Image.open(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(image.size, (200, 100))
+
+    def test_undecodable_preview(self):
+        preview = self.get_preview(b"not_an_image")
+        urls = DerivativeUrls(preview)
+
+        self.assertEqual(urls.thumbnail, urls.original)
+        self.assertFalse(
+            default_storage.exists(get_derivative_name(preview.name, THUMBNAIL))
+        )
+
+    def test_dropped_preview(self):
+        urls = DerivativeUrls(IPCamLiveData(preview="").preview)
+        self.assertEqual((urls.original, urls.thumbnail, urls.webp), ("", "", ""))
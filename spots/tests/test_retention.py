@@ -0,0 +1,30 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import responses
+from django.test import TestCase
+from django.utils import timezone
+
+from ipcamlive.models import IPCamLiveData
+from spots.retention.domain import PreviewRetentionService
+from spots.tests.mixins import SpotSetProvidersMixin
+
+
+class PreviewRetentionTestCase(SpotSetProvidersMixin, TestCase):
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_previews_retention(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        for _ in range(2):
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+                self.add_responses(rsps)
+                snapshot = self.spots.take_snapshots()[0]
+        preview = snapshot.iplivecam_data.preview
+        self.assertTrue(preview.storage.exists(preview.name))
+
+        result = PreviewRetentionService.prune(
+            before=timezone.now() + timedelta(days=1)
+        )
+
+        self.assertEqual((result.rows, result.files), (4, 2))
+        self.assertFalse(preview.storage.exists(preview.name))
+        self.assertFalse(IPCamLiveData.objects.exclude(preview=""))
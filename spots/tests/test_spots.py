@@ -1,110 +1,143 @@
+import re
 from unittest.mock import patch
 
 import responses
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-from cftoscana.tests.factories import CFTBuoyStationFactory
 from ipcamlive.tests.factories import IPCamLiveWebcamFactory
-from spots.domain import SpotDomain, SpotSetDomain, SpotSnapshotDomain
-from spots.models import SpotSnapshot
+from meteonetwork.domain import MeteoNetworkService
+from meteonetwork.models import MeteoNetworkIRTData
+from spots.analytics.domain import SpotSnapshotTimeserieV1
+from spots.collection.domain import SpotSetCollector, SpotSetDataDomain
+from spots.domain import SpotDomain, SpotSnapshotDomain
+from spots.models import SnapshotFeaturesV1, SpotSnapshot
 from spots.tests.factories import SpotFactory
+from spots.tests.mixins import SpotSetProvidersMixin
+from windy.domain import WindyWebcamService
 from windy.tests.factories import WindyWebcamFactory
 
 
-class SpotSetTakeSnapshotsTestCase(TestCase):
-    def setUp(self):
-        self.spot_orm = SpotFactory()
-        self.spot = SpotDomain.from_orm_obj(self.spot_orm)
-        self.windy_webcam_orm = WindyWebcamFactory(spot=self.spot_orm)
-        self.ipcamlive_webcam_orm = IPCamLiveWebcamFactory(spot=self.spot_orm)
-        self.buoy_station_orm = CFTBuoyStationFactory()
-        self.buoy_station_orm.spots.add(self.spot_orm)
-
-        self.spots = SpotSetDomain([self.spot])
-
-        self.ipcamlive_screenshot_uri = f"https://ipcamlive.com/player/snapshot.php?alias={self.ipcamlive_webcam_orm.alias}"
-        self.windy_preview_uri = "https://api.windy.com/webcams/lovely_preview_uri.jpg"
-        self.windy_resp = {
-            "total": 1,
-            "webcams": [
-                {
-                    "title": "my lovely webcam",
-                    "viewCount": 118484,
-                    "webcamId": self.windy_webcam_orm.windy_uid,
-                    "status": "active",
-                    "lastUpdatedOn": "2024-04-20T16:04:09.000Z",
-                    "images": {"current": {"preview": self.windy_preview_uri}},
-                }
-            ],
-        }
-
-        self.meteonetwork_resp = {
-            "lat": "45.5125000007195",
-            "lon": "9.312499993800508",
-            "temperature": "11.0",
-            "rh": "79",
-            "dew_point": "7.1",
-            "daily_rain": "25.1",
-            "smlp": "1024.7",
-            "wind_direction": "179",
-            "wind_direction_cardinal": "S",
-            "wind_speed": "2.4",
-            "distance": "1.7",
-            "place": None,
-            "name": None,
-            "current_tmin": None,
-            "current_tmed": None,
-            "current_tmax": None,
-            "current_rhmin": None,
-            "current_rhmed": None,
-            "current_rhmax": None,
-            "current_wgustmax": None,
-            "current_wspeedmax": None,
-            "current_wspeedmed": None,
-            "current_uvmed": None,
-            "current_uvmax": None,
-            "current_radmed": None,
-            "current_radmax": None,
-        }
-
+class SpotSetTakeSnapshotsTestCase(SpotSetProvidersMixin, TestCase):
     @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
     def test_success(self, mock_get_station_data):
         snapshots = SpotSnapshot.objects.all()
         self.assertEqual(snapshots.count(), 0)
         with responses.RequestsMock(assert_all_requests_are_fired=True) as rsps:
+            self.add_responses(rsps)
+            mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+
+            data = self.spots.take_snapshots()
+
+        self.assertEqual(snapshots.all().count(), 1)
+        self.assertEqual(len(data), 1)
+        self.assertEqual(mock_get_station_data.call_count, 3)
+        self.assertIsNotNone(data.metrics.fetch_seconds)
+        self.assertGreaterEqual(data.metrics.transaction_seconds, 0)
+
+        snapshot_orm = SpotSnapshot.objects.get(id=data[0].pk)
+        snapshot = SpotSnapshotDomain.from_orm_obj(snapshot_orm)
+
+        self.assertEqual(data, [snapshot])
+
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_serial_success(self, mock_get_station_data):
+        with responses.RequestsMock(assert_all_requests_are_fired=True) as rsps:
+            self.add_responses(rsps)
+            mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+
+            data = self.spots.take_snapshots(concurrent=False)
+
+        self.assertEqual(len(data), 1)
+        self.assertEqual(mock_get_station_data.call_count, 3)
+
+        snapshot_orm = SpotSnapshot.objects.get(id=data[0].pk)
+        snapshot = SpotSnapshotDomain.from_orm_obj(snapshot_orm)
+
+        self.assertEqual(data, [snapshot])
+
+    def add_spot(self):
+        # MeteoNetwork data is told apart by location
+        spot_orm = SpotFactory(lat=f"43.{len(self.spots)}")
+        self.buoy_station_orm.spots.add(spot_orm)
+        IPCamLiveWebcamFactory(spot=spot_orm)
+        windy_webcam_orm = WindyWebcamFactory(spot=spot_orm)
+        self.windy_resp["webcams"].append(
+            {**self.windy_resp["webcams"][0], "webcamId": windy_webcam_orm.windy_uid}
+        )
+        self.spots.append(SpotDomain.from_orm_obj(spot_orm))
+
+    def collect(self) -> SpotSetDataDomain:
+        with responses.RequestsMock() as rsps:
             rsps.add(
                 "GET",
-                f"https://api.windy.com/webcams/api/v3/webcams?limit=10&offset=0&webcamIds={self.windy_webcam_orm.windy_uid}&include=images",
+                re.compile(re.escape(WindyWebcamService.api_url)),
                 json=self.windy_resp,
-                status=200,
             )
+            rsps.add("GET", self.windy_preview_uri, body="preview")
             rsps.add(
                 "GET",
-                self.windy_preview_uri,
-                body="dummy_windy_webcam_preview_payload",
-                status=200,
-            )
-            rsps.add(
-                "GET",
-                f"https://api.meteonetwork.it/v3/interpolated-realtime/?lat={self.spot.lat}&lon={self.spot.lon}",
+                re.compile(re.escape(MeteoNetworkService.api_url)),
                 json=self.meteonetwork_resp,
-                status=200,
             )
             rsps.add(
                 "GET",
-                self.ipcamlive_screenshot_uri,
-                body="dummy_ipcamlive_webcam_screenshot_payload",
-                status=200,
+                re.compile(re.escape("https://ipcamlive.com/")),
+                body="screenshot",
             )
+            return SpotSetCollector.collect(self.spots, cached=False)
+
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_persist_queries_constant(self, mock_get_station_data):
+        mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        data = self.collect()
+        with CaptureQueriesContext(connection) as one_spot:
+            self.spots.persist_snapshots(data)
+
+        for _ in range(3):
+            self.add_spot()
+        data = self.collect()
+        with self.assertNumQueries(len(one_spot)):
+            snapshots = self.spots.persist_snapshots(data)
+
+        self.assertEqual(len(snapshots), 4)
+        self.assertEqual(SpotSnapshot.objects.count(), 5)
+
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_features_stored(self, mock_get_station_data):
+        with responses.RequestsMock(assert_all_requests_are_fired=True) as rsps:
+            self.add_responses(rsps)
             mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
 
             data = self.spots.take_snapshots()
 
-        self.assertEqual(snapshots.all().count(), 1)
-        self.assertEqual(len(data), 1)
-        self.assertEqual(mock_get_station_data.call_count, 3)
+        self.assertTrue(SnapshotFeaturesV1.objects.filter(snapshot_id=data[0].pk))
 
-        snapshot_orm = SpotSnapshot.objects.get(id=data[0].pk)
-        snapshot = SpotSnapshotDomain.from_orm_obj(snapshot_orm)
+        from_date = data[0].created
+        stored = SpotSnapshotTimeserieV1.build_for_spot(self.spot, from_date)
+        computed = SpotSnapshotTimeserieV1.build_for_spot(
+            self.spot, from_date, use_store=False
+        )
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(
+            [s.to_record() for s in stored], [s.to_record() for s in computed]
+        )
 
-        self.assertEqual(data, [snapshot])
+    @patch("cftoscana.domain.CFTBuoyDataExtractor.get_station_data")
+    def test_features_from_stored_values(self, mock_get_station_data):
+        # More decimals than the columns keep, ties included
+        self.meteonetwork_resp["wind_speed"] = "2.43225"
+        self.meteonetwork_resp["wind_direction"] = "179.00005"
+        with responses.RequestsMock(assert_all_requests_are_fired=True) as rsps:
+            self.add_responses(rsps)
+            mock_get_station_data.return_value = {"x": [0, 1, 2], "y": [0, 1, 2]}
+
+            data = self.spots.take_snapshots()
+
+        stored = MeteoNetworkIRTData.objects.get(snapshot_id=data[0].pk)
+        self.assertEqual(data[0].meteonetwork_data.wind_speed, stored.wind_speed)
+        features = SnapshotFeaturesV1.objects.get(snapshot_id=data[0].pk)
+        self.assertEqual(features.wind_speed, float(stored.wind_speed))
+        self.assertEqual(features.wind_direction, float(stored.wind_direction))
+        self.assertEqual(features.wind_speed, 2.4323)
@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from cftoscana.domain import CFTBuoyService
+from ipcamlive.domain import IPCamLiveService
+from ipcamlive.tests.factories import IPCamLiveWebcamFactory
+from spots.domain import SpotDomain, SpotSetDomain
+from spots.tests.factories import SpotFactory
+from spots.tests.mixins import SpotSetProvidersMixin
+from spots.topology.domain import topology_cache
+
+
+class TopologyCacheTestCase(SpotSetProvidersMixin, TestCase):
+    def test_topology_cached_until_changed(self):
+        other_spot_orm = SpotFactory()
+        self.buoy_station_orm.spots.add(other_spot_orm)
+        spots = SpotSetDomain([self.spot, SpotDomain.from_orm_obj(other_spot_orm)])
+        topology_cache.get()
+
+        with self.assertNumQueries(0):
+            stations = CFTBuoyService.get_buoy_stations(spots)
+            webcams = IPCamLiveService.get_webcams(spots)
+
+        self.assertEqual(len(stations), 1)
+        self.assertEqual(set(stations[0].spot_pks), {self.spot.pk, other_spot_orm.pk})
+        self.assertEqual([webcam.spot.pk for webcam in webcams], [self.spot.pk])
+
+        IPCamLiveWebcamFactory(spot=other_spot_orm)
+        webcams = IPCamLiveService.get_webcams(spots)
+        self.assertEqual(
+            [webcam.spot.pk for webcam in webcams], [self.spot.pk, other_spot_orm.pk]
+        )
+
+    def test_topology_invalidated_by_station_spots(self):
+        topology = topology_cache.get()
+        self.assertEqual(
+            topology.get_buoy_stations([self.spot.pk]), [self.buoy_station_orm]
+        )
+
+        self.buoy_station_orm.spots.remove(self.spot_orm)
+
+        self.assertIsNot(topology_cache.get(), topology)
+        self.assertEqual(topology_cache.get().get_buoy_stations([self.spot.pk]), [])
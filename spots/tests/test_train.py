@@ -0,0 +1,101 @@
+import tempfile
+import uuid
+from concurrent.futures import Future
+from dataclasses import replace
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+from django.core.management import call_command
+from django.test import TestCase
+
+from spots.analytics.domain import WSS1hPredictor
+from spots.tests.factories import SpotFactory
+from spots.tests.test_analytics import get_snapshots
+from surfin import settings
+
+
+class InlineExecutor:
+    """Runs tasks as they are submitted, within the test's transaction."""
+
+    instances = []
+
+    def __init__(self, max_workers, mp_context=None):
+        self.max_workers = max_workers
+        self.submitted = []
+        self.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class TrainAllTestCase(TestCase):
+    failing_uid = uuid.UUID(int=1)
+
+    def setUp(self):
+        models_root = tempfile.TemporaryDirectory()
+        self.addCleanup(models_root.cleanup)
+        models_settings = patch.object(settings, "MODELS_ROOT", models_root.name)
+        models_settings.start()
+        self.addCleanup(models_settings.stop)
+        self.models_root = Path(models_root.name)
+        InlineExecutor.instances.clear()
+
+    @classmethod
+    def get_dataframe(cls, spot_uid, from_dataset):
+        if spot_uid == str(cls.failing_uid):
+            raise ValueError("no snapshots")
+        snapshots = [
+            replace(snapshot, wave_size_score=snapshot.wave_height_lag_0)
+            for snapshot in get_snapshots(60)
+        ]
+        return pd.DataFrame(snapshot.to_record() for snapshot in snapshots)
+
+    @patch("spots.management.commands.train.os.cpu_count", return_value=4)
+    @patch("spots.management.commands.train.connections")
+    @patch("spots.management.commands.train.ProcessPoolExecutor", InlineExecutor)
+    def test_every_spot_trained(self, mock_connections, mock_cpu_count):
+        spots = [SpotFactory(), SpotFactory(), SpotFactory(uid=self.failing_uid)]
+        stdout, stderr = StringIO(), StringIO()
+        with patch.object(WSS1hPredictor, "get_dataframe", self.get_dataframe):
+            call_command(
+                "train", all=True, store=1, workers=2, stdout=stdout, stderr=stderr
+            )
+
+        # Forked workers open their own connections
+        mock_connections.close_all.assert_called_once()
+        (executor,) = InlineExecutor.instances
+        self.assertEqual(executor.max_workers, 2)
+        # 4 cores shared among 2 workers
+        self.assertEqual({args[2] for args in executor.submitted}, {2})
+        self.assertEqual(
+            sorted(args[0] for args in executor.submitted),
+            sorted(str(spot.uid) for spot in spots),
+        )
+
+        for spot in spots[:2]:
+            path = WSS1hPredictor.get_path(spot_uid=str(spot.uid))
+            self.assertEqual(path.parent, self.models_root)
+            self.assertTrue(path.exists())
+            self.assertIn(
+                f"Spot {spot.uid}: Root Mean Squared Error", stdout.getvalue()
+            )
+        self.assertEqual(len(list(self.models_root.iterdir())), 2)
+        self.assertIn(f"Spot {self.failing_uid} failed: ValueError", stderr.getvalue())
+        self.assertRegex(
+            stdout.getvalue(),
+            r"Trained 2/3 spots in \d+\.\ds \(2 workers, n_jobs=2\)",
+        )
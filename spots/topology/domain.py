@@ -0,0 +1,141 @@
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from cftoscana.models import CFTBuoyStation
+from ipcamlive.models import IPCamLiveWebcam
+from spots.models import Spot
+from surfin import settings
+from windy.models import WindyWebcam
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+
+@dataclass
+class Topology:
+    """Spots along with the buoy stations and webcams serving them.
+
+    Rows are shared by every thread of the process, treat them as read only.
+    """
+
+    spots: "dict[int, Spot]"
+    spots_by_uid: "dict[UUID, Spot]"
+    buoy_stations: "dict[int, CFTBuoyStation]"
+    station_spot_pks: "dict[int, tuple[int, ...]]"
+    ipcamlive_webcams: "dict[int, IPCamLiveWebcam]"
+    windy_webcams: "dict[int, WindyWebcam]"
+
+    @classmethod
+    def load(cls) -> "Topology":
+        spots = Spot.objects.prefetch_related(
+            Prefetch(
+                "cftbuoystation_set", queryset=CFTBuoyStation.objects.order_by("pk")
+            ),
+            Prefetch(
+                "ipcamlivewebcam_set", queryset=IPCamLiveWebcam.objects.order_by("pk")
+            ),
+            Prefetch("windywebcam_set", queryset=WindyWebcam.objects.order_by("pk")),
+        ).order_by("pk")
+
+        topology = cls(
+            spots={},
+            spots_by_uid={},
+            buoy_stations={},
+            station_spot_pks={},
+            ipcamlive_webcams={},
+            windy_webcams={},
+        )
+        station_spot_pks = {}
+        for spot in spots:
+            topology.spots[spot.pk] = spot
+            topology.spots_by_uid[spot.uid] = spot
+            for station in spot.cftbuoystation_set.all():
+                topology.buoy_stations.setdefault(station.pk, station)
+                station_spot_pks.setdefault(station.pk, []).append(spot.pk)
+            for webcam in spot.ipcamlivewebcam_set.all():
+                # Reverse prefetches leave the forward relation to load
+                webcam.spot = spot
+                topology.ipcamlive_webcams[webcam.pk] = webcam
+            for webcam in spot.windywebcam_set.all():
+                webcam.spot = spot
+                topology.windy_webcams[webcam.pk] = webcam
+        topology.station_spot_pks = {
+            pk: tuple(spot_pks) for pk, spot_pks in station_spot_pks.items()
+        }
+        return topology
+
+    def get_ipcamlive_webcams(
+        self, spot_pks: "Iterable[int]"
+    ) -> "list[IPCamLiveWebcam]":
+        spot_pks = set(spot_pks)
+        return [
+            webcam
+            for webcam in self.ipcamlive_webcams.values()
+            if webcam.spot_id in spot_pks
+        ]
+
+    def get_windy_webcams(self, spot_pks: "Iterable[int]") -> "list[WindyWebcam]":
+        spot_pks = set(spot_pks)
+        return [
+            webcam
+            for webcam in self.windy_webcams.values()
+            if webcam.spot_id in spot_pks
+        ]
+
+    def get_buoy_stations(self, spot_pks: "Iterable[int]") -> "list[CFTBuoyStation]":
+        spot_pks = set(spot_pks)
+        return [
+            station
+            for pk, station in self.buoy_stations.items()
+            if spot_pks.intersection(self.station_spot_pks[pk])
+        ]
+
+    def get_buoy_station_for_spot(self, spot_pk: int) -> Optional[CFTBuoyStation]:
+        stations = self.get_buoy_stations([spot_pk])
+        return stations[0] if stations else None
+
+
+class TopologyCache:
+    """Process-wide `Topology`, loaded once and kept until it changes.
+
+    Saving or deleting any of the rows it is made of invalidates it, see
+    spots.signals. Invalidations bump a version in the Django cache too so
+    that, with a cache backend shared across processes, the other processes
+    reload it on their next lookup. `timeout` bounds its age regardless.
+    """
+
+    version_key = "spots:topology:version"
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._topology: Optional[Topology] = None
+        self._version: Optional[str] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> "Topology":
+        version = cache.get(self.version_key)
+        with self._lock:
+            if (
+                self._topology is None
+                or self._version != version
+                or time.monotonic() - self._loaded_at > self.timeout
+            ):
+                self._topology = Topology.load()
+                self._version = version
+                self._loaded_at = time.monotonic()
+            return self._topology
+
+    def invalidate(self):
+        with self._lock:
+            self._topology = None
+        cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+
+
+topology_cache = TopologyCache(timeout=settings.TOPOLOGY_CACHE_TIMEOUT)
@@ -8,8 +8,15 @@ from django.utils import timezone
 from ninja import NinjaAPI, Schema
 from pydantic import UUID4
 
-from spots.analytics.domain import SpotSnapshotTimeserieV1, WSS1hPredictor
+from cftoscana.domain import CFTBuoyDataDomain
+from spots.analytics.cache import SpotDayTimeserie, SpotTimeserieCache
+from spots.analytics.domain import (
+    SpotSnapshotTimeserieV1,
+    SpotSnapshotV1,
+    WSS1hPredictor,
+)
 from spots.models import Spot as SpotModel
+from spots.topology.domain import topology_cache
 
 api = NinjaAPI()
 
@@ -31,22 +38,70 @@ class SpotSnapshot(Schema):
 
 @api.get("/spots/", response=List[Spot])
 def spots(request):
-    return SpotModel.objects.all()
+    return list(topology_cache.get().spots.values())
 
 
 @api.get("/spots/{spot_uid}/timeseries/", response=List[SpotSnapshot])
 def timeseries(request, spot_uid: UUID4):
-    spot = SpotModel.objects.get(uid=spot_uid)
+    spot = topology_cache.get().spots_by_uid.get(spot_uid)
+    if spot is None:
+        raise SpotModel.DoesNotExist(spot_uid)
     start_of_day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    timeserie = SpotSnapshotTimeserieV1.build_for_spot(spot, from_date=start_of_day)
+
+    model_version = WSS1hPredictor.get_version(spot_uid=spot_uid)
+    day = SpotTimeserieCache.get(spot.pk, start_of_day.date())
+    if day is None or day.model_version != model_version:
+        day = SpotDayTimeserie(model_version=model_version)
+
+    latest_snapshot_id = SpotTimeserieCache.get_latest_snapshot_id(spot.pk)
+    if (
+        day.response is not None
+        and latest_snapshot_id is not None
+        and latest_snapshot_id == day.last_snapshot_id
+    ):
+        return day.response
+
+    # Only snapshots taken since the day was last cached need inference
+    timeserie = SpotSnapshotTimeserieV1.build_for_spot(
+        spot, from_date=start_of_day, after_id=day.last_snapshot_id
+    )
+    if day.response is not None and not timeserie:
+        return day.response
 
     predictor = WSS1hPredictor.initialize(spot_uid=spot_uid)
     predictions = predictor.predict(timeserie)
-
-    # For simplicity always build wave height from latest available data
-    try:
-        latest_buoy_data = predictions[-1].snapshot.buoy_data
-    except IndexError:
+    day.wss1h.extend((p.snapshot.created, p.wss1h) for p in predictions)
+    if predictions:
+        latest = predictions[-1].snapshot
+        day.buoy_data = get_day_buoy_data(spot, start_of_day, latest)
+        day.last_snapshot_id = latest.id
+    day.response = build_day_timeserie(start_of_day, day.wss1h, day.buoy_data)
+    SpotTimeserieCache.set(spot.pk, start_of_day.date(), day)
+    return day.response
+
+
+def get_day_buoy_data(
+    spot: "SpotModel", start_of_day: datetime, latest: "SpotSnapshotV1"
+) -> "Optional[CFTBuoyDataDomain]":
+    station = topology_cache.get().get_buoy_station_for_spot(spot.pk)
+    if station is not None:
+        buoy_data = CFTBuoyDataDomain.load_range(
+            station, start=start_of_day, end=timezone.now()
+        )
+        if buoy_data is not None:
+            return buoy_data
+    # Day not in the observations table yet, fall back to the latest snapshot
+    return latest.buoy_data or CFTBuoyDataDomain.load_for_snapshot(
+        snapshot_id=latest.id
+    )
+
+
+def build_day_timeserie(
+    start_of_day: datetime,
+    wss1h: "list[tuple[datetime, float]]",
+    latest_buoy_data: "Optional[CFTBuoyDataDomain]",
+) -> "list[dict]":
+    if latest_buoy_data is None:
         df = pd.DataFrame({"x": [], "y": [], "unit": []})
         dir_df = pd.DataFrame({"x": [], "y": [], "unit": []})
         period_df = pd.DataFrame({"x": [], "y": [], "unit": []})
@@ -73,7 +128,7 @@ def timeseries(request, spot_uid: UUID4):
 
     daydf = pd.DataFrame({"hour": np.arange(0.0, 24.5, 0.5)})
     daydf = pd.merge_asof(daydf, df, on=["hour"], tolerance=0.5, direction="nearest")
-    wssdf = pd.DataFrame(p.to_dict() for p in predictions)
+    wssdf = pd.DataFrame(wss1h, columns=["created", "wss1h"])
     if not wssdf.empty:
         wssdf["hour"] = wssdf.created.apply(
             lambda dt: round(dt.hour + (dt.minute / 60), 1)
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+    timeout: Optional[float] = None,
+) -> List[R]:
+    """Apply `fn` to `items` on at most `max_workers` threads.
+
+    Results keep the order of `items`. With `max_workers <= 1` items are
+    processed inline on the calling thread. Raises TimeoutError if all
+    results are not available within `timeout` seconds.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    try:
+        return list(executor.map(fn, items, timeout=timeout))
+    finally:
+        # Do not block on stragglers once the timeout has expired
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,89 @@
+import posixpath
+from dataclasses import dataclass
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db.models.fields.files import FieldFile
+from PIL import Image, UnidentifiedImageError
+
+from surfin import settings
+
+
+@dataclass(frozen=True)
+class DerivativeSpec:
+    name: str
+    max_size: int
+    format: str
+    extension: str
+    quality: int
+
+
+THUMBNAIL = DerivativeSpec("thumbnail", 320, "JPEG", "jpg", 70)
+MEDIUM = DerivativeSpec("medium", 960, "JPEG", "jpg", 80)
+WEBP = DerivativeSpec("webp", 960, "WEBP", "webp", 75)
+
+DERIVATIVES = (THUMBNAIL, MEDIUM, WEBP)
+
+
+def get_derivative_name(original_name: str, spec: DerivativeSpec) -> str:
+    root, _ = posixpath.splitext(original_name)
+    return posixpath.join(
+        settings.DERIVATIVES_ROOT, spec.name, f"{root}.{spec.extension}"
+    )
+
+
+def render_derivative(field_file: FieldFile, spec: DerivativeSpec) -> bytes:
+    with field_file.open("rb") as original:
+        image = Image.open(original)
+        image.thumbnail((spec.max_size, spec.max_size))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffer = BytesIO()
+        image.save(buffer, format=spec.format, quality=spec.quality, optimize=True)
+    return buffer.getvalue()
+
+
+def get_derivative_url(field_file: FieldFile, spec: DerivativeSpec) -> str:
+    """Url of a resized copy of `field_file`, rendered on first request.
+
+    Derivatives are stored next to the originals under DERIVATIVES_ROOT and
+    named after them, so previews shared by several rows share them too.
+    Falls back to the original when it cannot be decoded as an image.
+    """
+    if not field_file:
+        # Dropped by retention
+        return ""
+    name = get_derivative_name(field_file.name, spec)
+    storage = field_file.storage
+    if not storage.exists(name):
+        try:
+            content = render_derivative(field_file, spec)
+        except (OSError, UnidentifiedImageError):
+            return field_file.url
+        # A concurrent request may have rendered it meanwhile
+        if not storage.exists(name):
+            storage.save(name, ContentFile(content))
+    return storage.url(name)
+
+
+class DerivativeUrls:
+    """Urls of the derivatives of a preview, each rendered when first read."""
+
+    def __init__(self, field_file: FieldFile):
+        self.field_file = field_file
+
+    @property
+    def original(self) -> str:
+        return self.field_file.url if self.field_file else ""
+
+    @property
+    def thumbnail(self) -> str:
+        return get_derivative_url(self.field_file, THUMBNAIL)
+
+    @property
+    def medium(self) -> str:
+        return get_derivative_url(self.field_file, MEDIUM)
+
+    @property
+    def webp(self) -> str:
+        return get_derivative_url(self.field_file, WEBP)
@@ -0,0 +1,106 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from surfin import settings
+
+
+class PooledSession(requests.Session):
+    """Session with keep-alive pools, retries and a default timeout.
+
+    Connections are kept open per host and shared by every thread using the
+    session, so repeated calls to a provider skip the TCP/TLS handshake.
+    """
+
+    max_hosts = 16
+
+    def __init__(
+        self,
+        pool_maxsize: int,
+        timeout: "tuple[float, float]",
+        retries: int,
+        backoff_factor: float,
+    ):
+        super().__init__()
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.max_hosts,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+            max_retries=retry,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+    def get_connection_stats(self) -> "list[ConnectionStats]":
+        stats = []
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats.append(
+                    ConnectionStats(
+                        host=pool.host,
+                        requests=pool.num_requests,
+                        connections=pool.num_connections,
+                    )
+                )
+        return stats
+
+
+@dataclass
+class ConnectionStats:
+    host: str
+    requests: int
+    connections: int
+
+    @property
+    def reused(self) -> int:
+        return self.requests - self.connections
+
+    def __str__(self):
+        return (
+            f"{self.host}: {self.requests} requests over "
+            f"{self.connections} connections ({self.reused} reused)"
+        )
+
+
+_session: Optional[PooledSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Process-wide session shared by all data providers."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PooledSession(
+                pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+                retries=settings.HTTP_RETRIES,
+                backoff_factor=settings.HTTP_BACKOFF_FACTOR,
+            )
+        return _session
+
+
+def get_connection_stats() -> "list[ConnectionStats]":
+    with _session_lock:
+        if _session is None:
+            return []
+    return _session.get_connection_stats()
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Union
+from zipfile import ZipFile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db.models.fields.files import FieldFile
+
+from surfin import settings
+from surfin.derivatives import DERIVATIVES, get_derivative_name
+from surfin.http import get_session
+
+if TYPE_CHECKING:
+    from ipcamlive.domain import IPCamLiveDataDomain
+    from windy.domain import WindyWebcamDataDomain
+
+    WebcamDataDomain = Union[IPCamLiveDataDomain, WindyWebcamDataDomain]
+
+
+class ResponseFile(File):
+    """Body of a streamed response, hashed and counted as it is read.
+
+    Storage backends write it chunk by chunk, so the image never sits in
+    memory as a whole.
+    """
+
+    def __init__(self, response, name: str):
+        super().__init__(response.raw, name=name)
+        self.response = response
+        self.hash = hashlib.sha256()
+        self.bytes_read = 0
+
+    def chunks(self, chunk_size: Optional[int] = None):
+        for chunk in self.response.iter_content(chunk_size or self.DEFAULT_CHUNK_SIZE):
+            self.hash.update(chunk)
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+class StoredFile(File):
+    """File already written to storage, `name` is its storage name."""
+
+    def __init__(self, name: str):
+        super().__init__(None, name=name)
+
+    def __reduce__(self):
+        return self.__class__, (self.name,)
+
+
+def get_pending_storage() -> FileSystemStorage:
+    return FileSystemStorage(location=settings.PENDING_PREVIEWS_ROOT)
+
+
+class PendingFile(File):
+    """Frame streamed to PENDING_PREVIEWS_ROOT, until the first row pointing
+    at it moves it to storage.
+
+    Polled values are cached with it, so it pickles as its name only and
+    the frame stays on disk.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(None, name=name)
+
+    def __reduce__(self):
+        return self.__class__, (self.name,)
+
+    def temporary_file_path(self) -> str:
+        # FileSystemStorage moves the file into place rather than copying it
+        return get_pending_storage().path(self.name)
+
+    def open(self, mode="rb"):
+        self.file = open(self.temporary_file_path(), mode)
+        return self
+
+    def discard(self):
+        get_pending_storage().delete(self.name)
+
+
+@dataclass
+class PreviewDownload:
+    url: str
+    bytes_written: int
+    seconds: float
+
+    def __str__(self):
+        return f"{self.url}: {self.bytes_written} bytes in {self.seconds:.3f}s"
+
+
+@dataclass
+class Preview:
+    """Webcam frame along with what is needed to revalidate it upstream.
+
+    `file` is either a frame just downloaded, pending until a row points at
+    it, or, when upstream has not changed, the one of the last data that new
+    rows can share. Either way it is referenced by name, see get_cached_file,
+    so that polled values carry no image bytes.
+    """
+
+    file: File
+    sha256: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    download: Optional[PreviewDownload] = None
+
+
+def fetch_preview(
+    url: str,
+    filename: str,
+    last: Optional[Preview] = None,
+    **kwargs,
+) -> Preview:
+    """Stream `url` to PENDING_PREVIEWS_ROOT unless it is the same frame as `last`.
+
+    The last validators are sent along so that servers supporting them
+    answer 304, otherwise an identical body is recognised by its hash and
+    the copy just written is dropped. New frames only go to storage along
+    with the first row pointing at them, see attach_preview, and a pending
+    frame superseded by a new one is dropped, so that frames polled but never
+    snapshotted leave no file behind.
+    """
+    headers = {}
+    if last is not None and last.etag:
+        headers["If-None-Match"] = last.etag
+    if last is not None and last.last_modified:
+        headers["If-Modified-Since"] = last.last_modified
+
+    started = time.monotonic()
+    with get_session().get(url, headers=headers, stream=True, **kwargs) as response:
+        if last is not None and response.status_code == 304:
+            return last
+        response.raise_for_status()
+
+        storage = get_pending_storage()
+        _, extension = os.path.splitext(filename)
+        name = f"{uuid.uuid4().hex}{extension}"
+        content = ResponseFile(response, name=filename)
+        try:
+            storage.save(name, content)
+        except Exception:
+            # Drop what was written before the connection broke
+            storage.delete(name)
+            raise
+
+    preview = Preview(
+        file=PendingFile(name),
+        sha256=content.hash.hexdigest(),
+        etag=response.headers.get("ETag", ""),
+        last_modified=response.headers.get("Last-Modified", ""),
+        download=PreviewDownload(
+            url=url,
+            bytes_written=content.bytes_read,
+            seconds=time.monotonic() - started,
+        ),
+    )
+    if last is not None and last.sha256 == preview.sha256:
+        preview.file.discard()
+        preview.file = last.file
+    elif last is not None and isinstance(last.file, PendingFile):
+        last.file.discard()
+    return preview
+
+
+def get_cached_file(file: File) -> File:
+    """`file` as polled values hold it, stored previews by name only."""
+    if isinstance(file, FieldFile):
+        return StoredFile(file.name)
+    return file
+
+
+def is_stored(preview: File) -> bool:
+    return isinstance(preview, (FieldFile, StoredFile))
+
+
+def share_stored_preview(
+    data: "WebcamDataDomain", last_data: "Optional[WebcamDataDomain]"
+):
+    """Point pending `data` at the preview stored for `last_data` when
+    both are the same frame, rather than storing it again.
+    """
+    if (
+        last_data is not None
+        and not is_stored(data.preview)
+        and last_data.preview
+        and last_data.preview_sha256 == data.preview_sha256
+    ):
+        data.preview = last_data.preview
+
+
+def attach_preview(field_file: FieldFile, preview: File, name: str):
+    """Point `field_file` at `preview`, moving it to storage if pending."""
+    if is_stored(preview):
+        field_file.name = preview.name
+        return
+    try:
+        preview.open("rb")
+    except FileNotFoundError:
+        # Superseded by a newer poll meanwhile, the row goes without preview
+        return
+    with preview:
+        field_file.save(name=name, content=preview, save=False)
+    # Left behind by storages copying it rather than moving it
+    preview.discard()
+
+
+def remove_preview(
+    storage: Storage,
+    name: str,
+    archive: Optional[ZipFile] = None,
+    dry_run: bool = False,
+) -> int:
+    """Delete a stored preview and its derivatives, returns the bytes freed.
+
+    With an `archive` the original is copied into it before deletion.
+    """
+    names = [name, *(get_derivative_name(name, spec) for spec in DERIVATIVES)]
+    freed = 0
+    for stored_name in filter(storage.exists, names):
+        freed += storage.size(stored_name)
+        if dry_run:
+            continue
+        if archive is not None and stored_name == name:
+            with storage.open(name, "rb") as src, archive.open(name, "w") as dst:
+                shutil.copyfileobj(src, dst)
+        storage.delete(stored_name)
+    return freed
@@ -104,6 +104,22 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Shared by the processes of a deployment: collectord, takesnapshots runs and
+# the web server see the same provider values, breakers and buoy downloads
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env_config.get("CACHE_LOCATION", BASE_DIR / ".cache"),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+# Tests get a cache of their own
+TEST_RUNNER = "surfin.testrunner.TestRunner"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -150,6 +166,59 @@ WINDY_WEBCAMS_URL = MEDIA_URL + WINDY_WEBCAMS_ROOT
 IPCAMLIVE_ROOT = "ipcamlive"
 IPCAMLIVE_URL = MEDIA_URL + IPCAMLIVE_ROOT
 
+DERIVATIVES_ROOT = "derivatives"  # Resized previews, relative to MEDIA_ROOT
+# Previews polled but not snapshotted yet, best on the filesystem of MEDIA_ROOT
+# so that they are moved rather than copied into it
+PENDING_PREVIEWS_ROOT = env_config.get("PENDING_PREVIEWS_ROOT", BASE_DIR / ".previews")
+
+# Read buoy series from, and keep writing, the legacy JSON columns
+CFT_BUOY_DATA_LEGACY_JSON = env_config.get("CFT_BUOY_DATA_LEGACY_JSON") == "True"
+
+# Seconds a buoy download is reused for the same station, date and hour
+CFT_BUOY_CACHE_TIMEOUT = int(env_config.get("CFT_BUOY_CACHE_TIMEOUT", 10 * 60))
+
+# collectord, seconds between runs of each job
+COLLECTORD_INTERVALS = {
+    "snapshots": float(env_config.get("COLLECTORD_SNAPSHOTS_INTERVAL", 10 * 60)),
+    "ipcamlive_data": float(env_config.get("COLLECTORD_IPCAMLIVE_INTERVAL", 5 * 60)),
+    "windy_webcam_data": float(env_config.get("COLLECTORD_WINDY_INTERVAL", 10 * 60)),
+    "meteonetwork_irt_data": float(
+        env_config.get("COLLECTORD_METEONETWORK_INTERVAL", 10 * 60)
+    ),
+    # Buoys update less often than webcams
+    "cft_buoy_data": float(env_config.get("COLLECTORD_CFT_BUOY_INTERVAL", 30 * 60)),
+}
+# Seconds a provider's latest value makes it into snapshots, past that it is
+# polled again at snapshot time. Leaves polls some room to run late
+PROVIDER_VALUE_MAX_AGE = {
+    name: 1.5 * interval
+    for name, interval in COLLECTORD_INTERVALS.items()
+    if name != "snapshots"
+}
+# Consecutive failures after which a provider is left out of snapshots, and
+# seconds before it is polled again
+PROVIDER_BREAKER_THRESHOLD = int(env_config.get("PROVIDER_BREAKER_THRESHOLD", 3))
+PROVIDER_BREAKER_COOLDOWN = float(env_config.get("PROVIDER_BREAKER_COOLDOWN", 15 * 60))
+COLLECTORD_HEALTH_HOST = env_config.get("COLLECTORD_HEALTH_HOST", "127.0.0.1")
+COLLECTORD_HEALTH_PORT = int(env_config.get("COLLECTORD_HEALTH_PORT", 8081))
+
+# Seconds the spots, stations and webcams loaded by a process are kept at most
+TOPOLOGY_CACHE_TIMEOUT = float(env_config.get("TOPOLOGY_CACHE_TIMEOUT", 5 * 60))
+
+# Trained models
+MODELS_ROOT = Path(env_config.get("MODELS_ROOT", BASE_DIR))
+MODELS_CACHE_MAX_BYTES = int(env_config.get("MODELS_CACHE_MAX_BYTES", 512 * 2**20))
+
+# Parquet exports of the training dataset, see the exportdataset command
+DATASETS_ROOT = Path(env_config.get("DATASETS_ROOT", BASE_DIR / "datasets"))
+
+# Outgoing HTTP to data providers
+HTTP_POOL_MAXSIZE = int(env_config.get("HTTP_POOL_MAXSIZE", 8))  # Per host
+HTTP_CONNECT_TIMEOUT = float(env_config.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(env_config.get("HTTP_READ_TIMEOUT", 30))
+HTTP_RETRIES = int(env_config.get("HTTP_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(env_config.get("HTTP_BACKOFF_FACTOR", 0.5))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,32 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Run tests against a cache of their own.
+
+    The default cache is shared by every process of a deployment, tests
+    clearing it would wipe breaker state and cached provider values. It is
+    a file based cache in a temporary directory instead, so that tests
+    running code in other processes share it too, see run_in_process.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.cache_dir.name,
+                }
+            }
+        )
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        self.cache_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,18 +1,27 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from datetime import timezone as tz
-from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
-import requests
 from django.core.files import File
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 from django.utils.timezone import make_aware
-from windy_webcams_api.v3.client import WindyWebcamsClient
-from windy_webcams_api.v3.constants import WebcamFeature
 
 from spots.models import SpotSnapshot
+from spots.topology.domain import topology_cache
 from surfin import settings
+from surfin.concurrency import bounded_map
+from surfin.derivatives import DerivativeUrls
+from surfin.http import get_session
+from surfin.previews import (
+    Preview,
+    PreviewDownload,
+    attach_preview,
+    fetch_preview,
+    get_cached_file,
+    share_stored_preview,
+)
 from windy.models import WindyWebcam, WindyWebcamData
 
 if TYPE_CHECKING:
@@ -30,6 +39,10 @@ class WindyWebcamDataDomain:
     last_updated_on: str
     preview: File
     snapshot: Optional[SpotSnapshot]
+    preview_sha256: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    download: Optional[PreviewDownload] = field(default=None, compare=False)
 
     @property
     def aware_last_updated_on(self):
@@ -43,10 +56,10 @@ class WindyWebcamDataDomain:
             "webcam": self.webcam,
             "status": self.status,
             "last_updated_on": self.aware_last_updated_on,
-            "preview": self.preview.url,
+            "preview": DerivativeUrls(self.preview),
         }
 
-    def persist(self, snapshot) -> WindyWebcamData:
+    def to_orm_obj(self, snapshot: Optional[SpotSnapshot] = None) -> WindyWebcamData:
         obj = WindyWebcamData(
             created=self.created,
             webcam=self.webcam,
@@ -55,10 +68,21 @@ class WindyWebcamDataDomain:
             status=self.status,
             last_updated_on=self.last_updated_on,
             snapshot=snapshot,
+            preview_sha256=self.preview_sha256,
+            etag=self.etag,
+            last_modified=self.last_modified,
         )
-        obj.preview.save(name="windy.jpg", content=self.preview)
+        attach_preview(obj.preview, self.preview, name="windy.jpg")
         return obj
 
+    def to_preview(self) -> Preview:
+        return Preview(
+            file=get_cached_file(self.preview),
+            sha256=self.preview_sha256,
+            etag=self.etag,
+            last_modified=self.last_modified,
+        )
+
     @classmethod
     def load_for_snapshot(cls, snapshot_id: int):
         orm_obj = WindyWebcamData.objects.get(snapshot_id=snapshot_id)
@@ -76,17 +100,30 @@ class WindyWebcamDataDomain:
             status=orm_obj.status,
             last_updated_on=orm_obj.last_updated_on,
             preview=orm_obj.preview,
+            preview_sha256=orm_obj.preview_sha256,
+            etag=orm_obj.etag,
+            last_modified=orm_obj.last_modified,
         )
 
     @classmethod
     def from_data(
-        cls, data: dict, created: "datetime", webcam: "WindyWebcam"
+        cls,
+        data: dict,
+        created: "datetime",
+        webcam: "WindyWebcam",
+        last_data: "Optional[WindyWebcamDataDomain]" = None,
     ) -> "WindyWebcamDataDomain":
-        preview_url = data["images"]["current"]["preview"]
-        raw_preview = requests.get(preview_url).content
-        tmp_file = NamedTemporaryFile()
-        tmp_file.write(raw_preview)
-        preview = File(tmp_file)
+        last = last_data.to_preview() if last_data is not None else None
+        if last is not None and last_data.last_updated_on == data["lastUpdatedOn"]:
+            # Windy has not refreshed the image since the last run
+            preview = last
+        else:
+            preview_url = data["images"]["current"]["preview"]
+            preview = fetch_preview(
+                preview_url,
+                filename="windy.jpg",
+                last=last,
+            )
         return cls(
             pk=None,
             created=created,
@@ -95,8 +132,12 @@ class WindyWebcamDataDomain:
             view_count=data["viewCount"],
             status=data["status"],
             last_updated_on=data["lastUpdatedOn"],
-            preview=preview,
+            preview=preview.file,
             snapshot=None,
+            preview_sha256=preview.sha256,
+            etag=preview.etag,
+            last_modified=preview.last_modified,
+            download=preview.download,
         )
 
 
@@ -105,41 +146,119 @@ class WindyWebcamSetDomain(List["WindyWebcamDataDomain"]):
 
 
 class WindyWebcamService:
+    # Endpoint and auth header of windy-webcams-api-client-python, which it
+    # replaces, keep them in sync with upstream by hand
+    api_url = "https://api.windy.com/webcams/api/v3/webcams"
+    max_workers = 8
+    timeout = 60
+
+    @classmethod
+    def fetch_webcams(cls, webcam_ids: "list[str]") -> dict:
+        response = get_session().get(
+            cls.api_url,
+            params={
+                "limit": 10,
+                "offset": 0,
+                "webcamIds": ",".join(webcam_ids),
+                "include": "images",
+            },
+            headers={"x-windy-api-key": settings.WINDY_WEBCAMS_API_KEY},
+        )
+        response.raise_for_status()
+        return response.json()
+
     @classmethod
-    def fetch_webcam_data(cls, spots: "SpotSetDomain") -> "list[WindyWebcamDataDomain]":
-        webcams = WindyWebcam.objects.filter(spot__in=[s.pk for s in spots])
-        webcam_uid_to_orm_obj = {cam.windy_uid: cam for cam in webcams}
+    def get_webcams(cls, spots: "SpotSetDomain") -> "dict[int, WindyWebcam]":
+        webcams = topology_cache.get().get_windy_webcams(s.pk for s in spots)
+        return {cam.windy_uid: cam for cam in webcams}
+
+    @classmethod
+    def get_last_data(
+        cls, webcam_uid_to_orm_obj: "dict[int, WindyWebcam]"
+    ) -> "dict[int, WindyWebcamDataDomain]":
+        """Latest data of each webcam, to revalidate its preview against."""
+        last_data_ids = WindyWebcam.objects.filter(
+            pk__in=[webcam.pk for webcam in webcam_uid_to_orm_obj.values()]
+        ).annotate(
+            last_data_id=Subquery(
+                WindyWebcamData.objects.filter(webcam=OuterRef("pk"))
+                .order_by("-pk")
+                .values("pk")[:1]
+            )
+        )
+        qs = WindyWebcamData.objects.filter(
+            pk__in=last_data_ids.values("last_data_id")
+        ).select_related("snapshot", "webcam")
+        return {obj.webcam_id: WindyWebcamDataDomain.from_orm_obj(obj) for obj in qs}
+
+    @classmethod
+    def share_stored_previews(cls, data_set: "WindyWebcamDataSetDomain"):
+        """Frames unchanged since the last stored data share its preview."""
+        last_data = cls.get_last_data(
+            {data.webcam.windy_uid: data.webcam for data in data_set}
+        )
+        for data in data_set:
+            share_stored_preview(data, last_data.get(data.webcam.pk))
+
+    @classmethod
+    def fetch_webcam_data(
+        cls,
+        webcam_uid_to_orm_obj: "dict[int, WindyWebcam]",
+        max_workers: Optional[int] = None,
+        last_data: "Optional[dict[int, WindyWebcamDataDomain]]" = None,
+    ) -> "list[WindyWebcamDataDomain]":
         webcam_ids = [str(uid) for uid in webcam_uid_to_orm_obj.keys()]
         assert len(webcam_ids) > 0
 
-        client = WindyWebcamsClient(api_key=settings.WINDY_WEBCAMS_API_KEY)
-        data = client.webcams(
-            webcam_ids=webcam_ids,
-            features=[WebcamFeature.images],
-        )
-        webcams = []
-        for webcam_data in data["webcams"]:
-            webcam_id = webcam_data["webcamId"]
-            webcam = WindyWebcamDataDomain.from_data(
+        data = cls.fetch_webcams(webcam_ids)
+        last_data = last_data or {}
+
+        def from_data(webcam_data: dict) -> "WindyWebcamDataDomain":
+            webcam = webcam_uid_to_orm_obj[webcam_data["webcamId"]]
+            return WindyWebcamDataDomain.from_data(
                 data=webcam_data,
                 created=timezone.now(),
-                webcam=webcam_uid_to_orm_obj[webcam_id],
+                webcam=webcam,
+                last_data=last_data.get(webcam.pk),
             )
-            webcams.append(webcam)
-        return webcams
+
+        return bounded_map(
+            from_data,
+            data["webcams"],
+            max_workers=max_workers or cls.max_workers,
+            timeout=cls.timeout,
+        )
 
     @classmethod
-    def get_current_data(cls, spots: "SpotSetDomain") -> "WindyWebcamDataSetDomain":
-        data_set = cls.fetch_webcam_data(spots)
+    def fetch_current_data(
+        cls,
+        webcam_uid_to_orm_obj: "dict[int, WindyWebcam]",
+        max_workers: Optional[int] = None,
+        last_data: "Optional[dict[int, WindyWebcamDataDomain]]" = None,
+    ) -> "WindyWebcamDataSetDomain":
+        data_set = cls.fetch_webcam_data(webcam_uid_to_orm_obj, max_workers, last_data)
         return WindyWebcamDataSetDomain(data_set)
 
+    @classmethod
+    def get_current_data(cls, spots: "SpotSetDomain") -> "WindyWebcamDataSetDomain":
+        webcams = cls.get_webcams(spots)
+        last_data = cls.get_last_data(webcams)
+        return cls.fetch_current_data(webcams, last_data=last_data)
+
 
 class WindyWebcamDataSetDomain(List["WindyWebcamDataDomain"]):
     class WindyWebcamDataNotFoundForSpot(Exception):
         pass
 
-    def for_spot(self, spot: "SpotDomain") -> "WindyWebcamDataDomain":
+    def __init__(self, data_set: Iterable["WindyWebcamDataDomain"] = ()):
+        super().__init__(data_set)
+        # Data sets are not added to once fetched, index them upfront
+        self.by_spot: "dict[int, WindyWebcamDataDomain]" = {}
         for data in self:
-            if spot.pk == data.webcam.spot.pk:
-                return data
-        raise self.WindyWebcamDataNotFoundForSpot(f"{spot}")
+            self.by_spot.setdefault(data.webcam.spot_id, data)
+
+    def for_spot(self, spot: "SpotDomain") -> "WindyWebcamDataDomain":
+        try:
+            return self.by_spot[spot.pk]
+        except KeyError:
+            raise self.WindyWebcamDataNotFoundForSpot(f"{spot}")
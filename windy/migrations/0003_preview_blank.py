@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("windy", "0002_preview_validators"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="windywebcamdata",
+            name="preview",
+            field=models.ImageField(blank=True, upload_to="windy_webcams"),
+        ),
+    ]
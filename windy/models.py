@@ -22,4 +22,20 @@ class WindyWebcamData(models.Model):
     view_count = models.IntegerField()
     status = models.CharField(max_length=1000)
     last_updated_on = models.CharField(max_length=1000)
-    preview = models.ImageField(upload_to=settings.WINDY_WEBCAMS_ROOT)
+    preview = models.ImageField(upload_to=settings.WINDY_WEBCAMS_ROOT, blank=True)
+    # Identical frames share the same stored preview
+    preview_sha256 = models.CharField(max_length=64, blank=True, default="")
+    etag = models.CharField(max_length=1000, blank=True, default="")
+    last_modified = models.CharField(max_length=1000, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Latest data of a webcam
+            models.Index(fields=["webcam", "-id"], name="windydata_webcam_latest"),
+            # Previews still stored, see PreviewRetentionService
+            models.Index(
+                fields=["created"],
+                condition=~models.Q(preview=""),
+                name="windydata_preview_created",
+            ),
+        ]
@@ -0,0 +1,70 @@
+import responses
+from django.test import TestCase
+from responses import matchers
+
+from spots.tests.mixins import SpotSetProvidersMixin
+from surfin import settings
+from windy.domain import WindyWebcamService
+
+
+class WindyWebcamServiceTestCase(SpotSetProvidersMixin, TestCase):
+    def add_webcams_response(self, rsps, status=200):
+        rsps.add(
+            "GET",
+            WindyWebcamService.api_url,
+            json=self.windy_resp,
+            status=status,
+            match=[
+                matchers.query_param_matcher(
+                    {
+                        "limit": "10",
+                        "offset": "0",
+                        "webcamIds": "1,2",
+                        "include": "images",
+                    }
+                ),
+                matchers.header_matcher(
+                    {"x-windy-api-key": settings.WINDY_WEBCAMS_API_KEY}
+                ),
+            ],
+        )
+
+    def test_fetch_webcams(self):
+        with responses.RequestsMock() as rsps:
+            self.add_webcams_response(rsps)
+            data = WindyWebcamService.fetch_webcams(["1", "2"])
+            self.assertEqual(
+                rsps.calls[0].request.req_kwargs["timeout"],
+                (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+            )
+
+        self.assertEqual(data, self.windy_resp)
+
+    def test_fetch_webcams_retried(self):
+        with responses.RequestsMock() as rsps:
+            self.add_webcams_response(rsps, status=503)
+            self.add_webcams_response(rsps)
+            data = WindyWebcamService.fetch_webcams(["1", "2"])
+            self.assertEqual(len(rsps.calls), 2)
+
+        self.assertEqual(data, self.windy_resp)
+
+    def test_fetch_current_data(self):
+        with responses.RequestsMock() as rsps:
+            rsps.add(
+                "GET",
+                WindyWebcamService.api_url,
+                json=self.windy_resp,
+                match=[
+                    matchers.query_param_matcher(
+                        {"webcamIds": str(self.windy_webcam_orm.windy_uid)},
+                        strict_match=False,
+                    )
+                ],
+            )
+            rsps.add("GET", self.windy_preview_uri, body="preview")
+            data_set = WindyWebcamService.get_current_data(self.spots)
+
+        data = data_set.for_spot(self.spot)
+        self.assertEqual(data.webcam.pk, self.windy_webcam_orm.pk)
+        self.assertEqual(data.title, "my lovely webcam")